@@ -0,0 +1,163 @@
+"""
+Versión asíncrona de los endpoints de lectura más usados (/eventos/ y /reportes/*).
+
+Usa el motor asíncrono de `database` (aiosqlite) en lugar de `SessionLocal`, así
+que las consultas no ocupan un hilo del threadpool de AnyIO mientras esperan a la
+base. Se monta bajo el prefijo /async con las mismas rutas y respuestas.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from datetime import date, time, timedelta
+import auth
+import cambios
+import consultas
+import models
+import paginacion
+import reportes
+import respuestas
+import schemas
+
+router = APIRouter(prefix="/async", tags=["async"])
+
+
+@router.get(
+    "/eventos/", response_model=List[schemas.EventoDetalle], response_model_exclude_unset=True,
+    dependencies=[Depends(cambios.condicional_async("eventos", "evento_actividades", segun_include=consultas.TABLAS_INCLUDE_EVENTOS))]
+)
+async def listar_eventos(
+    response: Response,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    tipo: Optional[str] = None,
+    actividad: Optional[str] = None,
+    hora_desde: Optional[time] = None,
+    hora_hasta: Optional[time] = None,
+    include: Optional[str] = Query(None, description="Relaciones a incluir: asignaciones, profesores"),
+    pagina: paginacion.Paginacion = Depends(paginacion.parametros),
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Listar eventos con filtros opcionales (y sus asignaciones/profesores con include)"""
+    incluir = consultas.include_eventos(include)
+    stmt = consultas.eventos_filas_stmt(fecha_desde, fecha_hasta, tipo, actividad, hora_desde, hora_hasta)
+    if pagina.total:
+        response.headers["X-Total-Count"] = str(await db.scalar(paginacion.total_stmt(stmt)))
+    if not pagina.activa:
+        eventos = [dict(fila) for fila in (await db.execute(stmt)).mappings()]
+    else:
+        claves = consultas.eventos_claves()
+        consulta, hacia_atras = paginacion.preparar(stmt, claves, pagina)
+        filas = (await db.execute(consulta)).all()
+        eventos = paginacion.armar(filas, claves, pagina, hacia_atras, response, mapeos=True)
+    return respuestas.json_directo(await consultas.cargar_eventos_async(db, eventos, incluir), response)
+
+
+@router.get(
+    "/reportes/estadisticas-profesores",
+    dependencies=[Depends(cambios.condicional_async(*reportes.TABLAS_PROFESORES))]
+)
+async def estadisticas_profesores(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Obtener estadísticas de eventos por profesor"""
+    async def calcular():
+        resultado = await db.execute(consultas.estadisticas_profesores_stmt(fecha_desde, fecha_hasta))
+        return consultas.armar_estadisticas_profesores(resultado.all())
+
+    return await reportes.cacheado_async(
+        "estadisticas-profesores", reportes.TABLAS_PROFESORES, (fecha_desde, fecha_hasta), calcular
+    )
+
+
+@router.get(
+    "/reportes/eventos-por-profe/{profesor_id}",
+    dependencies=[Depends(cambios.condicional_async(*reportes.TABLAS_PROFESORES))]
+)
+async def eventos_por_profesor(
+    profesor_id: int,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Obtener todos los eventos de un profesor específico"""
+    async def calcular():
+        resultado = await db.execute(select(models.Profesor).where(models.Profesor.id == profesor_id))
+        profesor = resultado.scalars().first()
+        if not profesor:
+            raise HTTPException(status_code=404, detail="Profesor no encontrado")
+
+        resultado = await db.execute(consultas.eventos_por_profesor_stmt(profesor_id, fecha_desde, fecha_hasta))
+        return consultas.armar_eventos_por_profesor(profesor, resultado.all())
+
+    return await reportes.cacheado_async(
+        "eventos-por-profe", reportes.TABLAS_PROFESORES, (profesor_id, fecha_desde, fecha_hasta), calcular
+    )
+
+
+@router.get(
+    "/reportes/distribucion-equitativa",
+    dependencies=[Depends(cambios.condicional_async(*reportes.TABLAS_DISTRIBUCION, por_fecha=True))]
+)
+async def distribucion_equitativa(
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Mostrar la distribución actual de eventos entre profesores activos"""
+    hoy = date.today()
+
+    async def calcular():
+        resultado = await db.execute(consultas.distribucion_equitativa_stmt(hoy))
+        return consultas.armar_distribucion_equitativa(resultado.all())
+
+    return await reportes.cacheado_async("distribucion-equitativa", reportes.TABLAS_DISTRIBUCION, (hoy,), calcular)
+
+
+@router.get("/reportes/actividades", dependencies=[Depends(cambios.condicional_async(*reportes.TABLAS_ACTIVIDADES))])
+async def reporte_actividades(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Frecuencia de cada actividad en los eventos"""
+    async def calcular():
+        resultado = await db.execute(consultas.actividades_stmt(fecha_desde, fecha_hasta))
+        return consultas.armar_actividades(resultado.all())
+
+    return await reportes.cacheado_async("actividades", reportes.TABLAS_ACTIVIDADES, (fecha_desde, fecha_hasta), calcular)
+
+
+@router.get(
+    "/reportes/series",
+    dependencies=[Depends(cambios.condicional_async(*reportes.TABLAS_SERIES, por_fecha=True))]
+)
+async def series_asignaciones(
+    periodo: Literal["semana", "mes"] = "mes",
+    fecha_desde: Optional[date] = Query(None, description="Por defecto, un año antes de fecha_hasta"),
+    fecha_hasta: Optional[date] = Query(None, description="Por defecto, hoy"),
+    profesor_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    db: AsyncSession = Depends(auth.get_async_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin_async)
+):
+    """Asignaciones por semana o mes, por profesor y por tipo de evento (períodos sin asignaciones en 0)"""
+    fecha_hasta = fecha_hasta or date.today()
+    fecha_desde = fecha_desde or fecha_hasta - timedelta(days=365)
+    periodos = consultas.periodos_serie(periodo, fecha_desde, fecha_hasta)
+
+    async def calcular():
+        profesores = (await db.execute(consultas.profesores_serie_stmt(profesor_id))).all()
+        if profesor_id is not None and not profesores:
+            raise HTTPException(status_code=404, detail="Profesor no encontrado")
+        filas = (await db.execute(consultas.series_stmt(periodo, periodos, profesor_id, tipo))).all()
+        return consultas.armar_series(periodo, periodos, profesores, filas, tipo)
+
+    return await reportes.cacheado_async(
+        "series", reportes.TABLAS_SERIES, (periodo, periodos[0], periodos[-1], profesor_id, tipo), calcular
+    )
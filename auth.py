@@ -1,12 +1,20 @@
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from threading import Lock
+from cache import TTLCache
 import models
 import database
+import os
+import time
 
 # Configuración de seguridad
 SECRET_KEY = "tu-clave-secreta-super-segura-cambiar-en-produccion-minimo-32-caracteres"
@@ -16,6 +24,48 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 días
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Caché de tokens verificados y usuarios para no consultar la base en cada request
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024"))
+
+_tokens_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)  # token -> (username, versión)
+_usuarios_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)  # username -> UsuarioActual
+
+# Cada invalidación incrementa la generación; una lectura que empezó antes no se guarda
+# en caché, así un request concurrente no vuelve a guardar la fila vieja.
+_generacion = 0
+_generacion_lock = Lock()
+
+_CLAVE_SESION = "usuarios_modificados"
+
+# Modo sin estado: el token lleva id, rol, estado y versión, y se autoriza sin consultar
+# al usuario. La revocación se resuelve con una tabla (id -> token_version) en memoria
+# que se refresca cada AUTH_TOKEN_VERSION_REFRESH_SECONDS con una sola consulta.
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "0").lower() in ("1", "true", "si", "yes")
+AUTH_TOKEN_VERSION_REFRESH_SECONDS = float(os.getenv("AUTH_TOKEN_VERSION_REFRESH_SECONDS", "5"))
+
+# Cambios en estas columnas revocan los tokens emitidos antes del cambio
+_COLUMNAS_REVOCAN_TOKEN = ("hashed_password", "activo", "es_admin")
+
+_versiones_tokens: dict = {}
+_versiones_actualizadas_en = 0.0
+_versiones_lock = Lock()
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    """Datos del usuario autenticado: una copia de sus columnas, no una entidad del ORM"""
+    id: int
+    username: str
+    activo: bool
+    es_admin: bool
+    token_version: int = 0
+    email: Optional[str] = None
+    creado_en: Optional[datetime] = None
+
+
+_COLUMNAS_USUARIO = tuple(campo.name for campo in fields(UsuarioActual))
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar contraseña"""
@@ -27,9 +77,20 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Crear token JWT"""
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    usuario: Optional[models.Usuario] = None
+):
+    """Crear token JWT (con los claims de autorización si se pasa el usuario)"""
     to_encode = data.copy()
+    if usuario is not None:
+        to_encode.update({
+            "uid": usuario.id,
+            "es_admin": usuario.es_admin,
+            "activo": usuario.activo,
+            "ver": usuario.token_version or 0,
+        })
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -51,6 +112,110 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 
+def _snapshot_usuario(user: models.Usuario) -> UsuarioActual:
+    """Copiar las columnas del usuario para guardarlas en caché"""
+    return UsuarioActual(**{columna: getattr(user, columna) for columna in _COLUMNAS_USUARIO})
+
+
+def _guardar_usuario(username: str, usuario: UsuarioActual, generacion: int):
+    """Guardar en caché salvo que haya habido una invalidación desde que se leyó la fila"""
+    with _generacion_lock:
+        if generacion == _generacion:
+            _usuarios_cache.guardar(username, usuario)
+
+
+def invalidar_usuario(username: Optional[str] = None):
+    """Quitar de la caché al usuario y a sus tokens (cambio de contraseña, rol o estado).
+
+    Sin username se vacían las cachés completas (UPDATE/DELETE masivos).
+    """
+    global _generacion, _versiones_actualizadas_en
+    with _generacion_lock:
+        _generacion += 1
+        if username is None:
+            _usuarios_cache.limpiar()
+            _tokens_cache.limpiar()
+        else:
+            _usuarios_cache.invalidar(username)
+            _tokens_cache.invalidar_si(lambda token, valor: valor[0] == username)
+    # La próxima verificación en modo sin estado recarga la tabla de versiones
+    _versiones_actualizadas_en = 0.0
+
+
+@event.listens_for(models.Usuario, "before_update")
+def _incrementar_token_version(mapper, connection, target):
+    """Revocar los tokens anteriores si cambia la contraseña, el rol o el estado"""
+    estado = inspect(target)
+    if any(estado.attrs[columna].history.has_changes() for columna in _COLUMNAS_REVOCAN_TOKEN):
+        target.token_version = (target.token_version or 0) + 1
+
+
+def _anotar(sesion: Session, username: Optional[str]):
+    sesion.info.setdefault(_CLAVE_SESION, set()).add(username)
+
+
+@event.listens_for(models.Usuario, "after_update")
+@event.listens_for(models.Usuario, "after_delete")
+def _anotar_usuario_modificado(mapper, connection, target):
+    """Anotar el usuario modificado; la caché se invalida cuando la transacción confirma"""
+    sesion = object_session(target)
+    if sesion is None:
+        return
+    _anotar(sesion, target.username)
+    for anterior in inspect(target).attrs.username.history.deleted:
+        _anotar(sesion, anterior)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _anotar_sentencia_usuarios(orm_execute_state):
+    """UPDATE/DELETE masivos sobre usuarios: no se sabe a quién tocan, se invalida todo"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name == models.Usuario.__tablename__:
+            _anotar(orm_execute_state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_usuarios_confirmados(sesion):
+    usernames = sesion.info.pop(_CLAVE_SESION, None)
+    if not usernames:
+        return
+    if None in usernames:
+        invalidar_usuario()
+    else:
+        for username in usernames:
+            invalidar_usuario(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_usuarios(sesion):
+    sesion.info.pop(_CLAVE_SESION, None)
+
+
+def _version_token_vigente(usuario_id: int) -> Optional[int]:
+    """Versión de token vigente del usuario según la tabla de versiones en memoria"""
+    global _versiones_tokens, _versiones_actualizadas_en
+    with _versiones_lock:
+        vencida = time.monotonic() - _versiones_actualizadas_en >= AUTH_TOKEN_VERSION_REFRESH_SECONDS
+        if not vencida and usuario_id in _versiones_tokens:
+            return _versiones_tokens[usuario_id]
+
+    # La consulta se hace sin el lock (los demás requests siguen con la tabla
+    # anterior) y después se reemplaza la tabla completa
+    generacion = _generacion
+    inicio = time.monotonic()
+    db = database.SessionLocal()
+    try:
+        filas = db.query(models.Usuario.id, models.Usuario.token_version).all()
+    finally:
+        db.close()
+    versiones = {uid: version or 0 for uid, version in filas}
+    with _versiones_lock:
+        _versiones_tokens = versiones
+        # Si hubo una invalidación durante la consulta la tabla ya nace vencida
+        _versiones_actualizadas_en = inicio if generacion == _generacion else 0.0
+    return versiones.get(usuario_id)
+
+
 def get_db():
     """Dependencia para obtener la sesión de base de datos"""
     db = database.SessionLocal()
@@ -59,37 +224,132 @@ def get_db():
     finally:
         db.close()
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """Obtener usuario actual desde token"""
-    credentials_exception = HTTPException(
+async def get_async_db():
+    """Dependencia para obtener una sesión asíncrona (endpoints de /async)"""
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _datos_token(token: str) -> tuple:
+    """Verificar el token (o tomarlo de la caché) y devolver el username y su versión"""
+    datos = _tokens_cache.obtener(token)
+    if datos is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username = payload.get("sub")
+            if username is None:
+                raise _credentials_exception()
+        except JWTError:
+            raise _credentials_exception()
+        # Los tokens emitidos antes de token_version valen como versión 0
+        datos = (username, payload.get("ver", 0))
+        # El token no puede quedar en caché más allá de su expiración
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        _tokens_cache.guardar(token, datos, ttl)
+    return datos
+
+
+def _verificar_version(usuario: UsuarioActual, version: int) -> UsuarioActual:
+    """Rechazar los tokens emitidos antes del último cambio de contraseña, rol o estado"""
+    if version != usuario.token_version:
+        raise _credentials_exception()
+    return usuario
+
+
+def _verificar_admin(current_user: UsuarioActual) -> UsuarioActual:
+    if not current_user.activo:
+        raise HTTPException(status_code=400, detail="Usuario inactivo")
+    if not current_user.es_admin:
+        raise HTTPException(status_code=403, detail="No tienes permisos de administrador")
+    return current_user
+
+
+# Las dependencias de autenticación son síncronas a propósito: FastAPI las ejecuta
+# en el threadpool y la consulta a la base no bloquea el event loop de uvicorn.
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Obtener usuario actual desde token"""
+    username, version = _datos_token(token)
+    
+    usuario = _usuarios_cache.obtener(username)
+    if usuario is None:
+        generacion = _generacion
+        user = db.query(models.Usuario).filter(models.Usuario.username == username).first()
+        if user is None:
+            raise _credentials_exception()
+        usuario = _snapshot_usuario(user)
+        _guardar_usuario(username, usuario, generacion)
+    return _verificar_version(usuario, version)
+
+
+def _usuario_desde_claims(token: str) -> Optional[UsuarioActual]:
+    """Construir el usuario desde los claims del token (modo sin estado)"""
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    if "uid" not in payload or "ver" not in payload:
+        # Token emitido antes del modo sin estado: se valida contra la base
+        return None
     
-    user = db.query(models.Usuario).filter(models.Usuario.username == username).first()
-    if user is None:
+    if _version_token_vigente(payload["uid"]) != payload["ver"]:
         raise credentials_exception
-    return user
+    # Solo tiene los datos que viajan en el token (sin email ni fecha de creación)
+    return UsuarioActual(
+        id=payload["uid"],
+        username=payload["sub"],
+        activo=payload.get("activo", False),
+        es_admin=payload.get("es_admin", False),
+        token_version=payload["ver"],
+    )
 
 
-async def get_current_active_admin(
-    current_user: models.Usuario = Depends(get_current_user)
+def get_current_active_admin(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
 ):
     """Verificar que el usuario es admin activo"""
-    if not current_user.activo:
-        raise HTTPException(status_code=400, detail="Usuario inactivo")
-    if not current_user.es_admin:
-        raise HTTPException(status_code=403, detail="No tienes permisos de administrador")
-    return current_user
+    current_user = _usuario_desde_claims(token) if AUTH_STATELESS else None
+    if current_user is None:
+        current_user = get_current_user(token, db)
+    return _verificar_admin(current_user)
+
+
+async def get_current_active_admin_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Verificar que el usuario es admin activo usando la sesión asíncrona"""
+    if AUTH_STATELESS:
+        # La recarga de la tabla de versiones es una consulta síncrona: va al threadpool
+        current_user = await run_in_threadpool(_usuario_desde_claims, token)
+        if current_user is not None:
+            return _verificar_admin(current_user)
+    username, version = _datos_token(token)
+    usuario = _usuarios_cache.obtener(username)
+    if usuario is None:
+        generacion = _generacion
+        resultado = await db.execute(
+            select(models.Usuario).where(models.Usuario.username == username)
+        )
+        user = resultado.scalars().first()
+        if user is None:
+            raise _credentials_exception()
+        usuario = _snapshot_usuario(user)
+        _guardar_usuario(username, usuario, generacion)
+    return _verificar_admin(_verificar_version(usuario, version))
 
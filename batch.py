@@ -0,0 +1,156 @@
+"""
+Ejecución de varias operaciones de escritura en un solo request.
+
+Cada operación indica método y ruta de uno de los endpoints de escritura de la
+API (`RUTAS`) y se resuelve directamente contra la función de `operaciones`
+correspondiente, sin pasar de nuevo por HTTP ni por la autenticación. Todas
+corren en la misma sesión, cada una dentro de un SAVEPOINT, y el lote se
+confirma con un solo COMMIT (`escritura.ejecutar`).
+
+Sin `atomico` una operación que falla solo deshace lo suyo; con `atomico` el
+lote se aplica completo o no se aplica.
+"""
+from typing import Callable, List, Optional, Type
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+import os
+import re
+import auth
+import database
+import escritura
+import models
+import operaciones
+import schemas
+
+BATCH_MAX_OPERACIONES = int(os.getenv("BATCH_MAX_OPERACIONES", "200"))
+
+
+class Ruta:
+    """Endpoint de escritura disponible en el batch"""
+
+    def __init__(self, metodo: str, plantilla: str, funcion: Callable,
+                 cuerpo: Optional[Type[BaseModel]] = None, respuesta: Optional[Type[BaseModel]] = None):
+        self.metodo = metodo
+        self.plantilla = plantilla
+        # "/eventos/{evento_id}" -> ^/eventos/(?P<evento_id>\d+)/?$
+        patron = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>\\d+)", re.escape(plantilla.rstrip("/")))
+        self.patron = re.compile(f"^{patron}/?$")
+        self.funcion = funcion
+        self.cuerpo = cuerpo
+        self.respuesta = respuesta
+
+
+# funcion(sesion, usuario, cuerpo, **ids de la ruta)
+RUTAS = [
+    Ruta("POST", "/profesores/", lambda s, u, c: operaciones.crear_profesor(s, c),
+         schemas.ProfesorCreate, schemas.Profesor),
+    Ruta("PUT", "/profesores/{profesor_id}", lambda s, u, c, profesor_id: operaciones.actualizar_profesor(s, profesor_id, c),
+         schemas.ProfesorUpdate, schemas.Profesor),
+    Ruta("DELETE", "/profesores/{profesor_id}", lambda s, u, c, profesor_id: operaciones.eliminar_profesor(s, profesor_id)),
+
+    Ruta("POST", "/eventos/", lambda s, u, c: operaciones.crear_evento(s, c),
+         schemas.EventoCreate, schemas.Evento),
+    Ruta("PUT", "/eventos/{evento_id}", lambda s, u, c, evento_id: operaciones.actualizar_evento(s, evento_id, c),
+         schemas.EventoUpdate, schemas.Evento),
+    Ruta("DELETE", "/eventos/{evento_id}", lambda s, u, c, evento_id: operaciones.eliminar_evento(s, evento_id)),
+
+    Ruta("POST", "/asignaciones/", lambda s, u, c: operaciones.crear_asignacion(s, c),
+         schemas.AsignacionCreate, schemas.Asignacion),
+    Ruta("DELETE", "/asignaciones/{asignacion_id}",
+         lambda s, u, c, asignacion_id: operaciones.eliminar_asignacion(s, asignacion_id)),
+
+    Ruta("POST", "/tareas/", lambda s, u, c: operaciones.crear_tarea(s, c, u.id),
+         schemas.TareaCreate, schemas.Tarea),
+    Ruta("PUT", "/tareas/{tarea_id}", lambda s, u, c, tarea_id: operaciones.actualizar_tarea(s, tarea_id, c, u.id),
+         schemas.TareaUpdate, schemas.Tarea),
+    Ruta("DELETE", "/tareas/{tarea_id}", lambda s, u, c, tarea_id: operaciones.eliminar_tarea(s, tarea_id, u.id)),
+    Ruta("PATCH", "/tareas/{tarea_id}/toggle", lambda s, u, c, tarea_id: operaciones.toggle_tarea(s, tarea_id, u.id),
+         respuesta=schemas.Tarea),
+
+    Ruta("POST", "/eventos/{evento_id}/tareas",
+         lambda s, u, c, evento_id: operaciones.crear_tarea_evento(s, evento_id, c),
+         schemas.TareaEventoBase, schemas.TareaEvento),
+    Ruta("PUT", "/eventos/{evento_id}/tareas/{tarea_id}",
+         lambda s, u, c, evento_id, tarea_id: operaciones.actualizar_tarea_evento(s, evento_id, tarea_id, c),
+         schemas.TareaEventoUpdate, schemas.TareaEvento),
+    Ruta("DELETE", "/eventos/{evento_id}/tareas/{tarea_id}",
+         lambda s, u, c, evento_id, tarea_id: operaciones.eliminar_tarea_evento(s, evento_id, tarea_id)),
+    Ruta("PATCH", "/eventos/{evento_id}/tareas/{tarea_id}/toggle",
+         lambda s, u, c, evento_id, tarea_id: operaciones.toggle_tarea_evento(s, evento_id, tarea_id),
+         respuesta=schemas.TareaEvento),
+]
+
+
+def resolver(metodo: str, ruta: str):
+    """Ruta registrada y los ids de la URL (404/405 como haría la API)"""
+    encontrada = False
+    for candidata in RUTAS:
+        coincidencia = candidata.patron.match(ruta)
+        if coincidencia:
+            encontrada = True
+            if candidata.metodo == metodo:
+                return candidata, {clave: int(valor) for clave, valor in coincidencia.groupdict().items()}
+    if encontrada:
+        raise HTTPException(status_code=405, detail=f"Método {metodo} no permitido en {ruta}")
+    raise HTTPException(status_code=404, detail=f"Ruta {ruta} no disponible en batch")
+
+
+def _serializar(resultado, respuesta: Optional[Type[BaseModel]]):
+    if respuesta is not None and isinstance(resultado, models.Base):
+        return respuesta.model_validate(resultado).model_dump(mode="json")
+    return jsonable_encoder(resultado)
+
+
+def _ejecutar_una(sesion: Session, usuario: auth.UsuarioActual, operacion: schemas.OperacionBatch) -> dict:
+    try:
+        ruta, ids = resolver(operacion.metodo, operacion.ruta)
+        cuerpo = ruta.cuerpo.model_validate(operacion.cuerpo) if ruta.cuerpo else None
+        with sesion.begin_nested():
+            resultado = ruta.funcion(sesion, usuario, cuerpo, **ids)
+            sesion.flush()
+            return {"status": 200, "respuesta": _serializar(resultado, ruta.respuesta)}
+    except HTTPException as exc:
+        return {"status": exc.status_code, "detail": exc.detail}
+    except ValidationError as exc:
+        return {"status": 422, "detail": jsonable_encoder(exc.errors(include_url=False, include_context=False))}
+    except IntegrityError as exc:
+        return {"status": 409, "detail": str(exc.orig).splitlines()[0]}
+    except SQLAlchemyError:
+        return {"status": 500, "detail": "Error de base de datos"}
+
+
+def ejecutar(db: Session, batch: schemas.Batch, usuario: auth.UsuarioActual) -> dict:
+    """Ejecutar las operaciones en orden y confirmarlas juntas"""
+    if len(batch.operaciones) > BATCH_MAX_OPERACIONES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Se permiten hasta {BATCH_MAX_OPERACIONES} operaciones por batch"
+        )
+
+    def operacion(sesion: Session) -> List[dict]:
+        database.iniciar_transaccion(sesion)
+        resultados = []
+        for indice, operacion_batch in enumerate(batch.operaciones):
+            resultado = {"indice": indice, **_ejecutar_una(sesion, usuario, operacion_batch)}
+            resultados.append(resultado)
+            if batch.atomico and resultado["status"] >= 400:
+                # Las anteriores se deshacen con el lote, las siguientes no se ejecutan
+                for anterior in resultados[:-1]:
+                    anterior.pop("respuesta", None)
+                    anterior.update(status=424, detail=f"Cancelada: falló la operación {indice}")
+                raise HTTPException(status_code=resultado["status"], detail={
+                    "mensaje": f"La operación {indice} falló, no se aplicó ninguna", "resultados": resultados
+                })
+        return resultados
+
+    resultados = escritura.ejecutar(db, operacion)
+    fallidas = sum(1 for resultado in resultados if resultado["status"] >= 400)
+    return {
+        "resultados": resultados,
+        "total": len(resultados),
+        "exitosas": len(resultados) - fallidas,
+        "fallidas": fallidas
+    }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark comparativo de los endpoints de lectura síncronos y los de /async.
+
+Carga una base temporal con eventos, profesores y asignaciones, y dispara la misma
+cantidad de requests concurrentes contra `/eventos/` y `/reportes/*` en sus dos
+versiones: la síncrona (threadpool de AnyIO, 40 hilos) y la asíncrona (aiosqlite).
+
+Uso:
+    python benchmarks/bench_async_vs_sync.py --requests 500 --concurrencia 12
+
+Con concurrencias altas la versión síncrona agota el pool de conexiones del motor
+síncrono (5 + 10 de overflow) antes que los 40 hilos del threadpool, y los
+requests terminan en TimeoutError del pool; la asíncrona usa su propio pool
+(ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW).
+
+Requiere httpx (`pip install "httpx<0.28"`) y aiosqlite.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+import auth
+import database
+import main
+import migraciones
+import models
+
+
+def preparar_datos(eventos: int, profesores: int) -> str:
+    migraciones.aplicar(database.engine)
+    db = database.SessionLocal()
+    try:
+        db.add(models.Usuario(
+            username="bench",
+            email="bench@colorin.com",
+            hashed_password=auth.get_password_hash("bench"),
+            activo=True,
+            es_admin=True
+        ))
+        profes = [models.Profesor(nombre=f"Profesor {i}", activo=True) for i in range(profesores)]
+        db.add_all(profes)
+        hoy = date.today()
+        evts = [
+            models.Evento(
+                nombre=f"Evento {i}",
+                fecha=hoy + timedelta(days=random.randint(-180, 180)),
+                tipo=random.choice(["cumpleaños", "evento_especial"]),
+                ubicacion="Salón"
+            )
+            for i in range(eventos)
+        ]
+        db.add_all(evts)
+        db.flush()
+        for evento in evts:
+            for profesor in random.sample(profes, 2):
+                db.add(models.Asignacion(profesor_id=profesor.id, evento_id=evento.id, rol="Profesor"))
+        db.commit()
+    finally:
+        db.close()
+    return auth.create_access_token({"sub": "bench"})
+
+
+async def medir(url: str, token: str, total: int, concurrencia: int):
+    latencias = []
+    semaforo = asyncio.Semaphore(concurrencia)
+    transport = httpx.ASGITransport(app=main.app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def una():
+            async with semaforo:
+                inicio = time.perf_counter()
+                respuesta = await client.get(url, headers=headers)
+                latencias.append(time.perf_counter() - inicio)
+                assert respuesta.status_code == 200, respuesta.text
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una() for _ in range(total)))
+        duracion = time.perf_counter() - inicio
+    return latencias, duracion
+
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def comparar(urls: list, token: str, total: int, concurrencia: int):
+    # Un único event loop: las conexiones de aiosqlite quedan atadas al loop que las abrió
+    for url in urls:
+        for prefijo in ("", "/async"):
+            latencias, duracion = await medir(prefijo + url, token, total, concurrencia)
+            print(
+                f"{prefijo + url:<58}"
+                f"{statistics.median(latencias) * 1000:>9.1f}"
+                f"{percentil(latencias, 0.99) * 1000:>9.1f}"
+                f"{total / duracion:>8.0f}"
+            )
+    await database.async_engine.dispose()
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrencia", type=int, default=12)
+    parser.add_argument("--eventos", type=int, default=2000)
+    parser.add_argument("--profesores", type=int, default=30)
+    args = parser.parse_args()
+
+    if database.async_engine is None:
+        sys.exit("aiosqlite no está instalado")
+
+    token = preparar_datos(args.eventos, args.profesores)
+    desde = date.today().isoformat()
+    hasta = (date.today() + timedelta(days=30)).isoformat()
+    urls = [
+        f"/eventos/?fecha_desde={desde}&fecha_hasta={hasta}",
+        "/reportes/estadisticas-profesores",
+        "/reportes/distribucion-equitativa",
+    ]
+
+    print(f"{args.requests} requests por endpoint, concurrencia {args.concurrencia}, "
+          f"{args.eventos} eventos")
+    print(f"{'endpoint':<58}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>8}")
+    asyncio.run(comparar(urls, token, args.requests, args.concurrencia))
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de la dependencia de autenticación bajo carga concurrente.
+
+Compara la versión anterior (dependencia `async def` que ejecuta la consulta
+síncrona dentro del event loop) con la actual (dependencia síncrona que FastAPI
+ejecuta en el threadpool). Ambas apps tienen un endpoint `async` que además
+espera un I/O simulado, como haría cualquier endpoint asíncrono real.
+
+Uso:
+    python benchmarks/bench_auth_concurrencia.py --requests 1000 --concurrencia 8
+
+La concurrencia por defecto queda bien por debajo del pool de conexiones (5 + 10
+de overflow): con más requests simultáneos la versión anterior puede trabarse,
+porque la espera por una conexión libre también ocurre dentro del event loop y
+nadie puede devolver la suya hasta que vence el timeout del pool.
+
+Requiere httpx (`pip install "httpx<0.28"`).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Base temporal y sin caché de autenticación para medir la consulta en cada request
+os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.db")
+os.environ["AUTH_CACHE_TTL_SECONDS"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import auth
+import database
+import migraciones
+import models
+
+
+async def admin_async_legacy(
+    token: str = Depends(auth.oauth2_scheme),
+    db: Session = Depends(auth.get_db)
+):
+    """Versión anterior: consulta bloqueante dentro del event loop"""
+    user = auth.get_current_user(token, db)
+    if not user.activo or not user.es_admin:
+        raise HTTPException(status_code=403)
+    return user
+
+
+def crear_app(dependencia) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/bench")
+    async def bench(current_user: models.Usuario = Depends(dependencia)):
+        await asyncio.sleep(0.001)
+        return {"id": current_user.id}
+
+    return app
+
+
+def preparar_datos() -> str:
+    migraciones.aplicar(database.engine)
+    db = database.SessionLocal()
+    try:
+        db.add(models.Usuario(
+            username="bench",
+            email="bench@colorin.com",
+            hashed_password=auth.get_password_hash("bench"),
+            activo=True,
+            es_admin=True
+        ))
+        db.commit()
+    finally:
+        db.close()
+    return auth.create_access_token({"sub": "bench"})
+
+
+async def medir(app: FastAPI, token: str, total: int, concurrencia: int) -> list:
+    latencias = []
+    semaforo = asyncio.Semaphore(concurrencia)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def una():
+            async with semaforo:
+                inicio = time.perf_counter()
+                respuesta = await client.get("/bench", headers=headers)
+                latencias.append(time.perf_counter() - inicio)
+                assert respuesta.status_code == 200, respuesta.text
+
+        await asyncio.gather(*(una() for _ in range(total)))
+    return latencias
+
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--latencia-db-ms", type=float, default=2.0,
+                        help="latencia simulada por consulta (disco lento o lock de SQLite)")
+    args = parser.parse_args()
+
+    token = preparar_datos()
+
+    if args.latencia_db_ms > 0:
+        @event.listens_for(database.engine, "before_cursor_execute")
+        def _latencia(conn, cursor, statement, parameters, context, executemany):
+            time.sleep(args.latencia_db_ms / 1000)
+
+    print(f"{args.requests} requests, concurrencia {args.concurrencia}, latencia DB {args.latencia_db_ms} ms")
+    print(f"{'variante':<28}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for nombre, dependencia in (
+        ("async (antes)", admin_async_legacy),
+        ("sync en threadpool (ahora)", auth.get_current_active_admin),
+    ):
+        inicio = time.perf_counter()
+        latencias = asyncio.run(medir(crear_app(dependencia), token, args.requests, args.concurrencia))
+        duracion = time.perf_counter() - inicio
+        print(
+            f"{nombre:<28}"
+            f"{statistics.median(latencias) * 1000:>10.1f}"
+            f"{percentil(latencias, 0.99) * 1000:>10.1f}"
+            f"{args.requests / duracion:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del costo por fila de armar la respuesta de `/eventos/`.
+
+Carga una base temporal con eventos (con dos actividades cada uno) y mide, por
+etapas, los dos caminos de serialización:
+
+- anterior: objetos ORM (actividades con selectin) -> dict -> validación del
+  `response_model` -> `jsonable` -> `json` de la biblioteca estándar, que es lo
+  que hace FastAPI con `response_model` y `JSONResponse`.
+- actual: filas de columnas + actividades por lotes (`consultas.cargar_eventos`)
+  -> `orjson`, sin validar (`respuestas.json_directo`).
+
+Uso:
+    python benchmarks/bench_serializacion.py --eventos 10000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import TypeAdapter
+
+import consultas
+import database
+import migraciones
+import models
+import respuestas
+import schemas
+
+
+def preparar_datos(eventos: int):
+    migraciones.aplicar(database.engine)
+    db = database.SessionLocal()
+    try:
+        inicio = date.today()
+        for i in range(eventos):
+            evento = models.Evento(
+                nombre=f"Evento {i}",
+                fecha=inicio + timedelta(days=i % 365),
+                tipo="cumpleaños",
+                ubicacion="Salón",
+                horario_colorin="10:00",
+                notas="Traer material"
+            )
+            evento.actividad = ["Slime", "Mini cheffs"]
+            db.add(evento)
+        db.commit()
+    finally:
+        db.close()
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Mejor tiempo de `repeticiones` corridas, en segundos"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    preparar_datos(args.eventos)
+    adaptador = TypeAdapter(List[schemas.EventoDetalle])
+    db = database.SessionLocal()
+
+    def anterior_carga():
+        db.expunge_all()
+        eventos = db.scalars(consultas.eventos_stmt().options(*consultas.opciones_include_eventos(set()))).all()
+        return [consultas.evento_a_dict(evento) for evento in eventos]
+
+    def anterior_serializa(datos):
+        validados = adaptador.validate_python(datos)
+        contenido = adaptador.dump_python(validados, mode="json", exclude_unset=True)
+        return json.dumps(contenido, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def actual_carga():
+        filas = [dict(fila) for fila in db.execute(consultas.eventos_filas_stmt()).mappings()]
+        return consultas.cargar_eventos(db, filas)
+
+    def actual_serializa(datos):
+        return respuestas.RespuestaJSON(datos).body
+
+    datos_anterior = anterior_carga()
+    datos_actual = actual_carga()
+    assert json.loads(anterior_serializa(datos_anterior)) == json.loads(actual_serializa(datos_actual))
+
+    etapas = [
+        ("anterior: ORM + dict", anterior_carga),
+        ("anterior: response_model + json", lambda: anterior_serializa(datos_anterior)),
+        ("anterior: total", lambda: anterior_serializa(anterior_carga())),
+        ("actual: filas + actividades por lotes", actual_carga),
+        (f"actual: {respuestas.RespuestaJSON.__name__}", lambda: actual_serializa(datos_actual)),
+        ("actual: total", lambda: actual_serializa(actual_carga())),
+    ]
+
+    print(f"{args.eventos} eventos, mejor de {args.repeticiones}")
+    print(f"{'etapa':<42}{'total ms':>10}{'us/fila':>10}")
+    for nombre, funcion in etapas:
+        segundos = medir(funcion, args.repeticiones)
+        print(f"{nombre:<42}{segundos * 1000:>10.1f}{segundos / args.eventos * 1e6:>10.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_bench()
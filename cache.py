@@ -0,0 +1,66 @@
+"""
+Caché en memoria con expiración (TTL) y desalojo LRU.
+
+Se usa para evitar lecturas repetidas a la base de datos de datos que cambian
+muy poco (usuarios autenticados, reportes, etc.). Es segura entre hilos porque
+los endpoints síncronos de FastAPI se ejecutan en un threadpool.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+import time
+
+
+class TTLCache:
+    """Caché acotada por cantidad de entradas y por tiempo de vida"""
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: float = 60.0):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Devolver el valor guardado o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira <= time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any, ttl_segundos: Optional[float] = None):
+        """Guardar un valor; el TTL puede acortarse por entrada"""
+        if self.max_entradas <= 0:
+            return
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave: Hashable):
+        """Eliminar una entrada"""
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def invalidar_si(self, condicion: Callable[[Hashable, Any], bool]):
+        """Eliminar todas las entradas que cumplan la condición (clave, valor)"""
+        with self._lock:
+            for clave in [c for c, (_, v) in self._datos.items() if condicion(c, v)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        """Vaciar la caché"""
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
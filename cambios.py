@@ -0,0 +1,296 @@
+"""
+Versiones de cambio por tabla y GET condicional (ETag / If-None-Match).
+
+Cada sesión anota qué tablas escribió (eventos del mapper para los objetos y
+`do_orm_execute` para INSERT/UPDATE/DELETE directos) e incrementa la versión de
+cada una en la tabla `versiones_tablas`. Con SQLite va dentro de la misma
+transacción (las escrituras ya van de a una). Con PostgreSQL la transacción del
+escritor no toca esas filas: después del commit, los requests que confirmaron a
+la vez juntan sus tablas y uno solo las incrementa en una transacción corta
+(group commit), así las escrituras sobre una misma tabla no esperan el lock de
+su fila de versión hasta que termine el commit de la anterior.
+
+Los endpoints de lectura derivan su ETag de las versiones de las tablas que
+leen, así que un `If-None-Match` que coincide se contesta con 304 sin calcular
+la respuesta. Las versiones se leen de una copia en memoria de la tabla
+completa: un commit de este proceso la descarta en el acto y las de otros
+procesos y réplicas se ven cuando vence (`CAMBIOS_VERSIONES_TTL_SECONDS`). Las
+escrituras que no pasan por una `Session` (SQL directo sobre el engine) no
+cambian las versiones.
+"""
+from datetime import date
+from threading import Condition, Lock
+from typing import Callable, Iterable, Optional
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.orm import Session, object_session
+import hashlib
+import logging
+import os
+import time
+import auth
+import database
+import models
+
+logger = logging.getLogger(__name__)
+
+HTTP_ETAGS = os.getenv("HTTP_ETAGS", "1").lower() in ("1", "true", "si", "yes")
+# Segundos que se reutiliza la copia en memoria de las versiones; 0 las lee en cada request
+CAMBIOS_VERSIONES_TTL_SECONDS = float(os.getenv("CAMBIOS_VERSIONES_TTL_SECONDS", "1"))
+
+_CLAVE_SESION = "tablas_modificadas"
+_CLAVE_CONFIRMADAS = "tablas_confirmadas"
+_TABLA_VERSIONES = models.VersionTabla.__tablename__
+_TODAS = select(models.VersionTabla.tabla, models.VersionTabla.version)
+
+# Copia de versiones_tablas (tabla -> versión). Cada commit incrementa la generación;
+# una lectura que empezó antes no se guarda, así no vuelve a quedar la copia vieja.
+_versiones: dict = {}
+_versiones_leidas_en = 0.0
+_generacion = 0
+_versiones_lock = Lock()
+
+
+def _copia_vigente() -> Optional[dict]:
+    with _versiones_lock:
+        if time.monotonic() - _versiones_leidas_en < CAMBIOS_VERSIONES_TTL_SECONDS:
+            return _versiones
+    return None
+
+
+def _guardar_copia(guardadas: dict, generacion: int, inicio: float):
+    global _versiones, _versiones_leidas_en
+    with _versiones_lock:
+        if generacion == _generacion:
+            _versiones, _versiones_leidas_en = guardadas, inicio
+
+
+def descartar_copia():
+    """Forzar que la próxima lectura de versiones vaya a la base"""
+    global _generacion, _versiones_leidas_en
+    with _versiones_lock:
+        _generacion += 1
+        _versiones_leidas_en = 0.0
+
+
+def versiones(tablas: Iterable[str]) -> tuple:
+    """Versiones actuales de las tablas (confirmadas en la base), en el orden pedido"""
+    guardadas = _copia_vigente()
+    if guardadas is None:
+        generacion, inicio = _generacion, time.monotonic()
+        with database.engine.connect() as conn:
+            guardadas = dict(conn.execute(_TODAS).all())
+        _guardar_copia(guardadas, generacion, inicio)
+    return tuple(guardadas.get(tabla, 0) for tabla in tablas)
+
+
+async def versiones_async(tablas: Iterable[str]) -> tuple:
+    """Como `versiones`, leyendo con el motor asíncrono (sin ocupar un hilo del threadpool)"""
+    if database.async_engine is None:
+        return await run_in_threadpool(versiones, list(tablas))
+    guardadas = _copia_vigente()
+    if guardadas is None:
+        generacion, inicio = _generacion, time.monotonic()
+        async with database.async_engine.connect() as conn:
+            guardadas = dict((await conn.execute(_TODAS)).all())
+        _guardar_copia(guardadas, generacion, inicio)
+    return tuple(guardadas.get(tabla, 0) for tabla in tablas)
+
+
+def marcar(sesion: Session, tabla: str):
+    """Anotar que la transacción de `sesion` escribió en `tabla`"""
+    if tabla != _TABLA_VERSIONES:
+        sesion.info.setdefault(_CLAVE_SESION, set()).add(tabla)
+
+
+def _incrementar(sesion: Session, tablas: Iterable[str]):
+    """Sumar 1 a la versión de cada tabla (en orden, para que dos transacciones no se bloqueen cruzadas)"""
+    filas = [{"tabla": tabla, "version": 1} for tabla in sorted(tablas)]
+    stmt = database.insert_con_conflictos(sesion, models.VersionTabla)
+    if stmt is not None:
+        sesion.execute(stmt.on_conflict_do_update(
+            index_elements=[models.VersionTabla.tabla],
+            set_={"version": models.VersionTabla.version + 1}
+        ), filas)
+        return
+    for fila in filas:
+        actualizadas = sesion.execute(update(models.VersionTabla).where(
+            models.VersionTabla.tabla == fila["tabla"]
+        ).values(version=models.VersionTabla.version + 1)).rowcount
+        if not actualizadas:
+            sesion.add(models.VersionTabla(**fila))
+    sesion.flush()
+
+
+@event.listens_for(models.Base, "after_insert", propagate=True)
+@event.listens_for(models.Base, "after_update", propagate=True)
+@event.listens_for(models.Base, "after_delete", propagate=True)
+def _marcar_objeto(mapper, connection, target):
+    sesion = object_session(target)
+    if sesion is not None:
+        marcar(sesion, mapper.local_table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_sentencia(orm_execute_state):
+    """INSERT/UPDATE/DELETE ejecutados directamente (upserts, borrados masivos)"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        marcar(orm_execute_state.session, orm_execute_state.statement.table.name)
+
+
+class _Publicador:
+    """Incrementos de versión después del commit, en rondas (uno publica, los demás esperan)"""
+
+    def __init__(self, url):
+        # Motor propio de una conexión: solo lo usa quien publica, no compite con el pool
+        # de los requests (que todavía tienen su conexión mientras esperan su ronda)
+        self.engine = create_engine(url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        self._condicion = Condition()
+        self._pendientes: set = set()
+        self._iniciadas = 0
+        self._terminadas = 0
+        self._publicando = False
+
+    def publicar(self, tablas: Iterable[str]):
+        """Volver cuando las versiones de `tablas` ya estén incrementadas en la base"""
+        with self._condicion:
+            self._pendientes.update(tablas)
+            # La ronda en curso (si hay) ya tomó sus tablas: estas van en la siguiente
+            objetivo = self._iniciadas + 1
+            while self._terminadas < objetivo:
+                if not self._publicando:
+                    break
+                self._condicion.wait()
+            else:
+                return
+            self._publicando = True
+            self._iniciadas += 1
+            ronda, lote, self._pendientes = self._iniciadas, self._pendientes, set()
+        try:
+            with Session(self.engine) as sesion:
+                _incrementar(sesion, lote)
+                sesion.commit()
+        except Exception:
+            logger.exception("No se pudieron incrementar las versiones de %s", ", ".join(sorted(lote)))
+        finally:
+            with self._condicion:
+                self._terminadas = ronda
+                self._publicando = False
+                self._condicion.notify_all()
+
+
+_publicadores: dict = {}
+_publicadores_lock = Lock()
+
+
+def _publicador(engine) -> _Publicador:
+    with _publicadores_lock:
+        if engine.url not in _publicadores:
+            _publicadores[engine.url] = _Publicador(engine.url)
+        return _publicadores[engine.url]
+
+
+def _en_la_transaccion(sesion: Session) -> bool:
+    """SQLite escribe de a una transacción: sumar ahí no agrega esperas y evita otro commit"""
+    return sesion.get_bind().dialect.name == "sqlite"
+
+
+@event.listens_for(Session, "before_commit")
+def _publicar_cambios(sesion):
+    # El RELEASE de un SAVEPOINT también pasa por acá: las versiones van en la transacción de afuera
+    if sesion.in_nested_transaction():
+        return
+    # Lo pendiente se escribe ahora para que sus tablas queden anotadas
+    sesion.flush()
+    tablas = sesion.info.pop(_CLAVE_SESION, None)
+    if not tablas:
+        return
+    if _en_la_transaccion(sesion):
+        _incrementar(sesion, tablas)
+        tablas = ()
+    sesion.info[_CLAVE_CONFIRMADAS] = tablas
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_confirmados(sesion):
+    tablas = sesion.info.pop(_CLAVE_CONFIRMADAS, None)
+    if tablas is None:
+        return
+    if tablas:
+        # Entre el commit y el incremento un ETag viejo todavía puede dar 304
+        _publicador(sesion.get_bind().engine).publicar(tablas)
+    descartar_copia()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(sesion):
+    sesion.info.pop(_CLAVE_SESION, None)
+    sesion.info.pop(_CLAVE_CONFIRMADAS, None)
+
+
+def _etag(valores: tuple, *extra) -> str:
+    datos = "|".join(map(str, (*valores, *extra)))
+    return 'W/"' + hashlib.blake2b(datos.encode(), digest_size=8).hexdigest() + '"'
+
+
+def etag(tablas: Iterable[str], *extra) -> str:
+    """ETag débil para un recurso que depende de `tablas` (y de `extra`, ej. usuario o fecha)"""
+    return _etag(versiones(tablas), *extra)
+
+
+async def etag_async(tablas: Iterable[str], *extra) -> str:
+    """Como `etag`, con las versiones leídas por el motor asíncrono"""
+    return _etag(await versiones_async(tablas), *extra)
+
+
+def _coincide(if_none_match: str, valor: str) -> bool:
+    candidatos = {c.strip() for c in if_none_match.split(",")}
+    return "*" in candidatos or valor in candidatos or valor[2:] in candidatos
+
+
+def _leidas(request: Request, tablas: tuple, segun_include: Optional[dict]) -> list:
+    leidas = list(tablas)
+    if segun_include:
+        for valor in request.query_params.get("include", "").split(","):
+            leidas.extend(segun_include.get(valor.strip(), ()))
+    return sorted(set(leidas))
+
+
+def _responder(request: Request, response: Response, valor: str) -> str:
+    cabeceras = {"ETag": valor, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _coincide(if_none_match, valor):
+        raise HTTPException(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return valor
+
+
+def condicional(*tablas: str, por_fecha: bool = False, segun_include: Optional[dict] = None,
+                usuario_actual: Callable = auth.get_current_active_admin):
+    """Dependencia de GET condicional para un endpoint que lee `tablas`.
+
+    `segun_include` agrega las tablas que se leen solo con `?include=valor`. El
+    ETag incluye al usuario (las respuestas pueden depender de él) y, con
+    `por_fecha`, el día de hoy para los reportes de eventos futuros. Si coincide
+    con `If-None-Match` responde 304 sin ejecutar el endpoint.
+    """
+    def dependencia(request: Request, response: Response, current_user: auth.UsuarioActual = Depends(usuario_actual)):
+        if not HTTP_ETAGS:
+            return None
+        extra = (current_user.id, date.today()) if por_fecha else (current_user.id,)
+        return _responder(request, response, etag(_leidas(request, tablas, segun_include), *extra))
+
+    return dependencia
+
+
+def condicional_async(*tablas: str, por_fecha: bool = False, segun_include: Optional[dict] = None,
+                      usuario_actual: Callable = auth.get_current_active_admin_async):
+    """Como `condicional`, para los endpoints de /async: corre en el event loop, no en el threadpool"""
+    async def dependencia(request: Request, response: Response, current_user: auth.UsuarioActual = Depends(usuario_actual)):
+        if not HTTP_ETAGS:
+            return None
+        extra = (current_user.id, date.today()) if por_fecha else (current_user.id,)
+        return _responder(request, response, await etag_async(_leidas(request, tablas, segun_include), *extra))
+
+    return dependencia
@@ -0,0 +1,291 @@
+"""
+Carga de trabajo materializada por profesor (tablas `carga_profesores` y
+`resumen_asignaciones`) y eventos por fecha (`eventos_por_fecha`).
+
+`carga_profesores` guarda cuántas asignaciones tiene un profesor en eventos de
+una fecha; `resumen_asignaciones` las mismas asignaciones sumadas por semana y
+por mes y por tipo de evento; `eventos_por_fecha` cuántos eventos hay cada día.
+Las operaciones de escritura las ajustan en la misma transacción en que cambian
+asignaciones o eventos, así los reportes, el dashboard y la asignación automática
+leen rangos chicos en vez de recorrer todo el historial.
+
+    python carga.py --verificar    # comparar con las asignaciones reales
+    python carga.py --reconstruir  # recalcular las tablas completas
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+import database
+import models
+
+Ajuste = Tuple[int, date, int]  # (profesor_id, fecha, delta)
+AjusteResumen = Tuple[int, date, str, int]  # (profesor_id, fecha, tipo, delta)
+
+PERIODOS = ("semana", "mes")
+
+
+def inicio_periodo(fecha: date, periodo: str) -> date:
+    """Lunes de la semana o día 1 del mes de `fecha`"""
+    if periodo == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    return fecha.replace(day=1)
+
+
+def siguiente_periodo(inicio: date, periodo: str) -> date:
+    """Inicio del período que sigue al que empieza en `inicio`"""
+    if periodo == "semana":
+        return inicio + timedelta(days=7)
+    return (inicio + timedelta(days=32)).replace(day=1)
+
+
+def _sumar(db: Session, modelo, columnas: Tuple[str, ...], deltas: Dict[tuple, int]):
+    """Sumar `deltas` (clave -> delta) a la columna total de `modelo` y borrar las filas en cero"""
+    deltas = {clave: delta for clave, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    filas = [{**dict(zip(columnas, clave)), "total": delta} for clave, delta in deltas.items()]
+    stmt = database.insert_con_conflictos(db, modelo)
+    if stmt is not None:
+        # Incremento atómico: dos transacciones concurrentes no pisan sus conteos
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[getattr(modelo, columna) for columna in columnas],
+            set_={"total": modelo.total + stmt.excluded.total}
+        ), filas)
+    else:
+        for fila in filas:
+            actualizadas = db.execute(update(modelo).where(
+                *[getattr(modelo, columna) == fila[columna] for columna in columnas]
+            ).values(total=modelo.total + fila["total"])).rowcount
+            if not actualizadas:
+                db.add(modelo(**fila))
+        db.flush()
+
+    # No guardar filas en cero
+    db.execute(delete(modelo).where(
+        modelo.total <= 0,
+        tuple_(*[getattr(modelo, columna) for columna in columnas]).in_(list(deltas))
+    ))
+
+
+def ajustar(db: Session, ajustes: Iterable[Ajuste]):
+    """Sumar (o restar) asignaciones a la carga de cada (profesor, fecha)"""
+    deltas = Counter()
+    for profesor_id, fecha, delta in ajustes:
+        deltas[(profesor_id, fecha)] += delta
+    _sumar(db, models.CargaProfesor, ("profesor_id", "fecha"), deltas)
+
+
+def ajustar_resumen(db: Session, ajustes: Iterable[AjusteResumen]):
+    """Sumar (o restar) asignaciones a la semana y al mes de cada (profesor, fecha, tipo)"""
+    deltas = Counter()
+    for profesor_id, fecha, tipo, delta in ajustes:
+        for periodo in PERIODOS:
+            deltas[(periodo, inicio_periodo(fecha, periodo), profesor_id, tipo)] += delta
+    _sumar(db, models.ResumenAsignaciones, ("periodo", "inicio", "profesor_id", "tipo"), deltas)
+
+
+def contar_eventos(db: Session, ajustes: Iterable[Tuple[date, int]]):
+    """Sumar (o restar) eventos al conteo de cada fecha"""
+    deltas = Counter()
+    for fecha, delta in ajustes:
+        deltas[(fecha,)] += delta
+    _sumar(db, models.EventosPorFecha, ("fecha",), deltas)
+
+
+def sumar_asignaciones(db: Session, asignaciones: List[models.Asignacion], delta: int = 1):
+    """Ajustar la carga por asignaciones insertadas (delta=1) o borradas (delta=-1)"""
+    if not asignaciones:
+        return
+    eventos = {
+        evento_id: (fecha, tipo)
+        for evento_id, fecha, tipo in db.execute(
+            select(models.Evento.id, models.Evento.fecha, models.Evento.tipo).where(
+                models.Evento.id.in_({a.evento_id for a in asignaciones})
+            )
+        )
+    }
+    asignaciones = [a for a in asignaciones if a.evento_id in eventos]
+    ajustar(db, [(a.profesor_id, eventos[a.evento_id][0], delta) for a in asignaciones])
+    ajustar_resumen(db, [(a.profesor_id, *eventos[a.evento_id], delta) for a in asignaciones])
+
+
+def _profesores_del_evento(db: Session, evento_id: int) -> List[int]:
+    return db.scalars(
+        select(models.Asignacion.profesor_id).where(models.Asignacion.evento_id == evento_id)
+    ).all()
+
+
+def mover_evento(db: Session, evento_id: int, fecha_anterior: date, tipo_anterior: str,
+                 fecha_nueva: date, tipo_nuevo: str):
+    """Pasar el evento y la carga de sus profesores a su nueva fecha y tipo"""
+    if (fecha_anterior, tipo_anterior) == (fecha_nueva, tipo_nuevo):
+        return
+    profesores = _profesores_del_evento(db, evento_id)
+    if fecha_anterior != fecha_nueva:
+        contar_eventos(db, [(fecha_anterior, -1), (fecha_nueva, 1)])
+        ajustar(db, [(p, fecha_anterior, -1) for p in profesores] + [(p, fecha_nueva, 1) for p in profesores])
+    ajustar_resumen(
+        db,
+        [(p, fecha_anterior, tipo_anterior, -1) for p in profesores]
+        + [(p, fecha_nueva, tipo_nuevo, 1) for p in profesores]
+    )
+
+
+def quitar_evento(db: Session, evento_id: int, fecha: date, tipo: str):
+    """Descontar el evento y la carga de todas sus asignaciones (antes de borrarlos)"""
+    contar_eventos(db, [(fecha, -1)])
+    profesores = _profesores_del_evento(db, evento_id)
+    ajustar(db, [(p, fecha, -1) for p in profesores])
+    ajustar_resumen(db, [(p, fecha, tipo, -1) for p in profesores])
+
+
+# ========== CONSISTENCIA ==========
+
+def carga_real_stmt():
+    """Carga calculada desde asignaciones y eventos (lo que la tabla debería contener)"""
+    return select(
+        models.Asignacion.profesor_id,
+        models.Evento.fecha,
+        func.count(models.Asignacion.id)
+    ).join(
+        models.Evento, models.Asignacion.evento_id == models.Evento.id
+    ).group_by(models.Asignacion.profesor_id, models.Evento.fecha)
+
+
+def resumen_real_stmt():
+    """Asignaciones por profesor, fecha y tipo de evento (la base del resumen por período)"""
+    return select(
+        models.Asignacion.profesor_id,
+        models.Evento.fecha,
+        models.Evento.tipo,
+        func.count(models.Asignacion.id)
+    ).join(
+        models.Evento, models.Asignacion.evento_id == models.Evento.id
+    ).group_by(models.Asignacion.profesor_id, models.Evento.fecha, models.Evento.tipo)
+
+
+def resumen_real(db: Session) -> Counter:
+    """Lo que `resumen_asignaciones` debería contener: (periodo, inicio, profesor, tipo) -> total"""
+    # El inicio de cada período se calcula acá para no depender de las funciones de fecha del motor
+    totales = Counter()
+    for profesor_id, fecha, tipo, total in db.execute(resumen_real_stmt()):
+        for periodo in PERIODOS:
+            totales[(periodo, inicio_periodo(fecha, periodo), profesor_id, tipo)] += total
+    return totales
+
+
+def eventos_real_stmt():
+    """Eventos por fecha contados sobre la tabla (lo que `eventos_por_fecha` debería contener)"""
+    return select(models.Evento.fecha, func.count()).group_by(models.Evento.fecha)
+
+
+def _diferencias(tabla: str, columnas: Tuple[str, ...], real: dict, guardada: dict) -> List[dict]:
+    return [
+        {"tabla": tabla, **dict(zip(columnas, clave)), "esperado": real.get(clave, 0), "guardado": guardada.get(clave, 0)}
+        for clave in sorted(set(real) | set(guardada))
+        if real.get(clave, 0) != guardada.get(clave, 0)
+    ]
+
+
+def verificar(db: Session) -> dict:
+    """Comparar las tablas con el conteo real de asignaciones y eventos"""
+    real = {(p, f): total for p, f, total in db.execute(carga_real_stmt())}
+    guardada = {
+        (p, f): total
+        for p, f, total in db.execute(select(
+            models.CargaProfesor.profesor_id, models.CargaProfesor.fecha, models.CargaProfesor.total
+        ))
+    }
+    resumen = models.ResumenAsignaciones
+    guardado_resumen = {
+        (periodo, inicio, p, tipo): total
+        for periodo, inicio, p, tipo, total in db.execute(select(
+            resumen.periodo, resumen.inicio, resumen.profesor_id, resumen.tipo, resumen.total
+        ))
+    }
+    eventos_real = {(fecha,): total for fecha, total in db.execute(eventos_real_stmt())}
+    guardado_eventos = {
+        (fecha,): total
+        for fecha, total in db.execute(select(models.EventosPorFecha.fecha, models.EventosPorFecha.total))
+    }
+    diferencias = (
+        _diferencias("carga_profesores", ("profesor_id", "fecha"), real, guardada)
+        + _diferencias("resumen_asignaciones", ("periodo", "inicio", "profesor_id", "tipo"),
+                       resumen_real(db), guardado_resumen)
+        + _diferencias("eventos_por_fecha", ("fecha",), eventos_real, guardado_eventos)
+    )
+    return {
+        "consistente": not diferencias,
+        "filas": len(guardada),
+        "filas_resumen": len(guardado_resumen),
+        "filas_eventos": len(guardado_eventos),
+        "diferencias": diferencias[:100],
+        "total_diferencias": len(diferencias),
+    }
+
+
+def reconstruir_resumen(db: Session) -> int:
+    """Recalcular `resumen_asignaciones` desde asignaciones y eventos (no confirma)"""
+    db.execute(delete(models.ResumenAsignaciones))
+    filas = [
+        {"periodo": periodo, "inicio": inicio, "profesor_id": profesor_id, "tipo": tipo, "total": total}
+        for (periodo, inicio, profesor_id, tipo), total in resumen_real(db).items()
+    ]
+    if filas:
+        db.execute(models.ResumenAsignaciones.__table__.insert(), filas)
+    return len(filas)
+
+
+def reconstruir(db: Session) -> int:
+    """Recalcular las tablas completas desde asignaciones y eventos (no confirma)"""
+    db.execute(delete(models.CargaProfesor))
+    db.execute(models.CargaProfesor.__table__.insert().from_select(
+        ["profesor_id", "fecha", "total"], carga_real_stmt()
+    ))
+    reconstruir_resumen(db)
+    db.execute(delete(models.EventosPorFecha))
+    db.execute(models.EventosPorFecha.__table__.insert().from_select(["fecha", "total"], eventos_real_stmt()))
+    return db.scalar(select(func.count()).select_from(models.CargaProfesor))
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Verificar o reconstruir carga_profesores, resumen_asignaciones y eventos_por_fecha"
+    )
+    parser.add_argument("--verificar", action="store_true", help="comparar con las asignaciones (por defecto)")
+    parser.add_argument("--reconstruir", action="store_true", help="recalcular las tablas completas")
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        if args.reconstruir:
+            filas = reconstruir(db)
+            db.commit()
+            print(f"✓ Carga reconstruida: {filas} filas")
+        else:
+            resultado = verificar(db)
+            if resultado["consistente"]:
+                print(f"✓ La carga es consistente ({resultado['filas']} filas, "
+                      f"{resultado['filas_resumen']} en el resumen, {resultado['filas_eventos']} fechas con eventos)")
+            else:
+                print(f"ERROR: {resultado['total_diferencias']} diferencias")
+                for diferencia in resultado["diferencias"]:
+                    if diferencia["tabla"] == "eventos_por_fecha":
+                        print(f"  eventos_por_fecha: {diferencia['fecha']}: "
+                              f"esperado {diferencia['esperado']}, guardado {diferencia['guardado']}")
+                        continue
+                    if diferencia["tabla"] == "carga_profesores":
+                        donde = diferencia["fecha"]
+                    else:
+                        donde = f"{diferencia['periodo']} {diferencia['inicio']} {diferencia['tipo']}"
+                    print(f"  {diferencia['tabla']}: profesor {diferencia['profesor_id']} {donde}: "
+                          f"esperado {diferencia['esperado']}, guardado {diferencia['guardado']}")
+                sys.exit(1)
+    finally:
+        db.close()
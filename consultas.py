@@ -0,0 +1,667 @@
+"""
+Consultas compartidas entre los endpoints síncronos (main.py) y asíncronos (async_api.py).
+
+Cada función arma un `select()` de SQLAlchemy 2.0 que sirve tanto para
+`Session.execute` como para `AsyncSession.execute`, y las funciones `armar_*`
+convierten las filas en la respuesta del endpoint.
+"""
+from datetime import date, time, timedelta
+from typing import List, Optional
+from sqlalchemy import Date, and_, func, literal, or_, select, union_all
+from fastapi import HTTPException
+from sqlalchemy.orm import selectinload
+import carga
+import models
+import paginacion
+
+
+INCLUDES_EVENTO = ("asignaciones", "profesores")
+# Tablas que se leen además de eventos/evento_actividades según el include (para los ETags)
+TABLAS_INCLUDE_EVENTOS = {"asignaciones": ("asignaciones",), "profesores": ("asignaciones", "profesores")}
+
+
+def parsear_include(include: Optional[str], permitidos) -> set:
+    """Interpretar `?include=a,b`; un valor desconocido es un 400"""
+    if not include:
+        return set()
+    incluir = {valor.strip() for valor in include.split(",") if valor.strip()}
+    desconocidos = incluir - set(permitidos)
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"include inválido: {', '.join(sorted(desconocidos))}. Valores posibles: {', '.join(permitidos)}"
+        )
+    return incluir
+
+
+def include_eventos(include: Optional[str]) -> set:
+    """Relaciones pedidas para /eventos/ (los profesores van dentro de las asignaciones)"""
+    incluir = parsear_include(include, INCLUDES_EVENTO)
+    if "profesores" in incluir:
+        incluir.add("asignaciones")
+    return incluir
+
+
+def opciones_include_eventos(incluir: set) -> list:
+    """Cargar las actividades y las relaciones pedidas con una consulta IN por relación, sin importar cuántos eventos haya"""
+    opciones = [selectinload(models.Evento.actividades)]
+    if "profesores" in incluir:
+        opciones.append(selectinload(models.Evento.asignaciones).selectinload(models.Asignacion.profesor))
+    elif "asignaciones" in incluir:
+        opciones.append(selectinload(models.Evento.asignaciones))
+    return opciones
+
+
+def profesor_a_dict(profesor: models.Profesor) -> dict:
+    return {"id": profesor.id, "nombre": profesor.nombre, "activo": profesor.activo}
+
+
+def asignacion_a_dict(asignacion: models.Asignacion, con_profesor: bool = False) -> dict:
+    datos = {
+        "id": asignacion.id,
+        "profesor_id": asignacion.profesor_id,
+        "evento_id": asignacion.evento_id,
+        "rol": asignacion.rol,
+    }
+    if con_profesor:
+        datos["profesor"] = profesor_a_dict(asignacion.profesor)
+    return datos
+
+
+def evento_a_dict(evento: models.Evento, incluir: set = frozenset()) -> dict:
+    """Convertir un evento a dict.
+
+    Las actividades y las relaciones de `incluir` tienen que estar cargadas (ver
+    `opciones_include_eventos`); las relaciones que no se piden no aparecen en el dict.
+    """
+    datos = {
+        "id": evento.id,
+        "nombre": evento.nombre,
+        "fecha": evento.fecha,
+        "tipo": evento.tipo,
+        "ubicacion": evento.ubicacion,
+        "horario_colorin": evento.horario_colorin,
+        "horario_cumpleanos": evento.horario_cumpleanos,
+        "hora_colorin": evento.hora_colorin,
+        "hora_cumpleanos": evento.hora_cumpleanos,
+        "actividad": evento.actividad,
+        "notas": evento.notas,
+    }
+    if "asignaciones" in incluir:
+        con_profesor = "profesores" in incluir
+        datos["asignaciones"] = [
+            asignacion_a_dict(asignacion, con_profesor)
+            for asignacion in sorted(evento.asignaciones, key=lambda a: a.id)
+        ]
+    return datos
+
+
+# ---------- Listado de eventos por filas ----------
+# Los listados leen columnas en lugar de objetos ORM y completan actividades y
+# asignaciones con una consulta IN por lote de eventos; es lo mismo que hace
+# selectinload, sin el costo de construir un objeto por fila.
+
+LOTE_IN = 500
+
+
+def lotes(ids: list, tamano: int = LOTE_IN):
+    """Partir `ids` en lotes para no pasar el límite de parámetros por consulta"""
+    for inicio in range(0, len(ids), tamano):
+        yield ids[inicio:inicio + tamano]
+
+
+def eventos_filas_stmt(*filtros):
+    """Como `eventos_stmt` pero devolviendo las columnas de la tabla (ver `cargar_eventos`)"""
+    columnas = [columna for columna in models.Evento.__table__.c if columna.name != "hora_orden"]
+    return eventos_stmt(*filtros).with_only_columns(*columnas)
+
+
+def actividades_de_eventos_stmt(evento_ids: list):
+    return select(
+        models.EventoActividad.evento_id,
+        models.EventoActividad.nombre
+    ).where(
+        models.EventoActividad.evento_id.in_(evento_ids)
+    ).order_by(models.EventoActividad.evento_id, models.EventoActividad.posicion)
+
+
+def asignaciones_de_eventos_stmt(evento_ids: list, con_profesor: bool = False):
+    columnas = [
+        models.Asignacion.id,
+        models.Asignacion.profesor_id,
+        models.Asignacion.evento_id,
+        models.Asignacion.rol,
+    ]
+    stmt = select(*columnas)
+    if con_profesor:
+        stmt = stmt.add_columns(
+            models.Profesor.nombre.label("profesor_nombre"),
+            models.Profesor.activo.label("profesor_activo")
+        ).join(models.Profesor, models.Asignacion.profesor_id == models.Profesor.id)
+    return stmt.where(models.Asignacion.evento_id.in_(evento_ids)).order_by(models.Asignacion.id)
+
+
+def armar_eventos(eventos: List[dict], actividades, asignaciones, incluir: set) -> List[dict]:
+    """Agregar a cada evento (dict de columnas) sus actividades y, si se pidieron, sus asignaciones"""
+    por_id = {}
+    for evento in eventos:
+        evento["actividad"] = []
+        if "asignaciones" in incluir:
+            evento["asignaciones"] = []
+        por_id[evento["id"]] = evento
+    for evento_id, nombre in actividades:
+        por_id[evento_id]["actividad"].append(nombre)
+    con_profesor = "profesores" in incluir
+    for fila in asignaciones:
+        asignacion = {"id": fila.id, "profesor_id": fila.profesor_id, "evento_id": fila.evento_id, "rol": fila.rol}
+        if con_profesor:
+            asignacion["profesor"] = {"id": fila.profesor_id, "nombre": fila.profesor_nombre, "activo": fila.profesor_activo}
+        por_id[fila.evento_id]["asignaciones"].append(asignacion)
+    return eventos
+
+
+def cargar_eventos(db, eventos: List[dict], incluir: set = frozenset()) -> List[dict]:
+    """Completar los eventos leídos con `eventos_filas_stmt` (ver `armar_eventos`)"""
+    ids = [evento["id"] for evento in eventos]
+    actividades, asignaciones = [], []
+    for lote in lotes(ids):
+        actividades += db.execute(actividades_de_eventos_stmt(lote)).all()
+        if "asignaciones" in incluir:
+            asignaciones += db.execute(asignaciones_de_eventos_stmt(lote, "profesores" in incluir)).all()
+    return armar_eventos(eventos, actividades, asignaciones, incluir)
+
+
+async def cargar_eventos_async(db, eventos: List[dict], incluir: set = frozenset()) -> List[dict]:
+    """Versión para AsyncSession de `cargar_eventos`"""
+    ids = [evento["id"] for evento in eventos]
+    actividades, asignaciones = [], []
+    for lote in lotes(ids):
+        actividades += (await db.execute(actividades_de_eventos_stmt(lote))).all()
+        if "asignaciones" in incluir:
+            asignaciones += (await db.execute(asignaciones_de_eventos_stmt(lote, "profesores" in incluir))).all()
+    return armar_eventos(eventos, actividades, asignaciones, incluir)
+
+
+def eventos_claves() -> List[paginacion.Clave]:
+    """Orden de /eventos/ (fecha, hora, id), también usado para paginar (índice ix_eventos_fecha_hora_orden)"""
+    return [
+        paginacion.Clave(models.Evento.fecha),
+        paginacion.Clave(models.Evento.hora_orden),
+        paginacion.Clave(models.Evento.id),
+    ]
+
+
+def tareas_claves() -> List[paginacion.Clave]:
+    """Orden de /tareas/: vencimiento (sin fecha al final), prioridad, más nuevas primero"""
+    return [
+        paginacion.Clave(func.coalesce(models.Tarea.fecha_vencimiento, literal(date.max, Date))),
+        paginacion.Clave(func.coalesce(models.Tarea.prioridad, ""), descendente=True),
+        paginacion.Clave(models.Tarea.creada_en, descendente=True),
+        paginacion.Clave(models.Tarea.id, descendente=True),
+    ]
+
+
+def eventos_stmt(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    tipo: Optional[str] = None,
+    actividad: Optional[str] = None,
+    hora_desde: Optional[time] = None,
+    hora_hasta: Optional[time] = None
+):
+    """Eventos filtrados por fechas, tipo, actividad y franja horaria, ordenados por fecha y hora"""
+    stmt = select(models.Evento)
+    if fecha_desde:
+        stmt = stmt.where(models.Evento.fecha >= fecha_desde)
+    if fecha_hasta:
+        stmt = stmt.where(models.Evento.fecha <= fecha_hasta)
+    if tipo:
+        stmt = stmt.where(models.Evento.tipo == tipo)
+    if actividad:
+        # EXISTS sobre el índice (nombre, evento_id) de evento_actividades
+        stmt = stmt.where(models.Evento.actividades.any(models.EventoActividad.nombre == actividad))
+    if hora_desde or hora_hasta:
+        # Alcanza con que uno de los dos horarios caiga en la franja; cada rama usa su índice (fecha, hora)
+        franjas = []
+        for hora in (models.Evento.hora_colorin, models.Evento.hora_cumpleanos):
+            condiciones = [hora.is_not(None)]
+            if hora_desde:
+                condiciones.append(hora >= hora_desde)
+            if hora_hasta:
+                condiciones.append(hora <= hora_hasta)
+            franjas.append(and_(*condiciones))
+        stmt = stmt.where(or_(*franjas))
+    return paginacion.ordenar(stmt, eventos_claves())
+
+
+def eventos_de_profesores_stmt(
+    profesor_ids: List[int],
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    limite: Optional[int] = None
+):
+    """Eventos asignados a varios profesores en una sola consulta, ordenados por fecha.
+
+    ROW_NUMBER() numera los eventos de cada profesor para cortar en `limite` por
+    profesor, y COUNT() OVER da el total del rango aunque se corte la lista.
+    """
+    particion = {"partition_by": models.Asignacion.profesor_id}
+    sub = select(
+        models.Asignacion.profesor_id,
+        models.Asignacion.id.label("asignacion_id"),
+        models.Asignacion.rol,
+        models.Evento.id,
+        models.Evento.nombre,
+        models.Evento.fecha,
+        models.Evento.tipo,
+        models.Evento.ubicacion,
+        func.row_number().over(**particion, order_by=(models.Evento.fecha, models.Evento.id)).label("posicion"),
+        func.count().over(**particion).label("total"),
+    ).join(
+        models.Evento, models.Asignacion.evento_id == models.Evento.id
+    ).where(models.Asignacion.profesor_id.in_(profesor_ids))
+    if fecha_desde:
+        sub = sub.where(models.Evento.fecha >= fecha_desde)
+    if fecha_hasta:
+        sub = sub.where(models.Evento.fecha <= fecha_hasta)
+    sub = sub.subquery()
+
+    stmt = select(sub)
+    if limite:
+        stmt = stmt.where(sub.c.posicion <= limite)
+    return stmt.order_by(sub.c.profesor_id, sub.c.posicion)
+
+
+def armar_profesores_con_eventos(profesores, filas) -> list:
+    """Agregar a cada profesor (dict de columnas) sus eventos (`eventos`) y el total del rango (`total_eventos`)"""
+    eventos = {profesor["id"]: [] for profesor in profesores}
+    totales = {}
+    for fila in filas:
+        totales[fila.profesor_id] = fila.total
+        eventos[fila.profesor_id].append({
+            "id": fila.id,
+            "nombre": fila.nombre,
+            "fecha": fila.fecha,
+            "tipo": fila.tipo,
+            "ubicacion": fila.ubicacion,
+            "asignacion_id": fila.asignacion_id,
+            "rol": fila.rol,
+        })
+    return [
+        {**profesor, "eventos": eventos[profesor["id"]], "total_eventos": totales.get(profesor["id"], 0)}
+        for profesor in profesores
+    ]
+
+
+# ========== REPORTES ==========
+
+def estadisticas_profesores_stmt(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+):
+    """Total de eventos por profesor, opcionalmente en un rango de fechas"""
+    # El rango va en el ON del join (no en el WHERE) para que los profesores sin
+    # eventos en el rango sigan apareciendo con total 0
+    condiciones_evento = [models.Asignacion.evento_id == models.Evento.id]
+    if fecha_desde:
+        condiciones_evento.append(models.Evento.fecha >= fecha_desde)
+    if fecha_hasta:
+        condiciones_evento.append(models.Evento.fecha <= fecha_hasta)
+
+    stmt = select(
+        models.Profesor.id,
+        models.Profesor.nombre,
+        models.Profesor.activo,
+        func.count(models.Evento.id).label('total_eventos')
+    ).outerjoin(
+        models.Asignacion, models.Profesor.id == models.Asignacion.profesor_id
+    ).outerjoin(
+        models.Evento, and_(*condiciones_evento)
+    )
+
+    return stmt.group_by(
+        models.Profesor.id,
+        models.Profesor.nombre,
+        models.Profesor.activo
+    ).order_by(models.Profesor.nombre)
+
+
+def armar_estadisticas_profesores(resultados) -> dict:
+    estadisticas = []
+    for prof_id, nombre, activo, total in resultados:
+        estadisticas.append({
+            "profesor_id": prof_id,
+            "nombre": nombre,
+            "activo": activo,
+            "total_eventos": total or 0
+        })
+
+    # Calcular estadísticas generales
+    total_eventos = sum(stat['total_eventos'] for stat in estadisticas)
+    promedio = total_eventos / len(estadisticas) if estadisticas else 0
+
+    return {
+        "estadisticas": estadisticas,
+        "resumen": {
+            "total_profesores": len(estadisticas),
+            "total_eventos_asignados": total_eventos,
+            "promedio_eventos_por_profesor": round(promedio, 2)
+        }
+    }
+
+
+def eventos_por_profesor_stmt(
+    profesor_id: int,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+):
+    """Eventos de un profesor junto con el rol de su asignación"""
+    stmt = select(models.Evento, models.Asignacion.rol).join(
+        models.Asignacion, models.Evento.id == models.Asignacion.evento_id
+    ).where(
+        models.Asignacion.profesor_id == profesor_id
+    )
+
+    if fecha_desde:
+        stmt = stmt.where(models.Evento.fecha >= fecha_desde)
+    if fecha_hasta:
+        stmt = stmt.where(models.Evento.fecha <= fecha_hasta)
+
+    return stmt.order_by(models.Evento.fecha)
+
+
+def armar_eventos_por_profesor(profesor: models.Profesor, filas) -> dict:
+    eventos_data = []
+    for evento, rol in filas:
+        eventos_data.append({
+            "evento_id": evento.id,
+            "nombre": evento.nombre,
+            "fecha": evento.fecha,
+            "tipo": evento.tipo,
+            "ubicacion": evento.ubicacion,
+            "rol": rol
+        })
+
+    return {
+        "profesor": {
+            "id": profesor.id,
+            "nombre": profesor.nombre,
+            "activo": profesor.activo
+        },
+        "total_eventos": len(eventos_data),
+        "eventos": eventos_data
+    }
+
+
+def actividades_stmt(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+):
+    """Cantidad de eventos por actividad, opcionalmente en un rango de fechas"""
+    stmt = select(
+        models.EventoActividad.nombre,
+        func.count(func.distinct(models.EventoActividad.evento_id)).label('total_eventos')
+    )
+    if fecha_desde or fecha_hasta:
+        stmt = stmt.join(models.Evento, models.EventoActividad.evento_id == models.Evento.id)
+        if fecha_desde:
+            stmt = stmt.where(models.Evento.fecha >= fecha_desde)
+        if fecha_hasta:
+            stmt = stmt.where(models.Evento.fecha <= fecha_hasta)
+    return stmt.group_by(models.EventoActividad.nombre).order_by(
+        func.count(func.distinct(models.EventoActividad.evento_id)).desc(),
+        models.EventoActividad.nombre
+    )
+
+
+def armar_actividades(resultados) -> dict:
+    actividades = [
+        {"actividad": nombre, "total_eventos": total}
+        for nombre, total in resultados
+    ]
+    return {
+        "actividades": actividades,
+        "total_actividades": len(actividades)
+    }
+
+
+def carga_futura_stmt(desde: Optional[date] = None):
+    """Asignaciones en eventos desde hoy (o `desde`) por profesor.
+
+    Los días que quedan del mes salen de `carga_profesores` y los meses siguientes
+    del resumen mensual de `resumen_asignaciones`: se leen como mucho un mes de
+    días y una fila por mes y tipo, no una por cada día con eventos a futuro.
+    """
+    desde = desde or date.today()
+    mes_siguiente = carga.siguiente_periodo(carga.inicio_periodo(desde, "mes"), "mes")
+    dias = select(models.CargaProfesor.profesor_id, models.CargaProfesor.total).where(
+        models.CargaProfesor.fecha >= desde,
+        models.CargaProfesor.fecha < mes_siguiente
+    )
+    resumen = models.ResumenAsignaciones
+    meses = select(resumen.profesor_id, resumen.total).where(
+        resumen.periodo == "mes",
+        resumen.inicio >= mes_siguiente
+    )
+    partes = union_all(dias, meses).subquery()
+    return select(
+        partes.c.profesor_id,
+        func.sum(partes.c.total).label('total')
+    ).group_by(partes.c.profesor_id)
+
+
+def distribucion_equitativa_stmt(desde: Optional[date] = None):
+    """Cantidad de eventos futuros por profesor activo (menos eventos primero)"""
+    carga = carga_futura_stmt(desde).subquery()
+    total = func.coalesce(carga.c.total, 0)
+    return select(
+        models.Profesor.id,
+        models.Profesor.nombre,
+        total.label('total_eventos')
+    ).outerjoin(
+        carga, models.Profesor.id == carga.c.profesor_id
+    ).where(
+        models.Profesor.activo == True
+    ).order_by(total.asc(), models.Profesor.id)
+
+
+def armar_distribucion_equitativa(resultados) -> dict:
+    distribucion = []
+    for prof_id, nombre, total in resultados:
+        distribucion.append({
+            "profesor_id": prof_id,
+            "nombre": nombre,
+            "total_eventos_futuros": total or 0
+        })
+
+    if distribucion:
+        min_eventos = min(d['total_eventos_futuros'] for d in distribucion)
+        max_eventos = max(d['total_eventos_futuros'] for d in distribucion)
+        diferencia = max_eventos - min_eventos
+
+        return {
+            "distribucion": distribucion,
+            "analisis": {
+                "minimo_eventos": min_eventos,
+                "maximo_eventos": max_eventos,
+                "diferencia": diferencia,
+                "es_equitativo": diferencia <= 1
+            }
+        }
+
+    return {
+        "distribucion": [],
+        "analisis": {
+            "mensaje": "No hay eventos futuros asignados"
+        }
+    }
+
+
+def analizar_equidad(totales: List[int]) -> dict:
+    """Métricas de equidad de una carga (eventos por profesor)"""
+    if not totales:
+        return {"mensaje": "No hay profesores activos"}
+    promedio = sum(totales) / len(totales)
+    varianza = sum((total - promedio) ** 2 for total in totales) / len(totales)
+    diferencia = max(totales) - min(totales)
+    return {
+        "minimo_eventos": min(totales),
+        "maximo_eventos": max(totales),
+        "promedio_eventos": round(promedio, 2),
+        "desviacion_estandar": round(varianza ** 0.5, 2),
+        "diferencia": diferencia,
+        "es_equitativo": diferencia <= 1
+    }
+
+
+def eventos_a_planificar_stmt(fecha_desde: date, fecha_hasta: date, tipo: Optional[str] = None):
+    """Eventos del rango en orden de fecha y hora (el orden en que se reparten)"""
+    stmt = select(models.Evento.id, models.Evento.nombre, models.Evento.fecha).where(
+        models.Evento.fecha >= fecha_desde,
+        models.Evento.fecha <= fecha_hasta
+    )
+    if tipo:
+        stmt = stmt.where(models.Evento.tipo == tipo)
+    return paginacion.ordenar(stmt, eventos_claves())
+
+
+# ========== SERIES POR PERÍODO ==========
+
+SERIES_MAX_PERIODOS = 400
+
+
+def periodos_serie(periodo: str, fecha_desde: date, fecha_hasta: date) -> List[date]:
+    """Inicios de todos los períodos (semanas o meses) que tocan el rango"""
+    if fecha_desde > fecha_hasta:
+        raise HTTPException(status_code=400, detail="fecha_desde debe ser anterior a fecha_hasta")
+    periodos = []
+    inicio = carga.inicio_periodo(fecha_desde, periodo)
+    while inicio <= fecha_hasta:
+        if len(periodos) == SERIES_MAX_PERIODOS:
+            raise HTTPException(
+                status_code=400, detail=f"El rango abarca más de {SERIES_MAX_PERIODOS} períodos"
+            )
+        periodos.append(inicio)
+        inicio = carga.siguiente_periodo(inicio, periodo)
+    return periodos
+
+
+def series_stmt(periodo: str, periodos: List[date], profesor_id: Optional[int] = None,
+                tipo: Optional[str] = None):
+    """Totales del resumen precalculado para los períodos pedidos"""
+    resumen = models.ResumenAsignaciones
+    stmt = select(resumen.inicio, resumen.profesor_id, resumen.tipo, resumen.total).where(
+        resumen.periodo == periodo,
+        resumen.inicio >= periodos[0],
+        resumen.inicio <= periodos[-1]
+    )
+    if profesor_id is not None:
+        stmt = stmt.where(resumen.profesor_id == profesor_id)
+    if tipo:
+        stmt = stmt.where(resumen.tipo == tipo)
+    return stmt
+
+
+def profesores_serie_stmt(profesor_id: Optional[int] = None):
+    stmt = select(models.Profesor.id, models.Profesor.nombre, models.Profesor.activo)
+    if profesor_id is not None:
+        stmt = stmt.where(models.Profesor.id == profesor_id)
+    return stmt.order_by(models.Profesor.nombre, models.Profesor.id)
+
+
+def armar_series(periodo: str, periodos: List[date], profesores, filas, tipo: Optional[str] = None) -> dict:
+    """Series por profesor y por tipo alineadas con `periodos` (los períodos sin asignaciones quedan en 0)"""
+    indice = {inicio: i for i, inicio in enumerate(periodos)}
+    vacia = [0] * len(periodos)
+    por_profesor = {
+        prof_id: {"profesor_id": prof_id, "nombre": nombre, "activo": activo, "total": 0,
+                  "serie": list(vacia), "por_tipo": {}}
+        for prof_id, nombre, activo in profesores
+    }
+    por_tipo = {tipo: {"tipo": tipo, "total": 0, "serie": list(vacia)}} if tipo else {}
+    totales = list(vacia)
+
+    for inicio, prof_id, tipo_evento, total in filas:
+        profesor = por_profesor.get(prof_id)
+        if profesor is None:
+            continue
+        i = indice[inicio]
+        profesor["serie"][i] += total
+        profesor["total"] += total
+        profesor["por_tipo"].setdefault(tipo_evento, list(vacia))[i] += total
+        serie_tipo = por_tipo.setdefault(tipo_evento, {"tipo": tipo_evento, "total": 0, "serie": list(vacia)})
+        serie_tipo["serie"][i] += total
+        serie_tipo["total"] += total
+        totales[i] += total
+
+    return {
+        "periodo": periodo,
+        "periodos": periodos,
+        "profesores": list(por_profesor.values()),
+        "tipos": sorted(por_tipo.values(), key=lambda t: (-t["total"], t["tipo"])),
+        "totales": totales,
+        "total": sum(totales)
+    }
+
+
+# ========== DASHBOARD ==========
+
+def _contar(entidad, *condiciones):
+    return select(func.count()).select_from(entidad).where(*condiciones).scalar_subquery()
+
+
+def _contar_eventos(*condiciones):
+    return select(
+        func.coalesce(func.sum(models.EventosPorFecha.total), 0)
+    ).where(*condiciones).scalar_subquery()
+
+
+def resumen_dashboard_stmt(hoy: date):
+    """Todos los números del dashboard en una sola consulta de subconsultas escalares.
+
+    Los eventos se suman desde `eventos_por_fecha` (una fila por día, no por evento)
+    y la equidad sale de la carga futura (ver `carga_futura_stmt`).
+    """
+    lunes = hoy - timedelta(days=hoy.weekday())
+    distribucion = distribucion_equitativa_stmt(hoy).order_by(None).subquery()
+    carga = distribucion.c.total_eventos
+    return select(
+        _contar(models.Profesor).label("profesores_total"),
+        _contar(models.Profesor, models.Profesor.activo == True).label("profesores_activos"),
+        _contar_eventos().label("eventos_total"),
+        _contar_eventos(models.EventosPorFecha.fecha >= hoy).label("eventos_proximos"),
+        _contar_eventos(
+            models.EventosPorFecha.fecha >= lunes, models.EventosPorFecha.fecha < lunes + timedelta(days=7)
+        ).label("eventos_semana"),
+        _contar(models.TareaEvento, models.TareaEvento.completada == False).label("tareas_evento_pendientes"),
+        # Agregados sobre la distribución (sin GROUP BY siempre hay una fila, aunque no haya profesores)
+        func.min(carga).label("minimo_eventos"),
+        func.max(carga).label("maximo_eventos"),
+        func.avg(carga).label("promedio_eventos"),
+    ).select_from(distribucion)
+
+
+def armar_resumen_dashboard(fila, distribucion) -> dict:
+    equidad = {"analisis": {"mensaje": "No hay profesores activos"}, "distribucion": []}
+    if fila.minimo_eventos is not None:
+        diferencia = fila.maximo_eventos - fila.minimo_eventos
+        equidad = {
+            "analisis": {
+                "minimo_eventos": fila.minimo_eventos,
+                "maximo_eventos": fila.maximo_eventos,
+                "promedio_eventos": round(float(fila.promedio_eventos), 2),
+                "diferencia": diferencia,
+                "es_equitativo": diferencia <= 1
+            },
+            "distribucion": armar_distribucion_equitativa(distribucion)["distribucion"],
+        }
+    return {
+        "profesores": {"total": fila.profesores_total, "activos": fila.profesores_activos},
+        "eventos": {
+            "total": fila.eventos_total,
+            "proximos": fila.eventos_proximos,
+            "esta_semana": fila.eventos_semana,
+        },
+        "tareas_evento_pendientes": fila.tareas_evento_pendientes,
+        "equidad": equidad,
+    }
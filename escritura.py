@@ -0,0 +1,147 @@
+"""
+Camino de escritura de la API.
+
+Por defecto cada request ejecuta su operación en su propia sesión y confirma.
+Con SQLITE_SINGLE_WRITER=1 las operaciones se envían a un único hilo escritor con
+una conexión dedicada: ese hilo toma todas las operaciones que esperan en la cola,
+ejecuta cada una dentro de un SAVEPOINT (un error solo deshace esa operación) y
+confirma el lote completo con un solo COMMIT (group commit). Así los escritores no
+compiten por el lock de escritura de SQLite ni pagan un fsync por request.
+"""
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+import logging
+import os
+import queue
+import threading
+import time
+import database
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SQLITE_SINGLE_WRITER = os.getenv("SQLITE_SINGLE_WRITER", "0").lower() in ("1", "true", "si", "yes")
+# Máximo de operaciones por commit y espera opcional para juntar más operaciones por lote
+SQLITE_GROUP_COMMIT_MAX = int(os.getenv("SQLITE_GROUP_COMMIT_MAX", "64"))
+SQLITE_GROUP_COMMIT_MS = float(os.getenv("SQLITE_GROUP_COMMIT_MS", "0"))
+
+
+class _Pendiente:
+    __slots__ = ("operacion", "futuro")
+
+    def __init__(self, operacion: Callable[[Session], T]):
+        self.operacion = operacion
+        self.futuro: Future = Future()
+
+
+class EscritorUnico:
+    """Hilo único que ejecuta las escrituras y las confirma en lotes"""
+
+    def __init__(self, url: str, max_lote: int = 64, ventana_ms: float = 0):
+        # Motor propio con una sola conexión: es la única que escribe en la base
+        self.engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            pool_size=1,
+            max_overflow=0,
+        )
+        if database.SQLITE_PRAGMAS:
+            event.listen(self.engine, "connect", database._aplicar_pragmas)
+        # expire_on_commit=False: los objetos devueltos se leen después del commit, ya desconectados
+        self._Session = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.max_lote = max(1, max_lote)
+        self.ventana = ventana_ms / 1000
+        self._cola: "queue.Queue[_Pendiente]" = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name="escritor-sqlite", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, operacion: Callable[[Session], T]) -> T:
+        """Encolar una operación y esperar su resultado (o su excepción)"""
+        if threading.current_thread() is self._hilo:
+            raise RuntimeError("Una operación de escritura no puede encolar otra")
+        pendiente = _Pendiente(operacion)
+        self._cola.put(pendiente)
+        return pendiente.futuro.result()
+
+    def _tomar_lote(self) -> list:
+        lote = [self._cola.get()]
+        limite = time.monotonic() + self.ventana
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            try:
+                if restante > 0:
+                    lote.append(self._cola.get(timeout=restante))
+                else:
+                    lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _bucle(self):
+        while True:
+            lote = self._tomar_lote()
+            try:
+                self._procesar(lote)
+            except Exception as exc:  # No dejar morir al hilo escritor
+                logger.exception("Error inesperado en el escritor único")
+                for pendiente in lote:
+                    if not pendiente.futuro.done():
+                        pendiente.futuro.set_exception(exc)
+
+    def _procesar(self, lote: list):
+        exitosas = []
+        with self._Session() as sesion:
+            database.iniciar_transaccion(sesion)
+            for pendiente in lote:
+                try:
+                    with sesion.begin_nested():
+                        resultado = pendiente.operacion(sesion)
+                except BaseException as exc:
+                    pendiente.futuro.set_exception(exc)
+                else:
+                    exitosas.append((pendiente, resultado))
+
+            try:
+                sesion.commit()
+            except Exception as exc:
+                sesion.rollback()
+                for pendiente, _ in exitosas:
+                    pendiente.futuro.set_exception(exc)
+                return
+            # Al cerrar la sesión los objetos quedan desconectados con sus valores cargados
+
+        for pendiente, resultado in exitosas:
+            pendiente.futuro.set_result(resultado)
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def _obtener_escritor() -> EscritorUnico:
+    global _escritor
+    with _escritor_lock:
+        if _escritor is None:
+            _escritor = EscritorUnico(
+                database.SQLALCHEMY_DATABASE_URL,
+                max_lote=SQLITE_GROUP_COMMIT_MAX,
+                ventana_ms=SQLITE_GROUP_COMMIT_MS,
+            )
+        return _escritor
+
+
+def ejecutar(db: Session, operacion: Callable[[Session], T]) -> T:
+    """Ejecutar una operación de escritura y confirmarla.
+
+    `operacion` recibe la sesión donde debe trabajar y no debe hacer commit. Sin
+    escritor único corre en la sesión del request; con escritor único corre en
+    el hilo escritor y se confirma junto con las demás operaciones del lote.
+    """
+    if not (SQLITE_SINGLE_WRITER and database.ES_SQLITE):
+        resultado = operacion(db)
+        db.commit()
+        return resultado
+    return _obtener_escritor().enviar(operacion)
@@ -0,0 +1,153 @@
+"""
+Exportación en streaming (NDJSON o CSV) de eventos, asignaciones y tareas.
+
+La consulta se recorre por lotes de EXPORTAR_LOTE filas con `yield_per` (cursor
+del lado del servidor en PostgreSQL) y cada lote se codifica y se envía antes de
+leer el siguiente, así que la memoria no depende de cuántas filas se exportan.
+
+El generador abre su propia sesión: FastAPI cierra las dependencias con `yield`
+antes de enviar el cuerpo de un StreamingResponse.
+"""
+from datetime import date
+from typing import Callable, Iterator, List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+import csv
+import io
+import json
+import os
+import consultas
+import database
+import models
+import paginacion
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+EXPORTAR_LOTE = int(os.getenv("EXPORTAR_LOTE", "1000"))
+
+TIPOS_CONTENIDO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+COLUMNAS_EVENTOS = [
+    "id", "nombre", "fecha", "tipo", "ubicacion", "horario_colorin", "horario_cumpleanos",
+    "hora_colorin", "hora_cumpleanos", "actividad", "notas",
+]
+COLUMNAS_ASIGNACIONES = [
+    "id", "evento_id", "evento_nombre", "evento_fecha", "evento_tipo", "profesor_id", "profesor_nombre", "rol",
+]
+COLUMNAS_TAREAS = [
+    "id", "titulo", "descripcion", "fecha_vencimiento", "prioridad", "completada", "creada_en", "completada_en",
+]
+
+
+# ========== CONSULTAS ==========
+
+def asignaciones_stmt(fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+                      tipo: Optional[str] = None):
+    """Asignaciones con los datos del evento y del profesor, en orden de fecha del evento"""
+    stmt = select(
+        models.Asignacion.id,
+        models.Asignacion.evento_id,
+        models.Evento.nombre.label("evento_nombre"),
+        models.Evento.fecha.label("evento_fecha"),
+        models.Evento.tipo.label("evento_tipo"),
+        models.Asignacion.profesor_id,
+        models.Profesor.nombre.label("profesor_nombre"),
+        models.Asignacion.rol,
+    ).join(
+        models.Evento, models.Asignacion.evento_id == models.Evento.id
+    ).join(
+        models.Profesor, models.Asignacion.profesor_id == models.Profesor.id
+    )
+    if fecha_desde:
+        stmt = stmt.where(models.Evento.fecha >= fecha_desde)
+    if fecha_hasta:
+        stmt = stmt.where(models.Evento.fecha <= fecha_hasta)
+    if tipo:
+        stmt = stmt.where(models.Evento.tipo == tipo)
+    return stmt.order_by(models.Evento.fecha, models.Evento.id, models.Asignacion.id)
+
+
+def tareas_stmt(usuario_id: int, fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+                prioridad: Optional[str] = None, completada: Optional[bool] = None):
+    """Tareas del usuario, filtradas por vencimiento, prioridad y estado"""
+    stmt = select(*[models.Tarea.__table__.c[columna] for columna in COLUMNAS_TAREAS]).where(
+        models.Tarea.usuario_id == usuario_id
+    )
+    if fecha_desde:
+        stmt = stmt.where(models.Tarea.fecha_vencimiento >= fecha_desde)
+    if fecha_hasta:
+        stmt = stmt.where(models.Tarea.fecha_vencimiento <= fecha_hasta)
+    if prioridad:
+        stmt = stmt.where(models.Tarea.prioridad == prioridad)
+    if completada is not None:
+        stmt = stmt.where(models.Tarea.completada == completada)
+    return paginacion.ordenar(stmt, consultas.tareas_claves())
+
+
+# ========== STREAMING ==========
+
+def _lotes(stmt, completar: Optional[Callable] = None) -> Iterator[List[dict]]:
+    """Recorrer `stmt` por lotes en una sesión propia"""
+    db = database.SessionLocal()
+    try:
+        resultado = db.execute(stmt.execution_options(yield_per=EXPORTAR_LOTE))
+        for particion in resultado.mappings().partitions():
+            filas = [dict(fila) for fila in particion]
+            if completar:
+                filas = completar(db, filas)
+            yield filas
+    finally:
+        db.close()
+
+
+def _ndjson(lotes: Iterator[List[dict]]) -> Iterator[bytes]:
+    for filas in lotes:
+        if orjson is not None:
+            yield b"".join(orjson.dumps(fila) + b"\n" for fila in filas)
+        else:
+            yield "".join(json.dumps(jsonable_encoder(fila), ensure_ascii=False) + "\n" for fila in filas).encode()
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, list):
+        # Lista JSON: los nombres pueden tener ";" o comas (ver importar.leer_csv)
+        return json.dumps(valor, ensure_ascii=False)
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
+
+
+def _csv(lotes: Iterator[List[dict]], columnas: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel reconozca el UTF-8 (acentos y ñ)
+    buffer.write("\ufeff")
+    escritor.writerow(columnas)
+    for filas in lotes:
+        escritor.writerows([_valor_csv(fila[columna]) for columna in columnas] for fila in filas)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def respuesta(stmt, formato: str, nombre: str, columnas: List[str],
+              completar: Optional[Callable] = None) -> StreamingResponse:
+    """StreamingResponse que exporta `stmt` en `formato` ("ndjson" o "csv")"""
+    lotes = _lotes(stmt, completar)
+    cuerpo = _csv(lotes, columnas) if formato == "csv" else _ndjson(lotes)
+    return StreamingResponse(
+        cuerpo,
+        media_type=TIPOS_CONTENIDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'},
+    )
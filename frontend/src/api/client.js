@@ -69,8 +69,9 @@ export const authAPI = {
 
 // Profesores
 export const profesoresAPI = {
-  listar: (activo = null) => {
-    const params = activo !== null ? { activo } : {};
+  // opciones: { include: 'eventos', fecha_desde, fecha_hasta, eventos_limite }
+  listar: (activo = null, opciones = {}) => {
+    const params = activo !== null ? { ...opciones, activo } : opciones;
     return apiClient.get('/profesores/', { params });
   },
   obtener: (id) => apiClient.get(`/profesores/${id}`),
@@ -81,13 +82,16 @@ export const profesoresAPI = {
 
 // Eventos
 export const eventosAPI = {
+  // include: 'asignaciones' o 'asignaciones,profesores' para traer las relaciones en la misma respuesta
   listar: (filtros = {}) => apiClient.get('/eventos/', { params: filtros }),
-  obtener: (id) => apiClient.get(`/eventos/${id}`),
+  obtener: (id, params = {}) => apiClient.get(`/eventos/${id}`, { params }),
   crear: (data) => apiClient.post('/eventos/', data),
   actualizar: (id, data) => apiClient.put(`/eventos/${id}`, data),
   eliminar: (id) => apiClient.delete(`/eventos/${id}`),
   asignarAutomatico: (eventoId, cantidadProfes) =>
     apiClient.post(`/eventos/${eventoId}/asignar-automatico?cantidad_profes=${cantidadProfes}`),
+  // params: { fecha_desde, fecha_hasta, cantidad_profes, tipo, simular }
+  planificar: (params) => apiClient.post('/eventos/planificar', null, { params }),
 };
 
 // Asignaciones
@@ -113,6 +117,11 @@ export const reportesAPI = {
   distribucionEquitativa: () => apiClient.get('/reportes/distribucion-equitativa'),
 };
 
+// Dashboard
+export const dashboardAPI = {
+  resumen: () => apiClient.get('/dashboard/resumen'),
+};
+
 // Tareas
 export const tareasAPI = {
   listar: (filtros = {}) => apiClient.get('/tareas/', { params: filtros }),
@@ -45,7 +45,11 @@ export default function Layout({ children }) {
     }
 
     try {
-      await authAPI.cambiarPassword(passwordData.password_actual, passwordData.password_nueva);
+      const response = await authAPI.cambiarPassword(passwordData.password_actual, passwordData.password_nueva);
+      // El cambio de contraseña revoca el token anterior
+      if (response.data.access_token) {
+        localStorage.setItem('token', response.data.access_token);
+      }
       alert('✅ Contraseña actualizada correctamente');
       setShowPasswordModal(false);
       setPasswordData({
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { profesoresAPI, eventosAPI, reportesAPI } from '../api/client';
+import { dashboardAPI } from '../api/client';
 import './Dashboard.css';
 
 export default function Dashboard() {
@@ -8,6 +8,9 @@ export default function Dashboard() {
     totalProfesores: 0,
     totalEventos: 0,
     profesoresActivos: 0,
+    eventosProximos: 0,
+    eventosSemana: 0,
+    tareasPendientes: 0,
     distribucion: null,
   });
   const [loading, setLoading] = useState(true);
@@ -18,19 +21,20 @@ export default function Dashboard() {
 
   const cargarEstadisticas = async () => {
     try {
-      const [profesRes, eventosRes, distribRes] = await Promise.all([
-        profesoresAPI.listar(),
-        eventosAPI.listar(),
-        reportesAPI.distribucionEquitativa(),
-      ]);
-
-      const profesActivos = profesRes.data.filter((p) => p.activo).length;
+      // Todos los números vienen ya calculados por el servidor
+      const { data } = await dashboardAPI.resumen();
 
       setStats({
-        totalProfesores: profesRes.data.length,
-        totalEventos: eventosRes.data.length,
-        profesoresActivos: profesActivos,
-        distribucion: distribRes.data,
+        totalProfesores: data.profesores.total,
+        totalEventos: data.eventos.total,
+        profesoresActivos: data.profesores.activos,
+        eventosProximos: data.eventos.proximos,
+        eventosSemana: data.eventos.esta_semana,
+        tareasPendientes: data.tareas_pendientes,
+        distribucion: {
+          analisis: data.equidad.analisis,
+          distribucion: data.equidad.distribucion,
+        },
       });
     } catch (error) {
       console.error('Error cargando estadísticas:', error);
@@ -62,6 +66,15 @@ export default function Dashboard() {
           <div className="stat-content">
             <h3>{stats.totalEventos}</h3>
             <p>Total Eventos</p>
+            <small>{stats.eventosProximos} próximos · {stats.eventosSemana} esta semana</small>
+          </div>
+        </div>
+
+        <div className="stat-card">
+          <div className="stat-icon">✅</div>
+          <div className="stat-content">
+            <h3>{stats.tareasPendientes}</h3>
+            <p>Tareas Pendientes</p>
           </div>
         </div>
       </div>
@@ -93,7 +106,7 @@ export default function Dashboard() {
           )}
 
           <div className="distribucion-list">
-            {stats.distribucion.distribucion.slice(0, 5).map((prof) => (
+            {stats.distribucion.distribucion.map((prof) => (
               <div key={prof.profesor_id} className="distribucion-item">
                 <span>{prof.nombre}</span>
                 <strong>{prof.total_eventos_futuros} eventos</strong>
@@ -1,7 +1,15 @@
 import { useEffect, useState } from 'react';
-import { eventosAPI, asignacionesAPI, recomendacionesAPI, profesoresAPI, tareasEventoAPI } from '../api/client';
+import { eventosAPI, asignacionesAPI, recomendacionesAPI, tareasEventoAPI } from '../api/client';
 import './Eventos.css';
 
+// Profesores asignados a partir de las asignaciones incluidas en el evento (include=asignaciones,profesores)
+const profesoresDeAsignaciones = (asignaciones = []) =>
+  asignaciones.map((asignacion) => ({
+    ...asignacion.profesor,
+    asignacion_id: asignacion.id,
+    rol: asignacion.rol,
+  }));
+
 export default function Eventos() {
   const [eventos, setEventos] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -53,42 +61,12 @@ export default function Eventos() {
 
   const cargarEventos = async () => {
     try {
-      const response = await eventosAPI.listar();
-      // Cargar asignaciones y profesores para cada evento
-      const eventosConAsignaciones = await Promise.all(
-        response.data.map(async (evento) => {
-          try {
-            const asignacionesResponse = await asignacionesAPI.listar({ evento_id: evento.id });
-            const asignaciones = asignacionesResponse.data;
-            
-            // Obtener datos de cada profesor asignado
-            const profesoresAsignados = await Promise.all(
-              asignaciones.map(async (asignacion) => {
-                try {
-                  const profesorResponse = await profesoresAPI.obtener(asignacion.profesor_id);
-                  return {
-                    id: profesorResponse.data.id,
-                    nombre: profesorResponse.data.nombre,
-                    asignacion_id: asignacion.id,
-                    rol: asignacion.rol,
-                  };
-                } catch (error) {
-                  console.error(`Error cargando profesor ${asignacion.profesor_id}:`, error);
-                  return null;
-                }
-              })
-            );
-            
-            return { 
-              ...evento, 
-              asignaciones: asignaciones,
-              profesoresAsignados: profesoresAsignados.filter(p => p !== null)
-            };
-          } catch {
-            return { ...evento, asignaciones: [], profesoresAsignados: [] };
-          }
-        })
-      );
+      // Los eventos vienen con sus asignaciones y profesores en una sola petición
+      const response = await eventosAPI.listar({ include: 'asignaciones,profesores' });
+      const eventosConAsignaciones = response.data.map((evento) => ({
+        ...evento,
+        profesoresAsignados: profesoresDeAsignaciones(evento.asignaciones),
+      }));
       setEventos(eventosConAsignaciones);
     } catch (error) {
       console.error('Error cargando eventos:', error);
@@ -299,34 +277,13 @@ export default function Eventos() {
   const verDetalleEvento = async (eventoId) => {
     setCargandoDetalle(true);
     try {
-      // Obtener datos del evento
-      const eventoResponse = await eventosAPI.obtener(eventoId);
-      setEventoDetalle(eventoResponse.data);
       // Cargar tareas del evento
       cargarTareasEvento(eventoId);
 
-      // Obtener asignaciones y luego los profesores
-      const asignacionesResponse = await asignacionesAPI.listar({ evento_id: eventoId });
-      const asignaciones = asignacionesResponse.data;
-
-      // Obtener datos de cada profesor asignado
-      const profesoresData = await Promise.all(
-        asignaciones.map(async (asignacion) => {
-          try {
-            const profesorResponse = await profesoresAPI.obtener(asignacion.profesor_id);
-            return {
-              ...profesorResponse.data,
-              asignacion_id: asignacion.id,
-              rol: asignacion.rol,
-            };
-          } catch (error) {
-            console.error(`Error cargando profesor ${asignacion.profesor_id}:`, error);
-            return null;
-          }
-        })
-      );
-
-      setProfesoresAsignados(profesoresData.filter((p) => p !== null));
+      // Obtener el evento con sus asignaciones y profesores
+      const eventoResponse = await eventosAPI.obtener(eventoId, { include: 'asignaciones,profesores' });
+      setEventoDetalle(eventoResponse.data);
+      setProfesoresAsignados(profesoresDeAsignaciones(eventoResponse.data.asignaciones));
     } catch (error) {
       console.error('Error cargando detalle del evento:', error);
       alert('Error al cargar los detalles del evento');
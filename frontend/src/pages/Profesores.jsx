@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { profesoresAPI, asignacionesAPI, eventosAPI } from '../api/client';
+import { profesoresAPI } from '../api/client';
 import './Profesores.css';
 
 export default function Profesores() {
@@ -15,48 +15,12 @@ export default function Profesores() {
 
   const cargarProfesores = async () => {
     try {
-      const response = await profesoresAPI.listar();
-      const profesoresList = response.data;
-      
-      // Cargar eventos para cada profesor
-      const profesoresConEventos = await Promise.all(
-        profesoresList.map(async (profesor) => {
-          try {
-            // Obtener asignaciones del profesor
-            const asignacionesResponse = await asignacionesAPI.listar({ profesor_id: profesor.id });
-            const asignaciones = asignacionesResponse.data;
-            
-            // Obtener datos de cada evento asignado
-            const eventosAsignados = await Promise.all(
-              asignaciones.map(async (asignacion) => {
-                try {
-                  const eventoResponse = await eventosAPI.obtener(asignacion.evento_id);
-                  return {
-                    id: eventoResponse.data.id,
-                    nombre: eventoResponse.data.nombre,
-                    fecha: eventoResponse.data.fecha,
-                    tipo: eventoResponse.data.tipo,
-                    ubicacion: eventoResponse.data.ubicacion,
-                    asignacion_id: asignacion.id,
-                    rol: asignacion.rol,
-                  };
-                } catch (error) {
-                  console.error(`Error cargando evento ${asignacion.evento_id}:`, error);
-                  return null;
-                }
-              })
-            );
-            
-            return {
-              ...profesor,
-              eventosAsignados: eventosAsignados.filter(e => e !== null).sort((a, b) => new Date(a.fecha) - new Date(b.fecha))
-            };
-          } catch (error) {
-            console.error(`Error cargando eventos del profesor ${profesor.id}:`, error);
-            return { ...profesor, eventosAsignados: [] };
-          }
-        })
-      );
+      // Los profesores vienen con sus eventos (ordenados por fecha) en una sola petición
+      const response = await profesoresAPI.listar(null, { include: 'eventos' });
+      const profesoresConEventos = response.data.map((profesor) => ({
+        ...profesor,
+        eventosAsignados: profesor.eventos,
+      }));
       
       setProfesores(profesoresConEventos);
     } catch (error) {
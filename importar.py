@@ -0,0 +1,140 @@
+"""
+Importación masiva de eventos desde JSON o CSV.
+
+Primero se validan todas las filas (schema `EventoCreate` más los largos de las
+columnas) y se juntan los errores por fila; después se insertan las válidas con
+un INSERT por lote de IMPORTAR_LOTE filas (`operaciones.importar_eventos`), cada
+lote en su propia transacción. Con `lote=0` todo va en una sola transacción.
+
+El CSV acepta el mismo formato que `/exportar/eventos?formato=csv` (las
+columnas que no son del evento, como `id` u `hora_colorin`, se ignoran), así que
+un export se puede volver a importar tal cual. La columna `actividad` es una
+lista JSON (`["Slime", "Mini cheffs"]`); en un CSV armado a mano también se
+acepta separada por ";" (`Slime; Mini cheffs`).
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+import csv
+import io
+import json
+import os
+import escritura
+import models
+import operaciones
+import schemas
+
+IMPORTAR_LOTE = int(os.getenv("IMPORTAR_LOTE", "500"))
+
+# Columnas de texto con largo máximo en la tabla (SQLite no lo controla, PostgreSQL sí)
+_LARGOS = {
+    columna.name: columna.type.length
+    for columna in models.Evento.__table__.c
+    if getattr(columna.type, "length", None)
+}
+_LARGO_ACTIVIDAD = models.EventoActividad.__table__.c.nombre.type.length
+
+
+@lru_cache(maxsize=None)
+def _adaptador() -> TypeAdapter:
+    return TypeAdapter(schemas.EventoCreate)
+
+
+# ========== LECTURA ==========
+
+def _actividades_csv(valor: str) -> Any:
+    """Lista JSON (el formato del export) o, si no lo es, nombres separados por ";" """
+    if valor.startswith("["):
+        try:
+            actividades = json.loads(valor)
+        except ValueError:
+            actividades = None
+        if isinstance(actividades, list):
+            return actividades  # Los elementos los valida EventoCreate
+    return [a.strip() for a in valor.split(";") if a.strip()]
+
+
+def leer_csv(contenido: bytes) -> List[Dict[str, Any]]:
+    """Filas de un CSV con encabezado (UTF-8, con o sin BOM)"""
+    try:
+        texto = contenido.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo debe estar en UTF-8")
+    filas = []
+    for fila in csv.DictReader(io.StringIO(texto)):
+        datos = {clave.strip(): (valor.strip() or None) if valor is not None else None
+                 for clave, valor in fila.items() if clave}
+        if datos.get("actividad"):
+            datos["actividad"] = _actividades_csv(datos["actividad"])
+        filas.append(datos)
+    return filas
+
+
+# ========== VALIDACIÓN ==========
+
+def _errores_de_largo(evento: schemas.EventoCreate) -> List[str]:
+    errores = []
+    for campo, largo in _LARGOS.items():
+        valor = getattr(evento, campo, None)
+        if isinstance(valor, str) and len(valor) > largo:
+            errores.append(f"{campo}: más de {largo} caracteres")
+    for actividad in evento.actividad or []:
+        if len(actividad) > _LARGO_ACTIVIDAD:
+            errores.append(f"actividad: '{actividad[:20]}...' tiene más de {_LARGO_ACTIVIDAD} caracteres")
+    return errores
+
+
+def validar(filas: List[Any]) -> Tuple[List[Tuple[int, schemas.EventoCreate]], List[dict]]:
+    """Separar las filas válidas (con su número, desde 1) de los errores por fila"""
+    adaptador = _adaptador()
+    validas, errores = [], []
+    for numero, fila in enumerate(filas, start=1):
+        try:
+            evento = adaptador.validate_python(fila)
+        except ValidationError as exc:
+            mensajes = [
+                f"{'.'.join(map(str, e['loc'])) or 'fila'}: {e['msg']}" for e in exc.errors()
+            ]
+            errores.append({"fila": numero, "errores": mensajes})
+            continue
+        mensajes = _errores_de_largo(evento)
+        if mensajes:
+            errores.append({"fila": numero, "errores": mensajes})
+        else:
+            validas.append((numero, evento))
+    return validas, errores
+
+
+# ========== IMPORTACIÓN ==========
+
+def importar(db: Session, filas: List[Any], lote: int = IMPORTAR_LOTE, omitir_invalidas: bool = False) -> dict:
+    """Validar e insertar eventos por lotes.
+
+    Si hay filas inválidas y no se pidió `omitir_invalidas` no se inserta nada
+    (422 con los errores). Si falla la inserción de un lote, sus filas se
+    informan como error y los lotes ya confirmados se mantienen.
+    """
+    validas, errores = validar(filas)
+    if errores and not omitir_invalidas:
+        raise HTTPException(
+            status_code=422,
+            detail={"mensaje": f"{len(errores)} fila(s) inválida(s), no se importó nada", "errores": errores}
+        )
+
+    tamano = lote if lote > 0 else max(len(validas), 1)
+    ids = []
+    for inicio in range(0, len(validas), tamano):
+        parte = validas[inicio:inicio + tamano]
+        eventos = [evento for _, evento in parte]
+        try:
+            ids.extend(escritura.ejecutar(db, lambda s: operaciones.importar_eventos(s, eventos)))
+        except SQLAlchemyError as exc:
+            db.rollback()
+            motivo = str(getattr(exc, "orig", exc)).splitlines()[0]
+            errores.extend({"fila": numero, "errores": [f"no se pudo insertar: {motivo}"]} for numero, _ in parte)
+
+    errores.sort(key=lambda error: error["fila"])
+    return {"total_filas": len(filas), "importadas": len(ids), "ids": ids, "errores": errores}
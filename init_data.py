@@ -2,11 +2,13 @@
 Script para inicializar datos de ejemplo en la base de datos
 """
 from database import SessionLocal, engine
+import carga
 import models
+import migraciones
 from datetime import date, timedelta
 
-# Crear tablas
-models.Base.metadata.create_all(bind=engine)
+# Crear o actualizar el esquema
+migraciones.aplicar(engine)
 
 db = SessionLocal()
 
@@ -89,6 +91,7 @@ try:
         evento = models.Evento(**evento_data)
         db.add(evento)
         eventos_creados.append(evento)
+    carga.contar_eventos(db, [(evento.fecha, 1) for evento in eventos_creados])
     
     db.commit()
     print(f"✅ Creados {len(eventos_creados)} eventos")
@@ -117,6 +120,7 @@ try:
             rol="Profesor"
         )
         db.add(asignacion3)
+        carga.sumar_asignaciones(db, [asignacion1, asignacion2, asignacion3])
         
         db.commit()
         print("✅ Creadas 3 asignaciones de ejemplo")
@@ -1,25 +1,49 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, File, Query, Response, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, time, timedelta
 from pathlib import Path
+from cache import TTLCache
 import database
 import models
 import schemas
 import auth
-import json
-
-# Crear tablas en la base de datos
-models.Base.metadata.create_all(bind=database.engine)
+import batch
+import cambios
+import carga
+import consultas
+import escritura
+import exportar
+import importar
+import operaciones
+import migraciones
+import paginacion
+import reportes
+import respuestas
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Aplicar las migraciones pendientes al iniciar (con varias réplicas conviene
+# desactivarlo y correr `python -m migraciones` una vez antes del despliegue)
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "1").lower() in ("1", "true", "si", "yes")
+
+# Segundos que se reutiliza el resumen del dashboard (en el servidor y en el navegador)
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30"))
+_resumen_cache = TTLCache(8, DASHBOARD_CACHE_TTL_SECONDS)  # (fecha, versiones) -> resumen
+TABLAS_DASHBOARD = ("profesores", "eventos_por_fecha", "tareas_evento", "carga_profesores", "resumen_asignaciones", "tareas")
 
 app = FastAPI(
     title="Colorin - Gestión de Eventos",
     description="Sistema de gestión de eventos y asignación de profesores",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=respuestas.RespuestaJSON
 )
 
 FRONTEND_DIST_PATH = Path(__file__).parent / "frontend_dist"
@@ -43,8 +67,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=paginacion.HEADERS,
 )
 
+@app.on_event("startup")
+def verificar_base_de_datos():
+    if DB_MIGRATE_ON_STARTUP:
+        migraciones.aplicar(database.engine)
+    else:
+        faltantes = migraciones.pendientes(database.engine)
+        if faltantes:
+            logger.warning("Hay migraciones pendientes: %s", ", ".join(m.nombre for m in faltantes))
+    # Confirmar que el perfil de almacenamiento (SQLITE_PROFILE) quedó aplicado
+    database.verificar_perfil_sqlite()
+
+
+# Endpoints de lectura asíncronos bajo /async (solo si está instalado aiosqlite)
+if database.async_engine is not None:
+    import async_api
+    app.include_router(async_api.router)
+
+    @app.on_event("shutdown")
+    async def cerrar_motor_async():
+        # Cerrar las conexiones de aiosqlite (cada una tiene su propio hilo)
+        await database.async_engine.dispose()
+
 # Dependencia para obtener la sesión de base de datos
 def get_db():
     db = database.SessionLocal()
@@ -68,21 +115,27 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username}, expires_delta=access_token_expires, usuario=user
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @app.get("/usuarios/me", response_model=schemas.Usuario)
-def read_users_me(current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def read_users_me(
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin),
+    db: Session = Depends(get_db)
+):
     """Obtener información del usuario actual"""
+    if auth.AUTH_STATELESS:
+        # En modo sin estado el token no trae email ni fecha de creación
+        return db.query(models.Usuario).filter(models.Usuario.id == current_user.id).first()
     return current_user
 
 
 @app.put("/usuarios/me/cambiar-password")
 def cambiar_password(
     cambio: schemas.CambiarPassword,
-    current_user: models.Usuario = Depends(auth.get_current_active_admin),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin),
     db: Session = Depends(get_db)
 ):
     """Cambiar la contraseña del usuario actual"""
@@ -108,47 +161,38 @@ def cambiar_password(
             detail="La nueva contraseña no puede estar vacía"
         )
     
-    # Hashear y actualizar la contraseña
-    db_user.hashed_password = auth.get_password_hash(cambio.password_nueva)
-    db.commit()
-    db.refresh(db_user)
+    # Hashear fuera de la escritura (bcrypt es lento) y actualizar la contraseña
+    hashed_password = auth.get_password_hash(cambio.password_nueva)
+    db_user = escritura.ejecutar(
+        db, lambda s: operaciones.cambiar_password(s, current_user.id, hashed_password)
+    )
+    auth.invalidar_usuario(db_user.username)
     
-    return {"message": "Contraseña actualizada correctamente"}
+    # El cambio de contraseña revoca los tokens anteriores: se entrega uno nuevo
+    access_token = auth.create_access_token(
+        data={"sub": db_user.username},
+        expires_delta=timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES),
+        usuario=db_user
+    )
+    return {
+        "message": "Contraseña actualizada correctamente",
+        "access_token": access_token,
+        "token_type": "bearer"
+    }
 
 
 @app.post("/usuarios/", response_model=schemas.Usuario)
 def create_user(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
     """Crear nuevo usuario (solo para configuración inicial - solo si no hay usuarios)"""
-    # Verificar si ya existe un usuario
-    existing_user = db.query(models.Usuario).first()
-    if existing_user:
+    # El endpoint no requiere autenticación: rechazar antes de pagar el hash de bcrypt.
+    # La escritura vuelve a verificarlo por si dos requests llegan a la vez.
+    if db.query(models.Usuario.id).first() is not None:
         raise HTTPException(
             status_code=400,
             detail="Ya existe un usuario. Usa el endpoint /login para acceder."
         )
-    
-    # Verificar si el username ya existe
-    db_user = db.query(models.Usuario).filter(models.Usuario.username == usuario.username).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="El usuario ya existe")
-    
-    # Verificar si el email ya existe
-    db_email = db.query(models.Usuario).filter(models.Usuario.email == usuario.email).first()
-    if db_email:
-        raise HTTPException(status_code=400, detail="El email ya está registrado")
-    
     hashed_password = auth.get_password_hash(usuario.password)
-    db_user = models.Usuario(
-        username=usuario.username,
-        email=usuario.email,
-        hashed_password=hashed_password,
-        activo=True,
-        es_admin=True
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return escritura.ejecutar(db, lambda s: operaciones.crear_usuario(s, usuario, hashed_password))
 
 
 @app.get("/")
@@ -168,34 +212,49 @@ def root():
 def crear_profesor(
     profesor: schemas.ProfesorCreate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Crear un nuevo profesor"""
-    db_profesor = models.Profesor(nombre=profesor.nombre, activo=profesor.activo)
-    db.add(db_profesor)
-    db.commit()
-    db.refresh(db_profesor)
-    return db_profesor
+    return escritura.ejecutar(db, lambda s: operaciones.crear_profesor(s, profesor))
 
 
-@app.get("/profesores/", response_model=List[schemas.Profesor])
+@app.get(
+    "/profesores/", response_model=List[schemas.ProfesorDetalle], response_model_exclude_unset=True,
+    dependencies=[Depends(cambios.condicional("profesores", segun_include={"eventos": ("asignaciones", "eventos")}))]
+)
 def listar_profesores(
+    response: Response,
     activo: Optional[bool] = None,
+    include: Optional[str] = Query(None, description="Relaciones a incluir: eventos"),
+    fecha_desde: Optional[date] = Query(None, description="Con include=eventos, solo eventos desde esta fecha"),
+    fecha_hasta: Optional[date] = Query(None, description="Con include=eventos, solo eventos hasta esta fecha"),
+    eventos_limite: Optional[int] = Query(None, ge=1, description="Con include=eventos, máximo de eventos por profesor"),
+    pagina: paginacion.Paginacion = Depends(paginacion.parametros),
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
-    """Listar todos los profesores, opcionalmente filtrar por activos"""
-    query = db.query(models.Profesor)
+    """Listar todos los profesores, opcionalmente filtrar por activos (y sus eventos con include)"""
+    incluir = consultas.parsear_include(include, ("eventos",))
+    stmt = select(*respuestas.columnas(models.Profesor.__table__, schemas.Profesor)).order_by(models.Profesor.id)
     if activo is not None:
-        query = query.filter(models.Profesor.activo == activo)
-    return query.all()
+        stmt = stmt.where(models.Profesor.activo == activo)
+    profesores = paginacion.paginar(
+        db, stmt, [paginacion.Clave(models.Profesor.id)], pagina, response, mapeos=True
+    )
+    if "eventos" in incluir and profesores:
+        # Una sola consulta para los eventos de todos los profesores de la página
+        filas = db.execute(consultas.eventos_de_profesores_stmt(
+            [profesor["id"] for profesor in profesores], fecha_desde, fecha_hasta, eventos_limite
+        )).all()
+        profesores = consultas.armar_profesores_con_eventos(profesores, filas)
+    return respuestas.json_directo(profesores, response)
 
 
-@app.get("/profesores/{profesor_id}", response_model=schemas.Profesor)
+@app.get("/profesores/{profesor_id}", response_model=schemas.Profesor, dependencies=[Depends(cambios.condicional("profesores"))])
 def obtener_profesor(
     profesor_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Obtener un profesor por ID"""
     profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
@@ -209,45 +268,20 @@ def actualizar_profesor(
     profesor_id: int,
     profesor: schemas.ProfesorUpdate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Actualizar un profesor"""
-    db_profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
-    if not db_profesor:
-        raise HTTPException(status_code=404, detail="Profesor no encontrado")
-    
-    if profesor.nombre is not None:
-        db_profesor.nombre = profesor.nombre
-    if profesor.activo is not None:
-        db_profesor.activo = profesor.activo
-    
-    db.commit()
-    db.refresh(db_profesor)
-    return db_profesor
+    return escritura.ejecutar(db, lambda s: operaciones.actualizar_profesor(s, profesor_id, profesor))
 
 
 @app.delete("/profesores/{profesor_id}")
 def eliminar_profesor(
     profesor_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Eliminar un profesor (solo si no tiene eventos asignados)"""
-    db_profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
-    if not db_profesor:
-        raise HTTPException(status_code=404, detail="Profesor no encontrado")
-    
-    # Verificar si tiene eventos asignados
-    asignaciones = db.query(models.Asignacion).filter(models.Asignacion.profesor_id == profesor_id).count()
-    if asignaciones > 0:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"No se puede eliminar el profesor. Tiene {asignaciones} eventos asignados."
-        )
-    
-    db.delete(db_profesor)
-    db.commit()
-    return {"message": "Profesor eliminado correctamente"}
+    return escritura.ejecutar(db, lambda s: operaciones.eliminar_profesor(s, profesor_id))
 
 
 # ========== ENDPOINTS DE EVENTOS ==========
@@ -256,267 +290,151 @@ def eliminar_profesor(
 def crear_evento(
     evento: schemas.EventoCreate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Crear un nuevo evento"""
-    # Convertir lista de actividades a JSON string
-    actividad_json = None
-    if evento.actividad:
-        actividad_json = json.dumps(evento.actividad)
-    
-    db_evento = models.Evento(
-        nombre=evento.nombre,
-        fecha=evento.fecha,
-        tipo=evento.tipo,
-        ubicacion=evento.ubicacion,
-        horario_colorin=evento.horario_colorin,
-        horario_cumpleanos=evento.horario_cumpleanos,
-        actividad=actividad_json,
-        notas=evento.notas
-    )
-    db.add(db_evento)
-    db.commit()
-    db.refresh(db_evento)
-    # Convertir JSON string de vuelta a lista para la respuesta
-    if db_evento.actividad:
-        try:
-            db_evento.actividad = json.loads(db_evento.actividad)
-        except:
-            db_evento.actividad = []
-    else:
-        db_evento.actividad = []
-    return db_evento
+    return escritura.ejecutar(db, lambda s: operaciones.crear_evento(s, evento))
+
+
+@app.post("/eventos/importar")
+def importar_eventos(
+    filas: List[Dict[str, Any]],
+    lote: int = Query(importar.IMPORTAR_LOTE, ge=0, description="Filas por transacción; 0 = una sola transacción"),
+    omitir_invalidas: bool = Query(False, description="Importar las filas válidas aunque haya inválidas"),
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Importar eventos en bloque desde una lista JSON (mismos campos que POST /eventos/)"""
+    return importar.importar(db, filas, lote, omitir_invalidas)
+
 
+@app.post("/eventos/importar/csv")
+def importar_eventos_csv(
+    archivo: UploadFile = File(...),
+    lote: int = Query(importar.IMPORTAR_LOTE, ge=0, description="Filas por transacción; 0 = una sola transacción"),
+    omitir_invalidas: bool = Query(False, description="Importar las filas válidas aunque haya inválidas"),
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Importar eventos en bloque desde un CSV (el formato de /exportar/eventos?formato=csv)"""
+    filas = importar.leer_csv(archivo.file.read())
+    return importar.importar(db, filas, lote, omitir_invalidas)
 
-@app.get("/eventos/", response_model=List[schemas.Evento])
+
+@app.get(
+    "/eventos/", response_model=List[schemas.EventoDetalle], response_model_exclude_unset=True,
+    dependencies=[Depends(cambios.condicional("eventos", "evento_actividades", segun_include=consultas.TABLAS_INCLUDE_EVENTOS))]
+)
 def listar_eventos(
+    response: Response,
     fecha_desde: Optional[date] = None,
     fecha_hasta: Optional[date] = None,
     tipo: Optional[str] = None,
+    actividad: Optional[str] = None,
+    hora_desde: Optional[time] = None,
+    hora_hasta: Optional[time] = None,
+    include: Optional[str] = Query(None, description="Relaciones a incluir: asignaciones, profesores"),
+    pagina: paginacion.Paginacion = Depends(paginacion.parametros),
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
-    """Listar eventos con filtros opcionales"""
-    query = db.query(models.Evento)
-    
-    if fecha_desde:
-        query = query.filter(models.Evento.fecha >= fecha_desde)
-    if fecha_hasta:
-        query = query.filter(models.Evento.fecha <= fecha_hasta)
-    if tipo:
-        query = query.filter(models.Evento.tipo == tipo)
-    
-    eventos = query.order_by(models.Evento.fecha).all()
-    # Convertir JSON string de actividades a lista para cada evento
-    for evento in eventos:
-        if evento.actividad:
-            try:
-                evento.actividad = json.loads(evento.actividad)
-            except:
-                evento.actividad = []
-        else:
-            evento.actividad = []
-    return eventos
-
-
-@app.get("/eventos/{evento_id}", response_model=schemas.Evento)
-def obtener_evento(evento_id: int, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
-    """Obtener un evento por ID con sus asignaciones"""
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
+    """Listar eventos con filtros opcionales (y sus asignaciones/profesores con include)"""
+    incluir = consultas.include_eventos(include)
+    stmt = consultas.eventos_filas_stmt(fecha_desde, fecha_hasta, tipo, actividad, hora_desde, hora_hasta)
+    eventos = paginacion.paginar(db, stmt, consultas.eventos_claves(), pagina, response, mapeos=True)
+    return respuestas.json_directo(consultas.cargar_eventos(db, eventos, incluir), response)
+
+
+@app.get(
+    "/eventos/{evento_id}", response_model=schemas.EventoDetalle, response_model_exclude_unset=True,
+    dependencies=[Depends(cambios.condicional("eventos", "evento_actividades", segun_include=consultas.TABLAS_INCLUDE_EVENTOS))]
+)
+def obtener_evento(
+    evento_id: int,
+    include: Optional[str] = Query(None, description="Relaciones a incluir: asignaciones, profesores"),
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Obtener un evento por ID (con sus asignaciones/profesores con include)"""
+    incluir = consultas.include_eventos(include)
+    evento = db.scalars(
+        select(models.Evento)
+        .where(models.Evento.id == evento_id)
+        .options(*consultas.opciones_include_eventos(incluir))
+    ).first()
     if not evento:
         raise HTTPException(status_code=404, detail="Evento no encontrado")
-    # Convertir JSON string de actividades a lista
-    if evento.actividad:
-        try:
-            evento.actividad = json.loads(evento.actividad)
-        except:
-            evento.actividad = []
-    else:
-        evento.actividad = []
-    return evento
+    return consultas.evento_a_dict(evento, incluir)
 
 
 @app.put("/eventos/{evento_id}", response_model=schemas.Evento)
-def actualizar_evento(evento_id: int, evento: schemas.EventoUpdate, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def actualizar_evento(evento_id: int, evento: schemas.EventoUpdate, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Actualizar un evento"""
-    db_evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not db_evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    if evento.nombre is not None:
-        db_evento.nombre = evento.nombre
-    if evento.fecha is not None:
-        db_evento.fecha = evento.fecha
-    if evento.tipo is not None:
-        db_evento.tipo = evento.tipo
-    if evento.ubicacion is not None:
-        db_evento.ubicacion = evento.ubicacion
-    if evento.horario_colorin is not None:
-        db_evento.horario_colorin = evento.horario_colorin
-    if evento.horario_cumpleanos is not None:
-        db_evento.horario_cumpleanos = evento.horario_cumpleanos
-    if evento.actividad is not None:
-        # Convertir lista de actividades a JSON string
-        if evento.actividad:
-            db_evento.actividad = json.dumps(evento.actividad)
-        else:
-            db_evento.actividad = None
-    if evento.notas is not None:
-        db_evento.notas = evento.notas
-    
-    db.commit()
-    db.refresh(db_evento)
-    # Convertir JSON string de vuelta a lista para la respuesta
-    if db_evento.actividad:
-        try:
-            db_evento.actividad = json.loads(db_evento.actividad)
-        except:
-            db_evento.actividad = []
-    else:
-        db_evento.actividad = []
-    return db_evento
+    return escritura.ejecutar(db, lambda s: operaciones.actualizar_evento(s, evento_id, evento))
 
 
 @app.delete("/eventos/{evento_id}")
-def eliminar_evento(evento_id: int, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def eliminar_evento(evento_id: int, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Eliminar un evento y sus asignaciones"""
-    db_evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not db_evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    # Eliminar asignaciones asociadas
-    db.query(models.Asignacion).filter(models.Asignacion.evento_id == evento_id).delete()
-    
-    db.delete(db_evento)
-    db.commit()
-    return {"message": "Evento eliminado correctamente"}
+    return escritura.ejecutar(db, lambda s: operaciones.eliminar_evento(s, evento_id))
 
 
 # ========== ENDPOINTS DE ASIGNACIONES ==========
 
 @app.post("/asignaciones/", response_model=schemas.Asignacion)
-def crear_asignacion(asignacion: schemas.AsignacionCreate, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def crear_asignacion(asignacion: schemas.AsignacionCreate, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Asignar un profesor a un evento"""
-    # Verificar que el profesor existe
-    profesor = db.query(models.Profesor).filter(models.Profesor.id == asignacion.profesor_id).first()
-    if not profesor:
-        raise HTTPException(status_code=404, detail="Profesor no encontrado")
-    
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == asignacion.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    # Verificar que no esté ya asignado
-    existe = db.query(models.Asignacion).filter(
-        models.Asignacion.profesor_id == asignacion.profesor_id,
-        models.Asignacion.evento_id == asignacion.evento_id
-    ).first()
-    
-    if existe:
-        raise HTTPException(status_code=400, detail="El profesor ya está asignado a este evento")
-    
-    db_asignacion = models.Asignacion(
-        profesor_id=asignacion.profesor_id,
-        evento_id=asignacion.evento_id,
-        rol=asignacion.rol
-    )
-    db.add(db_asignacion)
-    db.commit()
-    db.refresh(db_asignacion)
-    return db_asignacion
+    return escritura.ejecutar(db, lambda s: operaciones.crear_asignacion(s, asignacion))
 
 
-@app.get("/asignaciones/", response_model=List[schemas.Asignacion])
+@app.get("/asignaciones/", response_model=List[schemas.Asignacion], dependencies=[Depends(cambios.condicional("asignaciones"))])
 def listar_asignaciones(
+    response: Response,
     profesor_id: Optional[int] = None,
     evento_id: Optional[int] = None,
+    pagina: paginacion.Paginacion = Depends(paginacion.parametros),
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Listar asignaciones con filtros opcionales"""
-    query = db.query(models.Asignacion)
+    stmt = select(*respuestas.columnas(models.Asignacion.__table__, schemas.Asignacion)).order_by(models.Asignacion.id)
     
     if profesor_id:
-        query = query.filter(models.Asignacion.profesor_id == profesor_id)
+        stmt = stmt.where(models.Asignacion.profesor_id == profesor_id)
     if evento_id:
-        query = query.filter(models.Asignacion.evento_id == evento_id)
+        stmt = stmt.where(models.Asignacion.evento_id == evento_id)
     
-    return query.all()
+    asignaciones = paginacion.paginar(
+        db, stmt, [paginacion.Clave(models.Asignacion.id)], pagina, response, mapeos=True
+    )
+    return respuestas.json_directo(asignaciones, response)
 
 
 @app.delete("/asignaciones/{asignacion_id}")
-def eliminar_asignacion(asignacion_id: int, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def eliminar_asignacion(asignacion_id: int, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Eliminar una asignación"""
-    db_asignacion = db.query(models.Asignacion).filter(models.Asignacion.id == asignacion_id).first()
-    if not db_asignacion:
-        raise HTTPException(status_code=404, detail="Asignación no encontrada")
-    
-    db.delete(db_asignacion)
-    db.commit()
-    return {"message": "Asignación eliminada correctamente"}
+    return escritura.ejecutar(db, lambda s: operaciones.eliminar_asignacion(s, asignacion_id))
 
 
 @app.post("/asignaciones/multiples")
-def crear_asignaciones_multiples(asignaciones: List[schemas.AsignacionCreate], db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def crear_asignaciones_multiples(
+    asignaciones: List[schemas.AsignacionCreate],
+    atomico: bool = Query(False, description="Si alguna asignación falla, no crear ninguna"),
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
     """Asignar múltiples profesores a eventos"""
-    asignaciones_creadas = []
-    errores = []
-    
-    for asignacion_data in asignaciones:
-        try:
-            # Verificar que el profesor existe
-            profesor = db.query(models.Profesor).filter(models.Profesor.id == asignacion_data.profesor_id).first()
-            if not profesor:
-                errores.append(f"Profesor {asignacion_data.profesor_id} no encontrado")
-                continue
-            
-            # Verificar que el evento existe
-            evento = db.query(models.Evento).filter(models.Evento.id == asignacion_data.evento_id).first()
-            if not evento:
-                errores.append(f"Evento {asignacion_data.evento_id} no encontrado")
-                continue
-            
-            # Verificar que no esté ya asignado
-            existe = db.query(models.Asignacion).filter(
-                models.Asignacion.profesor_id == asignacion_data.profesor_id,
-                models.Asignacion.evento_id == asignacion_data.evento_id
-            ).first()
-            
-            if existe:
-                errores.append(f"El profesor {profesor.nombre} ya está asignado a este evento")
-                continue
-            
-            db_asignacion = models.Asignacion(
-                profesor_id=asignacion_data.profesor_id,
-                evento_id=asignacion_data.evento_id,
-                rol=asignacion_data.rol
-            )
-            db.add(db_asignacion)
-            asignaciones_creadas.append({
-                "profesor_id": profesor.id,
-                "profesor_nombre": profesor.nombre,
-                "evento_id": evento.id
-            })
-        except Exception as e:
-            errores.append(f"Error al asignar profesor {asignacion_data.profesor_id}: {str(e)}")
-    
-    db.commit()
-    
-    return {
-        "asignaciones_creadas": asignaciones_creadas,
-        "total_creadas": len(asignaciones_creadas),
-        "errores": errores if errores else None
-    }
+    return escritura.ejecutar(db, lambda s: operaciones.crear_asignaciones_multiples(s, asignaciones, atomico))
 
 
 # ========== RECOMENDACIONES Y ASIGNACIÓN MANUAL ==========
 
-@app.get("/eventos/{evento_id}/profesores-recomendados")
-def obtener_profesores_recomendados(evento_id: int, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+@app.get(
+    "/eventos/{evento_id}/profesores-recomendados",
+    dependencies=[Depends(cambios.condicional("eventos", "profesores", "asignaciones", "carga_profesores", "resumen_asignaciones", por_fecha=True))]
+)
+def obtener_profesores_recomendados(evento_id: int, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Obtener lista de profesores recomendados para un evento, ordenados por cantidad de eventos (menos eventos primero)"""
-    from sqlalchemy import func
-    
     # Verificar que el evento existe
     evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
     if not evento:
@@ -531,20 +449,8 @@ def obtener_profesores_recomendados(evento_id: int, db: Session = Depends(get_db
     # Obtener todos los profesores activos
     todos_profesores = db.query(models.Profesor).filter(models.Profesor.activo == True).all()
     
-    # Obtener conteo de eventos futuros por profesor
-    conteos = db.query(
-        models.Profesor.id,
-        func.count(models.Asignacion.id).label('total')
-    ).outerjoin(
-        models.Asignacion, models.Profesor.id == models.Asignacion.profesor_id
-    ).outerjoin(
-        models.Evento, models.Asignacion.evento_id == models.Evento.id
-    ).filter(
-        models.Profesor.activo == True,
-        (models.Evento.fecha >= date.today()) | (models.Evento.fecha.is_(None))
-    ).group_by(models.Profesor.id).all()
-    
-    conteos_dict = {prof_id: count for prof_id, count in conteos}
+    # Obtener conteo de eventos futuros por profesor (tabla de carga)
+    conteos_dict = dict(db.execute(consultas.carga_futura_stmt()).all())
     
     # Preparar la lista de recomendados
     recomendados = []
@@ -575,252 +481,219 @@ def obtener_profesores_recomendados(evento_id: int, db: Session = Depends(get_db
 
 # ========== ASIGNACIÓN AUTOMÁTICA EQUITATIVA ==========
 
+@app.post("/eventos/planificar")
+def planificar_eventos(
+    fecha_desde: date,
+    fecha_hasta: date,
+    cantidad_profes: int = Query(..., ge=1, description="Profesores por evento (se completan los que falten)"),
+    tipo: Optional[str] = None,
+    simular: bool = Query(False, description="Devolver el plan y su equidad sin guardar nada"),
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Asignar profesores a todos los eventos de un rango de forma equitativa, en una sola transacción"""
+    if simular:
+        return operaciones.planificar_asignaciones(db, fecha_desde, fecha_hasta, cantidad_profes, tipo, simular=True)
+    return escritura.ejecutar(
+        db, lambda s: operaciones.planificar_asignaciones(s, fecha_desde, fecha_hasta, cantidad_profes, tipo)
+    )
+
+
 @app.post("/eventos/{evento_id}/asignar-automatico")
-def asignar_automatico(evento_id: int, cantidad_profes: int, db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+def asignar_automatico(evento_id: int, cantidad_profes: int, db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Asignar profesores a un evento de manera equitativa"""
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    # Obtener profesores activos
-    profesores_activos = db.query(models.Profesor).filter(models.Profesor.activo == True).all()
-    if not profesores_activos:
-        raise HTTPException(status_code=400, detail="No hay profesores activos")
-    
-    if cantidad_profes > len(profesores_activos):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Solo hay {len(profesores_activos)} profesores activos, pero se solicitan {cantidad_profes}"
-        )
-    
-    # Obtener conteo de eventos por profesor (solo eventos futuros)
-    from sqlalchemy import func, case
-    conteos = db.query(
-        models.Profesor.id,
-        func.count(models.Asignacion.id).label('total')
-    ).outerjoin(
-        models.Asignacion, models.Profesor.id == models.Asignacion.profesor_id
-    ).outerjoin(
-        models.Evento, models.Asignacion.evento_id == models.Evento.id
-    ).filter(
-        models.Profesor.activo == True,
-        (models.Evento.fecha >= date.today()) | (models.Evento.fecha.is_(None))
-    ).group_by(models.Profesor.id).all()
-    
-    # Crear diccionario con conteos
-    conteos_dict = {prof_id: count for prof_id, count in conteos}
-    
-    # Asegurar que todos los profesores activos tengan conteo (aunque sea 0)
-    for prof in profesores_activos:
-        if prof.id not in conteos_dict:
-            conteos_dict[prof.id] = 0
-    
-    # Ordenar profesores por cantidad de eventos (menos eventos primero)
-    profesores_ordenados = sorted(
-        profesores_activos,
-        key=lambda p: (conteos_dict.get(p.id, 0), p.id)
-    )
-    
-    # Seleccionar los primeros N profesores
-    profesores_seleccionados = profesores_ordenados[:cantidad_profes]
-    
-    # Crear asignaciones
-    asignaciones_creadas = []
-    for profesor in profesores_seleccionados:
-        # Verificar que no esté ya asignado
-        existe = db.query(models.Asignacion).filter(
-            models.Asignacion.profesor_id == profesor.id,
-            models.Asignacion.evento_id == evento_id
-        ).first()
-        
-        if not existe:
-            asignacion = models.Asignacion(
-                profesor_id=profesor.id,
-                evento_id=evento_id,
-                rol="Profesor"
-            )
-            db.add(asignacion)
-            asignaciones_creadas.append({
-                "profesor_id": profesor.id,
-                "profesor_nombre": profesor.nombre
-            })
-    
-    db.commit()
-    
-    return {
-        "message": f"Se asignaron {len(asignaciones_creadas)} profesores al evento",
-        "asignaciones": asignaciones_creadas
-    }
+    return escritura.ejecutar(db, lambda s: operaciones.asignar_automatico(s, evento_id, cantidad_profes))
 
 
 # ========== ENDPOINTS DE REPORTES ==========
 
-@app.get("/reportes/estadisticas-profesores")
+@app.get(
+    "/reportes/estadisticas-profesores",
+    dependencies=[Depends(cambios.condicional(*reportes.TABLAS_PROFESORES))]
+)
 def estadisticas_profesores(
     fecha_desde: Optional[date] = None,
     fecha_hasta: Optional[date] = None,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Obtener estadísticas de eventos por profesor"""
-    from sqlalchemy import func, and_
-    
-    query = db.query(
-        models.Profesor.id,
-        models.Profesor.nombre,
-        models.Profesor.activo,
-        func.count(models.Asignacion.id).label('total_eventos')
-    ).outerjoin(
-        models.Asignacion, models.Profesor.id == models.Asignacion.profesor_id
-    ).outerjoin(
-        models.Evento, models.Asignacion.evento_id == models.Evento.id
-    )
-    
-    # Aplicar filtros de fecha si existen
-    if fecha_desde or fecha_hasta:
-        condiciones_fecha = []
-        if fecha_desde:
-            condiciones_fecha.append(models.Evento.fecha >= fecha_desde)
-        if fecha_hasta:
-            condiciones_fecha.append(models.Evento.fecha <= fecha_hasta)
-        query = query.filter(and_(*condiciones_fecha))
-    
-    resultados = query.group_by(
-        models.Profesor.id,
-        models.Profesor.nombre,
-        models.Profesor.activo
-    ).order_by(models.Profesor.nombre).all()
-    
-    estadisticas = []
-    for prof_id, nombre, activo, total in resultados:
-        estadisticas.append({
-            "profesor_id": prof_id,
-            "nombre": nombre,
-            "activo": activo,
-            "total_eventos": total or 0
-        })
-    
-    # Calcular estadísticas generales
-    total_eventos = sum(stat['total_eventos'] for stat in estadisticas)
-    promedio = total_eventos / len(estadisticas) if estadisticas else 0
-    
-    return {
-        "estadisticas": estadisticas,
-        "resumen": {
-            "total_profesores": len(estadisticas),
-            "total_eventos_asignados": total_eventos,
-            "promedio_eventos_por_profesor": round(promedio, 2)
-        }
-    }
+    def calcular():
+        resultados = db.execute(consultas.estadisticas_profesores_stmt(fecha_desde, fecha_hasta)).all()
+        return consultas.armar_estadisticas_profesores(resultados)
+
+    return reportes.cacheado("estadisticas-profesores", reportes.TABLAS_PROFESORES, (fecha_desde, fecha_hasta), calcular)
 
 
-@app.get("/reportes/eventos-por-profe/{profesor_id}")
+@app.get(
+    "/reportes/eventos-por-profe/{profesor_id}",
+    dependencies=[Depends(cambios.condicional(*reportes.TABLAS_PROFESORES))]
+)
 def eventos_por_profesor(
     profesor_id: int,
     fecha_desde: Optional[date] = None,
     fecha_hasta: Optional[date] = None,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Obtener todos los eventos de un profesor específico"""
-    from sqlalchemy import and_
-    
-    profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
-    if not profesor:
-        raise HTTPException(status_code=404, detail="Profesor no encontrado")
-    
-    query = db.query(models.Evento).join(
-        models.Asignacion, models.Evento.id == models.Asignacion.evento_id
-    ).filter(
-        models.Asignacion.profesor_id == profesor_id
+    def calcular():
+        profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
+        if not profesor:
+            raise HTTPException(status_code=404, detail="Profesor no encontrado")
+
+        # El rol viene en el mismo join, sin una consulta extra por evento
+        filas = db.execute(consultas.eventos_por_profesor_stmt(profesor_id, fecha_desde, fecha_hasta)).all()
+        return consultas.armar_eventos_por_profesor(profesor, filas)
+
+    return reportes.cacheado(
+        "eventos-por-profe", reportes.TABLAS_PROFESORES, (profesor_id, fecha_desde, fecha_hasta), calcular
     )
-    
-    if fecha_desde:
-        query = query.filter(models.Evento.fecha >= fecha_desde)
-    if fecha_hasta:
-        query = query.filter(models.Evento.fecha <= fecha_hasta)
-    
-    eventos = query.order_by(models.Evento.fecha).all()
-    
-    eventos_data = []
-    for evento in eventos:
-        asignacion = db.query(models.Asignacion).filter(
-            models.Asignacion.evento_id == evento.id,
-            models.Asignacion.profesor_id == profesor_id
-        ).first()
-        
-        eventos_data.append({
-            "evento_id": evento.id,
-            "nombre": evento.nombre,
-            "fecha": evento.fecha,
-            "tipo": evento.tipo,
-            "ubicacion": evento.ubicacion,
-            "rol": asignacion.rol if asignacion else None
-        })
-    
-    return {
-        "profesor": {
-            "id": profesor.id,
-            "nombre": profesor.nombre,
-            "activo": profesor.activo
-        },
-        "total_eventos": len(eventos_data),
-        "eventos": eventos_data
-    }
 
 
-@app.get("/reportes/distribucion-equitativa")
-def distribucion_equitativa(db: Session = Depends(get_db), current_user: models.Usuario = Depends(auth.get_current_active_admin)):
+@app.get(
+    "/reportes/distribucion-equitativa",
+    dependencies=[Depends(cambios.condicional(*reportes.TABLAS_DISTRIBUCION, por_fecha=True))]
+)
+def distribucion_equitativa(db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
     """Mostrar la distribución actual de eventos entre profesores activos"""
-    from sqlalchemy import func
-    
-    # Obtener solo eventos futuros
-    resultados = db.query(
-        models.Profesor.id,
-        models.Profesor.nombre,
-        func.count(models.Asignacion.id).label('total_eventos')
-    ).outerjoin(
-        models.Asignacion, models.Profesor.id == models.Asignacion.profesor_id
-    ).outerjoin(
-        models.Evento, models.Asignacion.evento_id == models.Evento.id
-    ).filter(
-        models.Profesor.activo == True,
-        (models.Evento.fecha >= date.today()) | (models.Evento.fecha.is_(None))
-    ).group_by(
-        models.Profesor.id,
-        models.Profesor.nombre
-    ).order_by(func.count(models.Asignacion.id).asc()).all()
-    
-    distribucion = []
-    for prof_id, nombre, total in resultados:
-        distribucion.append({
-            "profesor_id": prof_id,
-            "nombre": nombre,
-            "total_eventos_futuros": total or 0
-        })
-    
-    if distribucion:
-        min_eventos = min(d['total_eventos_futuros'] for d in distribucion)
-        max_eventos = max(d['total_eventos_futuros'] for d in distribucion)
-        diferencia = max_eventos - min_eventos
-        
-        return {
-            "distribucion": distribucion,
-            "analisis": {
-                "minimo_eventos": min_eventos,
-                "maximo_eventos": max_eventos,
-                "diferencia": diferencia,
-                "es_equitativo": diferencia <= 1
-            }
-        }
-    
-    return {
-        "distribucion": [],
-        "analisis": {
-            "mensaje": "No hay eventos futuros asignados"
-        }
-    }
+    hoy = date.today()
+
+    def calcular():
+        resultados = db.execute(consultas.distribucion_equitativa_stmt(hoy)).all()
+        return consultas.armar_distribucion_equitativa(resultados)
+
+    # "Futuros" depende del día: la fecha va en la clave
+    return reportes.cacheado("distribucion-equitativa", reportes.TABLAS_DISTRIBUCION, (hoy,), calcular)
+
+
+@app.get("/reportes/actividades", dependencies=[Depends(cambios.condicional(*reportes.TABLAS_ACTIVIDADES))])
+def reporte_actividades(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Frecuencia de cada actividad en los eventos"""
+    def calcular():
+        resultados = db.execute(consultas.actividades_stmt(fecha_desde, fecha_hasta)).all()
+        return consultas.armar_actividades(resultados)
+
+    return reportes.cacheado("actividades", reportes.TABLAS_ACTIVIDADES, (fecha_desde, fecha_hasta), calcular)
+
+
+@app.get(
+    "/reportes/series",
+    dependencies=[Depends(cambios.condicional(*reportes.TABLAS_SERIES, por_fecha=True))]
+)
+def series_asignaciones(
+    periodo: Literal["semana", "mes"] = "mes",
+    fecha_desde: Optional[date] = Query(None, description="Por defecto, un año antes de fecha_hasta"),
+    fecha_hasta: Optional[date] = Query(None, description="Por defecto, hoy"),
+    profesor_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Asignaciones por semana o mes, por profesor y por tipo de evento (períodos sin asignaciones en 0)"""
+    fecha_hasta = fecha_hasta or date.today()
+    fecha_desde = fecha_desde or fecha_hasta - timedelta(days=365)
+    periodos = consultas.periodos_serie(periodo, fecha_desde, fecha_hasta)
+
+    def calcular():
+        profesores = db.execute(consultas.profesores_serie_stmt(profesor_id)).all()
+        if profesor_id is not None and not profesores:
+            raise HTTPException(status_code=404, detail="Profesor no encontrado")
+        filas = db.execute(consultas.series_stmt(periodo, periodos, profesor_id, tipo)).all()
+        return consultas.armar_series(periodo, periodos, profesores, filas, tipo)
+
+    return reportes.cacheado(
+        "series", reportes.TABLAS_SERIES, (periodo, periodos[0], periodos[-1], profesor_id, tipo), calcular
+    )
+
+
+# ========== DASHBOARD ==========
+
+@app.get("/dashboard/resumen", dependencies=[Depends(cambios.condicional(*TABLAS_DASHBOARD, por_fecha=True))])
+def resumen_dashboard(
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Totales de profesores, eventos y tareas y la equidad de la carga en un solo request"""
+    hoy = date.today()
+    # Con las versiones en la clave, cualquier cambio confirmado invalida el resumen guardado
+    clave = (hoy, cambios.versiones(TABLAS_DASHBOARD))
+    resumen = _resumen_cache.obtener(clave)
+    if resumen is None:
+        fila = db.execute(consultas.resumen_dashboard_stmt(hoy)).one()
+        distribucion = db.execute(consultas.distribucion_equitativa_stmt(hoy)).all()
+        resumen = consultas.armar_resumen_dashboard(fila, distribucion)
+        _resumen_cache.guardar(clave, resumen)
+
+    # Las tareas son del usuario, así que se cuentan aparte (índice por usuario_id)
+    pendientes = db.scalar(
+        select(func.count()).select_from(models.Tarea).where(
+            models.Tarea.usuario_id == current_user.id, models.Tarea.completada == False
+        )
+    )
+    # Sin max-age: el navegador revalida con el ETag (Cache-Control: private, no-cache)
+    return {**resumen, "tareas_pendientes": pendientes}
+
+
+# ========== EXPORTAR ==========
+
+@app.get("/exportar/eventos")
+def exportar_eventos(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    tipo: Optional[str] = None,
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Exportar eventos (con sus actividades) en NDJSON o CSV, por streaming"""
+    stmt = consultas.eventos_filas_stmt(fecha_desde, fecha_hasta, tipo)
+    return exportar.respuesta(stmt, formato, "eventos", exportar.COLUMNAS_EVENTOS, consultas.cargar_eventos)
+
+
+@app.get("/exportar/asignaciones")
+def exportar_asignaciones(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    tipo: Optional[str] = None,
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Exportar asignaciones con el evento y el profesor en NDJSON o CSV, por streaming"""
+    stmt = exportar.asignaciones_stmt(fecha_desde, fecha_hasta, tipo)
+    return exportar.respuesta(stmt, formato, "asignaciones", exportar.COLUMNAS_ASIGNACIONES)
+
+
+@app.get("/exportar/tareas")
+def exportar_tareas(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    prioridad: Optional[str] = None,
+    completada: Optional[bool] = None,
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Exportar las tareas del usuario actual en NDJSON o CSV, por streaming"""
+    stmt = exportar.tareas_stmt(current_user.id, fecha_desde, fecha_hasta, prioridad, completada)
+    return exportar.respuesta(stmt, formato, "tareas", exportar.COLUMNAS_TAREAS)
+
+
+# ========== DIAGNÓSTICO ==========
+
+@app.get("/admin/diagnostico/db")
+def diagnostico_db(current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
+    """Mostrar el perfil de almacenamiento y los PRAGMAs efectivos de la base de datos"""
+    return database.diagnostico_sqlite()
+
+
+@app.get("/admin/diagnostico/carga")
+def diagnostico_carga(db: Session = Depends(get_db), current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)):
+    """Comparar las tablas de carga y resumen por profesor con las asignaciones reales"""
+    return carga.verificar(db)
 
 
 # ========== ENDPOINTS DE TAREAS ==========
@@ -829,53 +702,42 @@ def distribucion_equitativa(db: Session = Depends(get_db), current_user: models.
 def crear_tarea(
     tarea: schemas.TareaCreate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Crear una nueva tarea para el usuario actual"""
-    db_tarea = models.Tarea(
-        usuario_id=current_user.id,
-        titulo=tarea.titulo,
-        descripcion=tarea.descripcion,
-        fecha_vencimiento=tarea.fecha_vencimiento,
-        prioridad=tarea.prioridad,
-        completada=False
-    )
-    db.add(db_tarea)
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.crear_tarea(s, tarea, current_user.id))
 
 
-@app.get("/tareas/", response_model=List[schemas.Tarea])
+@app.get("/tareas/", response_model=List[schemas.Tarea], dependencies=[Depends(cambios.condicional("tareas"))])
 def listar_tareas(
+    response: Response,
     completada: Optional[bool] = None,
     prioridad: Optional[str] = None,
+    pagina: paginacion.Paginacion = Depends(paginacion.parametros),
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Listar tareas del usuario actual con filtros opcionales"""
-    query = db.query(models.Tarea).filter(models.Tarea.usuario_id == current_user.id)
+    stmt = select(*respuestas.columnas(models.Tarea.__table__, schemas.Tarea)).where(
+        models.Tarea.usuario_id == current_user.id
+    )
     
     if completada is not None:
-        query = query.filter(models.Tarea.completada == completada)
+        stmt = stmt.where(models.Tarea.completada == completada)
     if prioridad:
-        query = query.filter(models.Tarea.prioridad == prioridad)
+        stmt = stmt.where(models.Tarea.prioridad == prioridad)
     
     # Ordenar por fecha de vencimiento (las más urgentes primero), luego por prioridad
-    query = query.order_by(
-        models.Tarea.fecha_vencimiento.asc().nullslast(),
-        models.Tarea.prioridad.desc(),
-        models.Tarea.creada_en.desc()
-    )
-    
-    return query.all()
+    claves = consultas.tareas_claves()
+    tareas = paginacion.paginar(db, paginacion.ordenar(stmt, claves), claves, pagina, response, mapeos=True)
+    return respuestas.json_directo(tareas, response)
 
 
 @app.get("/tareas/{tarea_id}", response_model=schemas.Tarea)
 def obtener_tarea(
     tarea_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Obtener una tarea por ID del usuario actual"""
     tarea = db.query(models.Tarea).filter(
@@ -892,77 +754,30 @@ def actualizar_tarea(
     tarea_id: int,
     tarea: schemas.TareaUpdate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Actualizar una tarea del usuario actual"""
-    db_tarea = db.query(models.Tarea).filter(
-        models.Tarea.id == tarea_id,
-        models.Tarea.usuario_id == current_user.id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    # Actualizar solo los campos proporcionados
-    update_data = tarea.model_dump(exclude_unset=True)
-    if "completada" in update_data:
-        if update_data["completada"] and not db_tarea.completada:
-            # Si se marca como completada, guardar la fecha
-            db_tarea.completada_en = datetime.utcnow()
-        elif not update_data["completada"]:
-            # Si se desmarca, limpiar la fecha
-            db_tarea.completada_en = None
-    
-    for field, value in update_data.items():
-        if field != "completada":  # Ya lo manejamos arriba
-            setattr(db_tarea, field, value)
-    
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.actualizar_tarea(s, tarea_id, tarea, current_user.id))
 
 
 @app.delete("/tareas/{tarea_id}")
 def eliminar_tarea(
     tarea_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Eliminar una tarea del usuario actual"""
-    db_tarea = db.query(models.Tarea).filter(
-        models.Tarea.id == tarea_id,
-        models.Tarea.usuario_id == current_user.id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    db.delete(db_tarea)
-    db.commit()
-    return {"message": "Tarea eliminada correctamente"}
+    return escritura.ejecutar(db, lambda s: operaciones.eliminar_tarea(s, tarea_id, current_user.id))
 
 
 @app.patch("/tareas/{tarea_id}/toggle")
 def toggle_tarea(
     tarea_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Alternar el estado de completada de una tarea del usuario actual"""
-    db_tarea = db.query(models.Tarea).filter(
-        models.Tarea.id == tarea_id,
-        models.Tarea.usuario_id == current_user.id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    db_tarea.completada = not db_tarea.completada
-    if db_tarea.completada:
-        db_tarea.completada_en = datetime.utcnow()
-    else:
-        db_tarea.completada_en = None
-    
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.toggle_tarea(s, tarea_id, current_user.id))
 
 
 # ========== ENDPOINTS DE TAREAS DE EVENTO ==========
@@ -972,31 +787,21 @@ def crear_tarea_evento(
     evento_id: int,
     tarea: schemas.TareaEventoBase,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Crear una nueva tarea para un evento"""
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    db_tarea = models.TareaEvento(
-        evento_id=evento_id,
-        descripcion=tarea.descripcion,
-        completada=False
-    )
-    db.add(db_tarea)
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.crear_tarea_evento(s, evento_id, tarea))
 
 
-@app.get("/eventos/{evento_id}/tareas", response_model=List[schemas.TareaEvento])
+@app.get(
+    "/eventos/{evento_id}/tareas", response_model=List[schemas.TareaEvento],
+    dependencies=[Depends(cambios.condicional("tareas_evento"))]
+)
 def listar_tareas_evento(
     evento_id: int,
     completada: Optional[bool] = None,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Listar tareas de un evento con filtros opcionales"""
     # Verificar que el evento existe
@@ -1024,38 +829,10 @@ def actualizar_tarea_evento(
     tarea_id: int,
     tarea: schemas.TareaEventoUpdate,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Actualizar una tarea de un evento"""
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    db_tarea = db.query(models.TareaEvento).filter(
-        models.TareaEvento.id == tarea_id,
-        models.TareaEvento.evento_id == evento_id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    # Actualizar solo los campos proporcionados
-    update_data = tarea.model_dump(exclude_unset=True)
-    if "completada" in update_data:
-        if update_data["completada"] and not db_tarea.completada:
-            # Si se marca como completada, guardar la fecha
-            db_tarea.completada_en = datetime.utcnow()
-        elif not update_data["completada"]:
-            # Si se desmarca, limpiar la fecha
-            db_tarea.completada_en = None
-    
-    for field, value in update_data.items():
-        if field != "completada":  # Ya lo manejamos arriba
-            setattr(db_tarea, field, value)
-    
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.actualizar_tarea_evento(s, evento_id, tarea_id, tarea))
 
 
 @app.delete("/eventos/{evento_id}/tareas/{tarea_id}")
@@ -1063,24 +840,10 @@ def eliminar_tarea_evento(
     evento_id: int,
     tarea_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Eliminar una tarea de un evento"""
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    db_tarea = db.query(models.TareaEvento).filter(
-        models.TareaEvento.id == tarea_id,
-        models.TareaEvento.evento_id == evento_id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    db.delete(db_tarea)
-    db.commit()
-    return {"message": "Tarea eliminada correctamente"}
+    return escritura.ejecutar(db, lambda s: operaciones.eliminar_tarea_evento(s, evento_id, tarea_id))
 
 
 @app.patch("/eventos/{evento_id}/tareas/{tarea_id}/toggle")
@@ -1088,30 +851,22 @@ def toggle_tarea_evento(
     evento_id: int,
     tarea_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(auth.get_current_active_admin)
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
 ):
     """Alternar el estado de completada de una tarea de un evento"""
-    # Verificar que el evento existe
-    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento no encontrado")
-    
-    db_tarea = db.query(models.TareaEvento).filter(
-        models.TareaEvento.id == tarea_id,
-        models.TareaEvento.evento_id == evento_id
-    ).first()
-    if not db_tarea:
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    
-    db_tarea.completada = not db_tarea.completada
-    if db_tarea.completada:
-        db_tarea.completada_en = datetime.utcnow()
-    else:
-        db_tarea.completada_en = None
-    
-    db.commit()
-    db.refresh(db_tarea)
-    return db_tarea
+    return escritura.ejecutar(db, lambda s: operaciones.toggle_tarea_evento(s, evento_id, tarea_id))
+
+
+# ========== BATCH ==========
+
+@app.post("/batch")
+def ejecutar_batch(
+    lote: schemas.Batch,
+    db: Session = Depends(get_db),
+    current_user: auth.UsuarioActual = Depends(auth.get_current_active_admin)
+):
+    """Ejecutar varias operaciones de escritura (crear/actualizar/eliminar) en una sola transacción"""
+    return batch.ejecutar(db, lote, current_user)
 
 
 @app.get("/{full_path:path}", include_in_schema=False)
@@ -0,0 +1,32 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+    python -m migraciones            # aplicar las pendientes
+    python -m migraciones --dry-run  # ver qué se haría y cuánto tardaría
+    python -m migraciones --estado   # versiones aplicadas y pendientes
+"""
+from sqlalchemy import Engine
+from typing import List
+from .nucleo import Migracion, versiones_aplicadas
+from .nucleo import aplicar as _aplicar
+from .nucleo import pendientes as _pendientes
+from .nucleo import planificar as _planificar
+from .versiones import MIGRACIONES
+
+
+def aplicar(engine: Engine) -> List[Migracion]:
+    """Aplicar las migraciones pendientes"""
+    return _aplicar(engine, MIGRACIONES)
+
+
+def pendientes(engine: Engine) -> List[Migracion]:
+    """Migraciones que todavía no se aplicaron"""
+    return _pendientes(engine, MIGRACIONES)
+
+
+def planificar(engine: Engine) -> List[dict]:
+    """Dry-run de las migraciones pendientes con tiempos estimados"""
+    return _planificar(engine, MIGRACIONES)
+
+
+__all__ = ["MIGRACIONES", "Migracion", "aplicar", "pendientes", "planificar", "versiones_aplicadas"]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Aplicar las migraciones pendientes (o mostrar el plan con --dry-run)"""
+import argparse
+import logging
+import sys
+from database import engine
+from . import MIGRACIONES, aplicar, planificar, versiones_aplicadas
+
+
+def mostrar_plan():
+    plan = planificar(engine)
+    if not plan:
+        print("✓ El esquema está al día")
+        return
+    total = 0.0
+    for migracion in plan:
+        print(f"{migracion['version']:04d} {migracion['nombre']}  (~{migracion['segundos']:.1f} s)")
+        for paso in migracion["pasos"]:
+            if not paso["necesario"]:
+                print(f"     - {paso['paso']}: ya aplicado")
+                continue
+            if paso.get("depende_de_pasos_anteriores"):
+                print(f"     - {paso['paso']}: después de los pasos anteriores")
+                continue
+            detalle = f"{paso['filas']} filas" if paso["filas"] else "solo esquema"
+            if paso.get("lotes"):
+                detalle += f" en {paso['lotes']} lotes"
+            print(f"     - {paso['paso']}: {detalle}, ~{paso['segundos']:.2f} s")
+        total += migracion["segundos"]
+    print(f"Total estimado: ~{total:.1f} s")
+
+
+def mostrar_estado():
+    aplicadas = versiones_aplicadas(engine)
+    for migracion in MIGRACIONES:
+        cuando = aplicadas.get(migracion.version)
+        estado = f"aplicada {cuando:%Y-%m-%d %H:%M}" if cuando else "pendiente"
+        print(f"{migracion.version:04d} {migracion.nombre:<30} {estado}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m migraciones", description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="mostrar el plan sin modificar la base")
+    parser.add_argument("--estado", action="store_true", help="listar versiones aplicadas y pendientes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        if args.estado:
+            mostrar_estado()
+        elif args.dry_run:
+            mostrar_plan()
+        else:
+            aplicadas = aplicar(engine)
+            print(f"✓ {len(aplicadas)} migraciones aplicadas" if aplicadas else "✓ El esquema está al día")
+    except Exception as e:
+        print(f"ERROR en la migración: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
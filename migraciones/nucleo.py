@@ -0,0 +1,645 @@
+"""
+Núcleo del sistema de migraciones.
+
+Cada `Migracion` tiene un número de versión y una lista de pasos. Las versiones
+aplicadas se registran en la tabla `schema_version`; `aplicar()` ejecuta en orden
+las que faltan. Todos los pasos verifican el esquema antes de actuar, así que una
+base creada con una versión anterior del código (o migrada a mano con los viejos
+scripts `migrate_*.py`) solo registra las versiones que ya tiene.
+
+El dry-run (`planificar`) no escribe nada: parte del esquema real y le suma el
+efecto de cada paso pendiente, así los pasos que leen tablas o columnas que crea
+un paso anterior se evalúan sobre el esquema que van a encontrar.
+
+`ReconstruirTabla` copia la tabla en lotes cortos, cada uno en su propia
+transacción, y guarda el último id copiado en `schema_progreso`: mientras dura la
+copia la API sigue leyendo (y escribiendo) la tabla original, y si el proceso se
+corta la copia continúa donde quedó. Solo el cambio final (filas nuevas, borradas,
+DROP y RENAME) toma el lock de escritura.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import (
+    Column, DateTime, Engine, Index, Integer, MetaData, String, Table, func, insert,
+    inspect, select, text
+)
+from sqlalchemy.engine import Connection
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("nombre", String(200), nullable=False),
+    Column("aplicada_en", DateTime, nullable=False),
+    Column("duracion_segundos", Integer),
+)
+
+# Avance de las reconstrucciones de tablas en curso (para poder retomarlas)
+schema_progreso = Table(
+    "schema_progreso", _metadata,
+    Column("tabla", String(100), primary_key=True),
+    Column("ultimo_id", Integer, nullable=False),
+    Column("copiadas", Integer, nullable=False),
+    Column("actualizado_en", DateTime, nullable=False),
+)
+
+# Clave del advisory lock de PostgreSQL que serializa migraciones de varias réplicas
+_CLAVE_LOCK_PG = 0x636F6C6F
+
+
+Requisitos = Dict[str, Tuple[str, ...]]  # tabla -> columnas
+
+
+class Esquema:
+    """Tablas de la base con sus columnas e índices (leídas o simuladas por el dry-run)"""
+
+    def __init__(self, tablas: Optional[Dict[str, Dict[str, Set[str]]]] = None):
+        self.tablas = tablas or {}  # tabla -> {"columnas": {...}, "indices": {...}}
+
+    @classmethod
+    def leer(cls, conn: Connection) -> "Esquema":
+        inspector = inspect(conn)
+        return cls({
+            tabla: {
+                "columnas": {c["name"] for c in inspector.get_columns(tabla)},
+                "indices": {i["name"] for i in inspector.get_indexes(tabla)},
+            }
+            for tabla in inspector.get_table_names()
+        })
+
+    def copia(self) -> "Esquema":
+        return Esquema({tabla: {k: set(v) for k, v in datos.items()} for tabla, datos in self.tablas.items()})
+
+    def columnas(self, tabla: str) -> Set[str]:
+        return self.tablas.get(tabla, {}).get("columnas", set())
+
+    def indices(self, tabla: str) -> Set[str]:
+        return self.tablas.get(tabla, {}).get("indices", set())
+
+    def cumple(self, requisitos: Requisitos) -> bool:
+        """Si existen todas las tablas y columnas pedidas"""
+        return all(
+            tabla in self.tablas and set(columnas) <= self.columnas(tabla)
+            for tabla, columnas in requisitos.items()
+        )
+
+    def agregar_tabla(self, tabla: Table, indices: Iterable[str] = ()):
+        self.tablas[tabla.name] = {
+            "columnas": {c.name for c in tabla.columns},
+            "indices": {i.name for i in tabla.indexes} | set(indices),
+        }
+
+
+class Paso(ABC):
+    """Un cambio de esquema idempotente dentro de una migración.
+
+    Si hace falta se decide en dos partes: `segun_esquema` mira solo tablas,
+    columnas e índices, y `segun_datos` consulta las filas. `requiere` son las
+    tablas y columnas que leen `segun_datos` y `estimar`; en el dry-run, si la
+    base todavía no las tiene (las crea un paso anterior), no se consultan.
+    """
+
+    descripcion = ""
+    requiere: Requisitos = {}
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return True
+
+    def segun_datos(self, conn: Connection) -> bool:
+        return True
+
+    def necesario(self, conn: Connection) -> bool:
+        return self.segun_esquema(Esquema.leer(conn)) and self.segun_datos(conn)
+
+    @property
+    def requiere_estimar(self) -> Requisitos:
+        return self.requiere
+
+    def estimar(self, conn: Connection) -> dict:
+        """Filas afectadas y segundos estimados; solo lee la base"""
+        return {"filas": 0, "segundos": 0.0}
+
+    def efecto(self, esquema: Esquema):
+        """Cambiar el esquema simulado del dry-run como lo cambiaría `aplicar`"""
+
+    @abstractmethod
+    def aplicar(self, engine: Engine):
+        """Ejecutar el paso; cada paso abre sus propias transacciones"""
+
+
+class CrearTablas(Paso):
+    """Crear las tablas (con sus índices) que todavía no existen.
+
+    Las definiciones van congeladas en cada migración, no se toman de los modelos:
+    una base nueva pasa por los mismos esquemas que una existente. `tablas` elige
+    cuáles crear; el resto de `metadata` solo está para resolver claves foráneas.
+    """
+
+    def __init__(self, metadata: MetaData, tablas: Optional[List[str]] = None):
+        self.metadata = metadata
+        self.tablas = [metadata.tables[nombre] for nombre in (tablas or metadata.tables)]
+        self.descripcion = "crear " + ", ".join(tabla.name for tabla in self.tablas)
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return any(tabla.name not in esquema.tablas for tabla in self.tablas)
+
+    def efecto(self, esquema: Esquema):
+        for tabla in self.tablas:
+            if tabla.name not in esquema.tablas:
+                esquema.agregar_tabla(tabla)
+
+    def aplicar(self, engine: Engine):
+        self.metadata.create_all(bind=engine, tables=self.tablas, checkfirst=True)
+
+
+class AgregarColumna(Paso):
+    """ALTER TABLE ... ADD COLUMN si la columna no existe (solo cambia metadatos)"""
+
+    def __init__(self, tabla: str, columna: Column):
+        self.tabla = tabla
+        self.columna = columna
+        self.descripcion = f"agregar {tabla}.{columna.name}"
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return self.columna.name not in esquema.columnas(self.tabla)
+
+    def efecto(self, esquema: Esquema):
+        esquema.columnas(self.tabla).add(self.columna.name)
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            tipo = self.columna.type.compile(dialect=conn.dialect)
+            ddl = f"ALTER TABLE {self.tabla} ADD COLUMN {self.columna.name} {tipo}"
+            if self.columna.server_default is not None:
+                ddl += f" DEFAULT {self.columna.server_default.arg}"
+            if not self.columna.nullable:
+                ddl += " NOT NULL"
+            conn.execute(text(ddl))
+
+
+class EliminarColumna(Paso):
+    """ALTER TABLE ... DROP COLUMN si la columna existe"""
+
+    def __init__(self, tabla: str, columna: str):
+        self.tabla = tabla
+        self.columna = columna
+        self.descripcion = f"eliminar {tabla}.{columna}"
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return self.columna in esquema.columnas(self.tabla)
+
+    def efecto(self, esquema: Esquema):
+        esquema.columnas(self.tabla).discard(self.columna)
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {self.tabla} DROP COLUMN {self.columna}"))
+
+
+class CrearIndice(Paso):
+    """CREATE INDEX si no existe un índice con ese nombre"""
+
+    def __init__(self, nombre: str, tabla: str, columnas: List[str], unique: bool = False):
+        self.nombre = nombre
+        self.tabla = tabla
+        self.columnas = columnas
+        self.unique = unique
+        self.descripcion = f"crear índice {nombre}"
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return self.nombre not in esquema.indices(self.tabla)
+
+    @property
+    def requiere_estimar(self) -> Requisitos:
+        return {self.tabla: tuple(self.columnas)}
+
+    def efecto(self, esquema: Esquema):
+        esquema.indices(self.tabla).add(self.nombre)
+
+    def estimar(self, conn: Connection) -> dict:
+        filas = conn.execute(text(f"SELECT COUNT(*) FROM {self.tabla}")).scalar()
+        inicio = time.perf_counter()
+        conn.execute(text(
+            f"SELECT {', '.join(self.columnas)} FROM {self.tabla} "
+            f"ORDER BY {', '.join(self.columnas)}"
+        )).fetchall()
+        return {"filas": filas, "segundos": round(time.perf_counter() - inicio, 3)}
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            tabla = Table(self.tabla, MetaData(), autoload_with=conn)
+            Index(self.nombre, *[tabla.c[c] for c in self.columnas], unique=self.unique).create(
+                bind=conn, checkfirst=True
+            )
+
+
+class EjecutarFuncion(Paso):
+    """Paso de datos escrito a mano; `funcion(conn)` corre en una transacción.
+
+    `necesario(conn)` y `estimar(conn)` solo pueden leer, y `requiere` lista las
+    tablas y columnas que consultan.
+    """
+
+    def __init__(self, descripcion: str, funcion: Callable[[Connection], None],
+                 necesario: Optional[Callable[[Connection], bool]] = None,
+                 estimar: Optional[Callable[[Connection], dict]] = None,
+                 requiere: Optional[Requisitos] = None):
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self._necesario = necesario
+        self._estimar = estimar
+        self.requiere = requiere or {}
+
+    def segun_datos(self, conn: Connection) -> bool:
+        return self._necesario(conn) if self._necesario else True
+
+    def estimar(self, conn: Connection) -> dict:
+        return self._estimar(conn) if self._estimar else super().estimar(conn)
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            self.funcion(conn)
+
+
+class ProcesarEnLotes(Paso):
+    """Recorrer una tabla por rangos de id, cada lote en su propia transacción.
+
+    `funcion(conn, desde, hasta)` procesa las filas con desde < id <= hasta (por
+    ejemplo, un back-fill). El avance se guarda en `schema_progreso` con la clave
+    `nombre`, así que si el proceso se corta continúa desde el último lote.
+
+    Si hace falta lo deciden `si_esquema(esquema)` y `necesario(conn)` (que lee
+    las tablas y columnas de `requiere`).
+    """
+
+    def __init__(self, nombre: str, tabla: str, funcion: Callable[[Connection, int, int], None],
+                 si_esquema: Optional[Callable[[Esquema], bool]] = None,
+                 necesario: Optional[Callable[[Connection], bool]] = None,
+                 requiere: Optional[Requisitos] = None, descripcion: str = "",
+                 lote: int = 2000, pausa_ms: float = 0):
+        self.nombre = nombre
+        self.tabla = tabla
+        self.funcion = funcion
+        self._si_esquema = si_esquema
+        self._necesario = necesario
+        self.requiere = requiere or {}
+        self.descripcion = descripcion or nombre
+        self.lote = lote
+        self.pausa = pausa_ms / 1000
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return self._si_esquema(esquema) if self._si_esquema else True
+
+    def segun_datos(self, conn: Connection) -> bool:
+        return self._necesario(conn) if self._necesario else True
+
+    @property
+    def requiere_estimar(self) -> Requisitos:
+        return {self.tabla: ("id",)}
+
+    def _tabla(self, conn: Connection) -> Table:
+        return Table(self.tabla, MetaData(), autoload_with=conn)
+
+    def _siguiente_limite(self, conn: Connection, tabla: Table, desde: int) -> Optional[int]:
+        hasta = conn.execute(
+            select(tabla.c.id).where(tabla.c.id > desde).order_by(tabla.c.id)
+            .offset(self.lote - 1).limit(1)
+        ).scalar()
+        if hasta is None:
+            hasta = conn.execute(select(func.max(tabla.c.id)).where(tabla.c.id > desde)).scalar()
+        return hasta
+
+    def estimar(self, conn: Connection) -> dict:
+        tabla = self._tabla(conn)
+        filas = conn.execute(select(func.count()).select_from(tabla)).scalar()
+        if not filas:
+            return {"filas": 0, "segundos": 0.0, "lotes": 0}
+        # Medir la lectura de un lote: el dry-run no ejecuta la función (escribe),
+        # así que el tiempo real es mayor que esta estimación
+        hasta = self._siguiente_limite(conn, tabla, 0)
+        inicio = time.perf_counter()
+        conn.execute(select(tabla).where(tabla.c.id <= hasta)).fetchall()
+        duracion = time.perf_counter() - inicio
+        lotes = -(-filas // self.lote)
+        por_fila = duracion / min(filas, self.lote)
+        return {
+            "filas": filas,
+            "lotes": lotes,
+            "segundos": round(filas * por_fila + lotes * self.pausa, 3),
+        }
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            progreso = conn.execute(
+                select(schema_progreso).where(schema_progreso.c.tabla == self.nombre)
+            ).first()
+            if progreso is None:
+                conn.execute(insert(schema_progreso).values(
+                    tabla=self.nombre, ultimo_id=0, copiadas=0, actualizado_en=datetime.utcnow()
+                ))
+                ultimo, procesadas = 0, 0
+            else:
+                ultimo, procesadas = progreso.ultimo_id, progreso.copiadas
+                logger.info("Retomando %s desde el id %s", self.nombre, ultimo)
+            tabla = self._tabla(conn)
+
+        while True:
+            with engine.begin() as conn:
+                hasta = self._siguiente_limite(conn, tabla, ultimo)
+                if hasta is None:
+                    conn.execute(schema_progreso.delete().where(schema_progreso.c.tabla == self.nombre))
+                    break
+                self.funcion(conn, ultimo, hasta)
+                procesadas += conn.execute(
+                    select(func.count()).select_from(tabla).where(tabla.c.id > ultimo, tabla.c.id <= hasta)
+                ).scalar()
+                ultimo = hasta
+                conn.execute(schema_progreso.update().where(
+                    schema_progreso.c.tabla == self.nombre
+                ).values(ultimo_id=ultimo, copiadas=procesadas, actualizado_en=datetime.utcnow()))
+            logger.info("%s: %s filas procesadas (id <= %s)", self.nombre, procesadas, ultimo)
+            if self.pausa:
+                time.sleep(self.pausa)
+
+
+class ReconstruirTabla(Paso):
+    """Reconstruir una tabla copiando las filas en lotes reanudables.
+
+    `definicion(metadata, nombre)` devuelve la tabla nueva (sin índices) y
+    `valores(conn, vieja)` un dict columna -> expresión sobre la tabla vieja para
+    las columnas que no se copian tal cual. `indices` se crean tras el RENAME.
+    `si_esquema(esquema)` decide si hace falta.
+
+    Las filas actualizadas en la tabla vieja después de copiadas no se vuelven a
+    copiar: la reconstrucción reconcilia altas y bajas, no modificaciones.
+    """
+
+    def __init__(self, tabla: str, definicion: Callable[[MetaData, str], Table],
+                 si_esquema: Callable[[Esquema], bool],
+                 valores: Optional[Callable[[Connection, Table], Dict]] = None,
+                 indices: Optional[List[tuple]] = None,
+                 descripcion: str = "",
+                 lote: int = 2000, pausa_ms: float = 0):
+        self.tabla = tabla
+        self.nueva = f"{tabla}__nueva"
+        self.definicion = definicion
+        self._si_esquema = si_esquema
+        self.requiere = {tabla: ("id",)}
+        self.valores = valores or (lambda conn, vieja: {})
+        self.indices = indices or []
+        self.descripcion = descripcion or f"reconstruir {tabla}"
+        self.lote = lote
+        self.pausa = pausa_ms / 1000
+
+    def segun_esquema(self, esquema: Esquema) -> bool:
+        return self._si_esquema(esquema)
+
+    def efecto(self, esquema: Esquema):
+        esquema.agregar_tabla(self.definicion(MetaData(), self.tabla), [nombre for nombre, *_ in self.indices])
+
+    def _tablas(self, conn: Connection):
+        metadata = MetaData()
+        # Reflejar el resto del esquema para que resuelvan las claves foráneas de la tabla nueva
+        metadata.reflect(bind=conn, only=lambda nombre, _: nombre != self.nueva)
+        nueva = self.definicion(metadata, self.nueva)
+        return metadata.tables[self.tabla], nueva
+
+    def _select(self, conn: Connection, vieja: Table, nueva: Table):
+        especiales = self.valores(conn, vieja)
+        columnas = [c.name for c in nueva.columns]
+        expresiones = [
+            especiales[c].label(c) if c in especiales else vieja.c[c]
+            for c in columnas
+        ]
+        return columnas, select(*expresiones)
+
+    def _copiar(self, conn: Connection, vieja: Table, nueva: Table, desde: int, hasta: int) -> int:
+        columnas, consulta = self._select(conn, vieja, nueva)
+        consulta = consulta.where(vieja.c.id > desde, vieja.c.id <= hasta)
+        return conn.execute(insert(nueva).from_select(columnas, consulta)).rowcount
+
+    def _siguiente_limite(self, conn: Connection, vieja: Table, desde: int) -> Optional[int]:
+        """Id final del próximo lote (o None si no quedan filas)"""
+        hasta = conn.execute(
+            select(vieja.c.id).where(vieja.c.id > desde).order_by(vieja.c.id)
+            .offset(self.lote - 1).limit(1)
+        ).scalar()
+        if hasta is None:
+            hasta = conn.execute(select(func.max(vieja.c.id)).where(vieja.c.id > desde)).scalar()
+        return hasta
+
+    def estimar(self, conn: Connection) -> dict:
+        vieja, nueva = self._tablas(conn)
+        filas = conn.execute(select(func.count()).select_from(vieja)).scalar()
+        if not filas:
+            return {"filas": 0, "segundos": 0.0, "lotes": 0}
+
+        # Medir la lectura de un lote con las expresiones de la copia (solo lectura:
+        # el INSERT en la tabla nueva no se mide)
+        _, consulta = self._select(conn, vieja, nueva)
+        inicio = time.perf_counter()
+        conn.execute(consulta.order_by(vieja.c.id).limit(self.lote)).fetchall()
+        duracion = time.perf_counter() - inicio
+
+        lotes = -(-filas // self.lote)
+        por_fila = duracion / min(filas, self.lote)
+        return {
+            "filas": filas,
+            "lotes": lotes,
+            "segundos": round(filas * por_fila + lotes * self.pausa, 3),
+        }
+
+    def aplicar(self, engine: Engine):
+        with engine.begin() as conn:
+            progreso = conn.execute(
+                select(schema_progreso).where(schema_progreso.c.tabla == self.tabla)
+            ).first()
+            existe_nueva = inspect(conn).has_table(self.nueva)
+            if existe_nueva and progreso is None:
+                # Quedó una copia sin registro de avance: empezar de nuevo
+                conn.execute(text(f"DROP TABLE {self.nueva}"))
+                existe_nueva = False
+            if not existe_nueva:
+                conn.execute(schema_progreso.delete().where(schema_progreso.c.tabla == self.tabla))
+                _, nueva = self._tablas(conn)
+                nueva.create(bind=conn)
+                conn.execute(insert(schema_progreso).values(
+                    tabla=self.tabla, ultimo_id=0, copiadas=0, actualizado_en=datetime.utcnow()
+                ))
+                ultimo, copiadas = 0, 0
+            else:
+                ultimo, copiadas = progreso.ultimo_id, progreso.copiadas
+                logger.info("Retomando la copia de %s desde el id %s", self.tabla, ultimo)
+
+        with engine.connect() as conn:
+            vieja, nueva = self._tablas(conn)
+
+        # Copia en lotes: cada uno es una transacción corta
+        while True:
+            with engine.begin() as conn:
+                hasta = self._siguiente_limite(conn, vieja, ultimo)
+                if hasta is None:
+                    break
+                copiadas += self._copiar(conn, vieja, nueva, ultimo, hasta)
+                ultimo = hasta
+                conn.execute(schema_progreso.update().where(
+                    schema_progreso.c.tabla == self.tabla
+                ).values(ultimo_id=ultimo, copiadas=copiadas, actualizado_en=datetime.utcnow()))
+            logger.info("%s: %s filas copiadas (id <= %s)", self.tabla, copiadas, ultimo)
+            if self.pausa:
+                time.sleep(self.pausa)
+
+        # Cambio final: filas agregadas o borradas durante la copia, y reemplazo de la tabla
+        with engine.begin() as conn:
+            maximo = conn.execute(select(func.max(vieja.c.id))).scalar() or 0
+            if maximo > ultimo:
+                self._copiar(conn, vieja, nueva, ultimo, maximo)
+            conn.execute(nueva.delete().where(nueva.c.id.not_in(select(vieja.c.id))))
+            conn.execute(text(f"DROP TABLE {self.tabla}"))
+            conn.execute(text(f"ALTER TABLE {self.nueva} RENAME TO {self.tabla}"))
+
+            if conn.dialect.name == "postgresql":
+                # La secuencia conserva el nombre de la tabla nueva: ajustarla a los ids copiados
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{self.tabla}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {self.tabla}), 0) + 1, false)"
+                ))
+
+            final = Table(self.tabla, MetaData(), autoload_with=conn)
+            for nombre, columnas, *unico in self.indices:
+                Index(nombre, *[final.c[c] for c in columnas], unique=bool(unico and unico[0])).create(
+                    bind=conn, checkfirst=True
+                )
+            conn.execute(schema_progreso.delete().where(schema_progreso.c.tabla == self.tabla))
+
+
+class Migracion:
+    """Versión del esquema: un número, un nombre y sus pasos en orden"""
+
+    def __init__(self, version: int, nombre: str, pasos: List[Paso]):
+        self.version = version
+        self.nombre = nombre
+        self.pasos = pasos
+
+    def __repr__(self):
+        return f"<Migracion {self.version:04d} {self.nombre}>"
+
+
+def _asegurar_tablas_control(engine: Engine):
+    _metadata.create_all(bind=engine, checkfirst=True)
+
+
+def versiones_aplicadas(engine: Engine) -> Dict[int, datetime]:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_version.name):
+            return {}
+        return dict(conn.execute(select(schema_version.c.version, schema_version.c.aplicada_en)).all())
+
+
+def pendientes(engine: Engine, migraciones: List[Migracion]) -> List[Migracion]:
+    aplicadas = versiones_aplicadas(engine)
+    return [m for m in sorted(migraciones, key=lambda m: m.version) if m.version not in aplicadas]
+
+
+@contextmanager
+def _solo_lectura(conn: Connection):
+    """Que el dry-run no pueda escribir: query_only en SQLite, transacción READ ONLY en PostgreSQL"""
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA query_only = ON")
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("SET TRANSACTION READ ONLY"))
+    try:
+        yield
+    finally:
+        conn.rollback()
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA query_only = OFF")
+
+
+def _planificar_paso(conn: Connection, paso: Paso, real: Esquema, simulado: Esquema) -> dict:
+    fila = {"paso": paso.descripcion, "necesario": False, "filas": 0, "segundos": 0.0}
+    if not paso.segun_esquema(simulado):
+        return fila
+    if real.cumple(paso.requiere):
+        fila["necesario"] = paso.segun_datos(conn)
+    else:
+        # Lee tablas o columnas que crea un paso anterior todavía pendiente: se decide al aplicar
+        fila["necesario"] = True
+        fila["depende_de_pasos_anteriores"] = True
+    if fila["necesario"] and real.cumple(paso.requiere_estimar):
+        fila.update(paso.estimar(conn))
+    return fila
+
+
+def planificar(engine: Engine, migraciones: List[Migracion]) -> List[dict]:
+    """Dry-run: qué pasos ejecutaría cada migración pendiente y cuánto tardarían.
+
+    No modifica la base. Las tablas que crearía un paso pendiente no existen todavía,
+    así que los pasos que las leen se estiman en cero filas.
+    """
+    plan = []
+    faltantes = pendientes(engine, migraciones)
+    with engine.connect() as conn, _solo_lectura(conn):
+        real = Esquema.leer(conn)
+        simulado = real.copia()
+        for migracion in faltantes:
+            pasos = []
+            for paso in migracion.pasos:
+                pasos.append(_planificar_paso(conn, paso, real, simulado))
+                paso.efecto(simulado)
+            plan.append({
+                "version": migracion.version,
+                "nombre": migracion.nombre,
+                "pasos": pasos,
+                "segundos": round(sum(p["segundos"] for p in pasos), 3),
+            })
+    return plan
+
+
+def _con_lock(engine: Engine, funcion: Callable[[], List[Migracion]]) -> List[Migracion]:
+    """Serializar migraciones concurrentes (varias réplicas arrancando a la vez)"""
+    if engine.dialect.name != "postgresql":
+        return funcion()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:clave)"), {"clave": _CLAVE_LOCK_PG})
+        conn.commit()
+        try:
+            return funcion()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": _CLAVE_LOCK_PG})
+            conn.commit()
+
+
+def aplicar(engine: Engine, migraciones: List[Migracion]) -> List[Migracion]:
+    """Aplicar en orden las migraciones pendientes; devuelve las aplicadas"""
+
+    def _aplicar():
+        _asegurar_tablas_control(engine)
+        aplicadas = []
+        for migracion in pendientes(engine, migraciones):
+            inicio = time.monotonic()
+            logger.info("Aplicando migración %04d %s", migracion.version, migracion.nombre)
+            for paso in migracion.pasos:
+                with engine.connect() as conn:
+                    necesario = paso.necesario(conn)
+                if necesario:
+                    logger.info("  %s", paso.descripcion)
+                    paso.aplicar(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(schema_version).values(
+                    version=migracion.version,
+                    nombre=migracion.nombre,
+                    aplicada_en=datetime.utcnow(),
+                    duracion_segundos=int(time.monotonic() - inicio),
+                ))
+            aplicadas.append(migracion)
+        return aplicadas
+
+    return _con_lock(engine, _aplicar)
@@ -0,0 +1,542 @@
+"""
+Migraciones del esquema, en orden.
+
+Para agregar una: sumar una `Migracion` al final de `MIGRACIONES` con el número
+siguiente. No modificar las ya publicadas; las bases existentes no las vuelven a correr.
+
+Cada migración define sus tablas y su lógica acá, tal como eran cuando se
+publicó: no importa `models` ni `carga`, que cambian con el código.
+"""
+from collections import Counter
+from datetime import date, time as hora, timedelta
+from typing import Optional
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, Time,
+    bindparam, literal, select, text
+)
+from sqlalchemy.engine import Connection
+import json
+import re
+import time
+from .nucleo import (
+    AgregarColumna, CrearIndice, CrearTablas, EjecutarFuncion, EliminarColumna, Esquema, Migracion,
+    ProcesarEnLotes, ReconstruirTabla
+)
+
+
+def _sin_columna(tabla: str, columna: str):
+    def necesario(esquema: Esquema) -> bool:
+        return columna not in esquema.columnas(tabla)
+    return necesario
+
+
+def _con_columna(tabla: str, columna: str):
+    def necesario(esquema: Esquema) -> bool:
+        return columna in esquema.columnas(tabla)
+    return necesario
+
+
+def _contar(conn: Connection, tabla: str) -> int:
+    return conn.execute(text(f"SELECT COUNT(*) FROM {tabla}")).scalar()
+
+
+# ========== 0001: esquema inicial ==========
+
+_inicial = MetaData()
+
+Table(
+    "profesores", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String(100), nullable=False, index=True),
+    Column("activo", Boolean, nullable=False),
+)
+
+Table(
+    "eventos", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String(200), nullable=False),
+    Column("fecha", Date, nullable=False, index=True),
+    Column("tipo", String(50), nullable=False),
+    Column("ubicacion", String(200)),
+    Column("horario_colorin", String(20)),
+    Column("horario_cumpleanos", String(20)),
+    Column("actividad", Text),
+    Column("notas", Text),
+)
+
+Table(
+    "asignaciones", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("profesor_id", Integer, ForeignKey("profesores.id"), nullable=False),
+    Column("evento_id", Integer, ForeignKey("eventos.id"), nullable=False),
+    Column("rol", String(50)),
+    sqlite_autoincrement=True,
+)
+
+Table(
+    "usuarios", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String(100), unique=True, nullable=False, index=True),
+    Column("email", String(200), unique=True, nullable=False, index=True),
+    Column("hashed_password", String(255), nullable=False),
+    Column("activo", Boolean, nullable=False),
+    Column("es_admin", Boolean, nullable=False),
+    Column("creado_en", DateTime, nullable=False),
+)
+
+Table(
+    "tareas", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuarios.id"), nullable=False, index=True),
+    Column("titulo", String(200), nullable=False),
+    Column("descripcion", Text),
+    Column("completada", Boolean, nullable=False, index=True),
+    Column("fecha_vencimiento", Date),
+    Column("prioridad", String(20)),
+    Column("creada_en", DateTime, nullable=False),
+    Column("completada_en", DateTime),
+)
+
+Table(
+    "tareas_evento", _inicial,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("evento_id", Integer, ForeignKey("eventos.id"), nullable=False, index=True),
+    Column("descripcion", String(300), nullable=False),
+    Column("completada", Boolean, nullable=False, index=True),
+    Column("creada_en", DateTime, nullable=False),
+    Column("completada_en", DateTime),
+)
+
+
+# ========== 0004: usuario_id en tareas ==========
+
+def _tareas_con_usuario(metadata: MetaData, nombre: str) -> Table:
+    return Table(
+        nombre, metadata,
+        Column("id", Integer, primary_key=True),
+        Column("usuario_id", Integer, ForeignKey("usuarios.id"), nullable=False),
+        Column("titulo", String(200), nullable=False),
+        Column("descripcion", Text),
+        Column("completada", Boolean, nullable=False),
+        Column("fecha_vencimiento", Date),
+        Column("prioridad", String(20)),
+        Column("creada_en", DateTime, nullable=False),
+        Column("completada_en", DateTime),
+    )
+
+
+def _tareas_del_admin(conn: Connection, vieja: Table) -> dict:
+    """Las tareas anteriores a usuario_id quedan asignadas al primer administrador"""
+    usuarios = Table("usuarios", MetaData(), autoload_with=conn)
+    admin_id = conn.execute(
+        select(usuarios.c.id).where(usuarios.c.es_admin == True).order_by(usuarios.c.id).limit(1)
+    ).scalar()
+    if admin_id is None:
+        raise RuntimeError("No se encontró usuario admin para asignarle las tareas existentes")
+    return {"usuario_id": literal(admin_id)}
+
+
+# ========== 0006: asignaciones únicas ==========
+
+_DUPLICADAS = """
+    SELECT id FROM asignaciones WHERE id NOT IN (
+        SELECT MIN(id) FROM asignaciones GROUP BY profesor_id, evento_id
+    )
+"""
+
+
+def _borrar_asignaciones_duplicadas(conn: Connection):
+    """Conservar la asignación más antigua de cada par (profesor, evento)"""
+    conn.execute(text(f"DELETE FROM asignaciones WHERE id IN ({_DUPLICADAS})"))
+
+
+def _hay_asignaciones_duplicadas(conn: Connection) -> bool:
+    return conn.execute(text(f"SELECT COUNT(*) FROM ({_DUPLICADAS}) AS d")).scalar() > 0
+
+
+def _estimar_duplicadas(conn: Connection) -> dict:
+    inicio = time.perf_counter()
+    filas = conn.execute(text(f"SELECT COUNT(*) FROM ({_DUPLICADAS}) AS d")).scalar()
+    return {"filas": filas, "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+# ========== 0007: actividades normalizadas ==========
+
+_actividades = MetaData()
+
+Table("eventos", _actividades, Column("id", Integer, primary_key=True))
+
+Table(
+    "evento_actividades", _actividades,
+    Column("id", Integer, primary_key=True),
+    Column("evento_id", Integer, ForeignKey("eventos.id"), nullable=False),
+    Column("nombre", String(200), nullable=False),
+    Column("posicion", Integer, nullable=False),
+    Index("ix_evento_actividades_evento", "evento_id", "posicion"),
+    Index("ix_evento_actividades_nombre", "nombre", "evento_id"),
+)
+
+
+def _decodificar_actividades(valor: str) -> list:
+    try:
+        actividades = json.loads(valor)
+    except ValueError:
+        return [valor]
+    if isinstance(actividades, str):
+        return [actividades]
+    if not isinstance(actividades, list):
+        return []
+    return [str(a) for a in actividades if a]
+
+
+def _copiar_actividades(conn: Connection, desde: int, hasta: int):
+    """Pasar el JSON de eventos.actividad a evento_actividades y vaciar la columna"""
+    filas = conn.execute(text(
+        "SELECT id, actividad FROM eventos "
+        "WHERE id > :desde AND id <= :hasta AND actividad IS NOT NULL"
+    ), {"desde": desde, "hasta": hasta}).all()
+    nuevas = [
+        {"evento_id": evento_id, "nombre": nombre, "posicion": posicion}
+        for evento_id, valor in filas
+        for posicion, nombre in enumerate(_decodificar_actividades(valor))
+    ]
+    if nuevas:
+        conn.execute(text(
+            "INSERT INTO evento_actividades (evento_id, nombre, posicion) "
+            "VALUES (:evento_id, :nombre, :posicion)"
+        ), nuevas)
+    # Vaciar lo ya copiado: repetir el lote (o la migración) no duplica actividades
+    conn.execute(text(
+        "UPDATE eventos SET actividad = NULL WHERE id > :desde AND id <= :hasta"
+    ), {"desde": desde, "hasta": hasta})
+
+
+# ========== 0008: horarios como time ==========
+
+_HORA = re.compile(
+    r"^\s*(\d{1,2})(?:\s*[:.h]\s*(\d{2}))?\s*(?:hs?|hrs?)?\.?\s*(?:([ap])\.?\s*m?\.?)?\s*$",
+    re.IGNORECASE
+)
+
+
+def _parsear_hora(texto: Optional[str]) -> Optional[hora]:
+    """Interpretar un horario libre ("10:00", "2:00 PM", "14.30", "10hs") como time"""
+    if not texto:
+        return None
+    coincidencia = _HORA.match(texto)
+    if not coincidencia:
+        return None
+    horas, minutos, meridiano = coincidencia.groups()
+    horas, minutos = int(horas), int(minutos or 0)
+    if meridiano:
+        if not 1 <= horas <= 12:
+            return None
+        horas = horas % 12 + (12 if meridiano.lower() == "p" else 0)
+    if horas > 23 or minutos > 59:
+        return None
+    return hora(horas, minutos)
+
+
+def _calcular_horas(conn: Connection, desde: int, hasta: int):
+    """Interpretar los horarios de texto de un rango de eventos"""
+    filas = conn.execute(text(
+        "SELECT id, horario_colorin, horario_cumpleanos FROM eventos "
+        "WHERE id > :desde AND id <= :hasta"
+    ), {"desde": desde, "hasta": hasta}).all()
+    valores = [
+        {
+            "_id": evento_id,
+            "hora_colorin": _parsear_hora(colorin),
+            "hora_cumpleanos": _parsear_hora(cumpleanos),
+        }
+        for evento_id, colorin, cumpleanos in filas
+        if colorin or cumpleanos
+    ]
+    if valores:
+        # Tabla reflejada: el Time de cada motor se convierte igual que en el modelo
+        tabla = Table("eventos", MetaData(), autoload_with=conn)
+        conn.execute(
+            tabla.update().where(tabla.c.id == bindparam("_id")).values(
+                hora_colorin=bindparam("hora_colorin"),
+                hora_cumpleanos=bindparam("hora_cumpleanos"),
+            ),
+            valores
+        )
+
+
+def _horas_sin_calcular(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM eventos WHERE "
+        "(horario_colorin IS NOT NULL AND hora_colorin IS NULL) OR "
+        "(horario_cumpleanos IS NOT NULL AND hora_cumpleanos IS NULL)"
+    )).scalar() > 0
+
+
+# ========== 0009: carga por profesor ==========
+
+_carga = MetaData()
+
+Table("profesores", _carga, Column("id", Integer, primary_key=True))
+
+_carga_profesores = Table(
+    "carga_profesores", _carga,
+    Column("profesor_id", Integer, ForeignKey("profesores.id"), primary_key=True),
+    Column("fecha", Date, primary_key=True),
+    Column("total", Integer, nullable=False),
+    Index("ix_carga_profesores_fecha", "fecha", "profesor_id", "total"),
+)
+
+_CARGA_REAL = """
+    SELECT a.profesor_id, e.fecha, COUNT(a.id)
+    FROM asignaciones a JOIN eventos e ON a.evento_id = e.id
+    GROUP BY a.profesor_id, e.fecha
+"""
+
+
+def _reconstruir_carga(conn: Connection):
+    conn.execute(_carga_profesores.delete())
+    conn.execute(text(
+        f"INSERT INTO carga_profesores (profesor_id, fecha, total) {_CARGA_REAL}"
+    ))
+
+
+def _carga_vacia(conn: Connection) -> bool:
+    return _contar(conn, "carga_profesores") == 0 and _contar(conn, "asignaciones") > 0
+
+
+def _estimar_carga(conn: Connection) -> dict:
+    # El costo es el del GROUP BY sobre asignaciones y eventos
+    inicio = time.perf_counter()
+    conn.execute(text(f"SELECT COUNT(*) FROM ({_CARGA_REAL}) AS c")).scalar()
+    filas = _contar(conn, "asignaciones")
+    return {"filas": filas, "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+# ========== 0010: resumen por período ==========
+
+_resumen = MetaData()
+
+Table("profesores", _resumen, Column("id", Integer, primary_key=True))
+
+_resumen_asignaciones = Table(
+    "resumen_asignaciones", _resumen,
+    Column("periodo", String(10), primary_key=True),
+    Column("inicio", Date, primary_key=True),
+    Column("profesor_id", Integer, ForeignKey("profesores.id"), primary_key=True),
+    Column("tipo", String(50), primary_key=True),
+    Column("total", Integer, nullable=False),
+)
+
+# La fecha se tipa para que cada motor la devuelva como date
+_RESUMEN_REAL = text("""
+    SELECT a.profesor_id, e.fecha, e.tipo, COUNT(a.id)
+    FROM asignaciones a JOIN eventos e ON a.evento_id = e.id
+    GROUP BY a.profesor_id, e.fecha, e.tipo
+""").columns(Column("profesor_id", Integer), Column("fecha", Date), Column("tipo", String), Column("total", Integer))
+
+
+def _inicio_periodo(fecha: date, periodo: str) -> date:
+    """Lunes de la semana o día 1 del mes de `fecha`"""
+    if periodo == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    return fecha.replace(day=1)
+
+
+def _reconstruir_resumen(conn: Connection):
+    totales = Counter()
+    for profesor_id, fecha, tipo, total in conn.execute(_RESUMEN_REAL):
+        for periodo in ("semana", "mes"):
+            totales[(periodo, _inicio_periodo(fecha, periodo), profesor_id, tipo)] += total
+    conn.execute(_resumen_asignaciones.delete())
+    if totales:
+        conn.execute(_resumen_asignaciones.insert(), [
+            {"periodo": periodo, "inicio": inicio, "profesor_id": profesor_id, "tipo": tipo, "total": total}
+            for (periodo, inicio, profesor_id, tipo), total in totales.items()
+        ])
+
+
+def _resumen_vacio(conn: Connection) -> bool:
+    return _contar(conn, "resumen_asignaciones") == 0 and _contar(conn, "asignaciones") > 0
+
+
+def _estimar_resumen(conn: Connection) -> dict:
+    inicio = time.perf_counter()
+    conn.execute(_RESUMEN_REAL).fetchall()
+    filas = _contar(conn, "asignaciones")
+    return {"filas": filas, "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+# ========== 0011: versiones de cambio ==========
+
+_versiones = MetaData()
+
+Table(
+    "versiones_tablas", _versiones,
+    Column("tabla", String(100), primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+# ========== 0012: hora de orden guardada ==========
+
+# Mismo valor que models.HORA_SIN_HORARIO: sin horario el evento va al final del día
+_HORA_SIN_HORARIO = text("'23:59:59.999999'")
+
+
+def _calcular_hora_orden(conn: Connection, desde: int, hasta: int):
+    conn.execute(text(
+        "UPDATE eventos SET hora_orden = COALESCE(hora_colorin, hora_cumpleanos) "
+        "WHERE id > :desde AND id <= :hasta "
+        "AND (hora_colorin IS NOT NULL OR hora_cumpleanos IS NOT NULL)"
+    ), {"desde": desde, "hasta": hasta})
+
+
+def _hora_orden_sin_calcular(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM eventos "
+        "WHERE hora_orden <> COALESCE(hora_colorin, hora_cumpleanos, hora_orden)"
+    )).scalar() > 0
+
+
+# ========== 0013: eventos por fecha ==========
+
+_conteo_eventos = MetaData()
+
+Table(
+    "eventos_por_fecha", _conteo_eventos,
+    Column("fecha", Date, primary_key=True),
+    Column("total", Integer, nullable=False),
+)
+
+_EVENTOS_REAL = "SELECT fecha, COUNT(*) FROM eventos GROUP BY fecha"
+
+
+def _reconstruir_eventos_por_fecha(conn: Connection):
+    conn.execute(text("DELETE FROM eventos_por_fecha"))
+    conn.execute(text(f"INSERT INTO eventos_por_fecha (fecha, total) {_EVENTOS_REAL}"))
+
+
+def _eventos_por_fecha_vacio(conn: Connection) -> bool:
+    return _contar(conn, "eventos_por_fecha") == 0 and _contar(conn, "eventos") > 0
+
+
+def _estimar_eventos_por_fecha(conn: Connection) -> dict:
+    inicio = time.perf_counter()
+    conn.execute(text(f"SELECT COUNT(*) FROM ({_EVENTOS_REAL}) AS e")).scalar()
+    filas = _contar(conn, "eventos")
+    return {"filas": filas, "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+MIGRACIONES = [
+    Migracion(1, "esquema_inicial", [
+        CrearTablas(_inicial),
+    ]),
+    Migracion(2, "horarios_evento", [
+        AgregarColumna("eventos", Column("horario_colorin", String(20))),
+        AgregarColumna("eventos", Column("horario_cumpleanos", String(20))),
+    ]),
+    Migracion(3, "actividad_evento", [
+        AgregarColumna("eventos", Column("actividad", Text)),
+    ]),
+    Migracion(4, "usuario_en_tareas", [
+        ReconstruirTabla(
+            "tareas",
+            _tareas_con_usuario,
+            si_esquema=_sin_columna("tareas", "usuario_id"),
+            valores=_tareas_del_admin,
+            indices=[
+                ("ix_tareas_id", ["id"]),
+                ("ix_tareas_usuario_id", ["usuario_id"]),
+                ("ix_tareas_completada", ["completada"]),
+            ],
+            descripcion="reconstruir tareas con usuario_id",
+        ),
+    ]),
+    Migracion(5, "token_version", [
+        AgregarColumna(
+            "usuarios",
+            Column("token_version", Integer, server_default="0", nullable=False),
+        ),
+    ]),
+    Migracion(6, "asignaciones_unicas", [
+        EjecutarFuncion(
+            "borrar asignaciones duplicadas",
+            _borrar_asignaciones_duplicadas,
+            necesario=_hay_asignaciones_duplicadas,
+            estimar=_estimar_duplicadas,
+            requiere={"asignaciones": ("id", "profesor_id", "evento_id")},
+        ),
+        CrearIndice("uq_asignaciones_profesor_evento", "asignaciones", ["profesor_id", "evento_id"], unique=True),
+        CrearIndice("ix_asignaciones_evento_profesor", "asignaciones", ["evento_id", "profesor_id"]),
+    ]),
+    Migracion(7, "actividades_normalizadas", [
+        CrearTablas(_actividades, ["evento_actividades"]),
+        ProcesarEnLotes(
+            "actividades_evento",
+            "eventos",
+            _copiar_actividades,
+            si_esquema=_con_columna("eventos", "actividad"),
+            descripcion="copiar eventos.actividad a evento_actividades",
+        ),
+        EliminarColumna("eventos", "actividad"),
+    ]),
+    Migracion(8, "horas_evento", [
+        AgregarColumna("eventos", Column("hora_colorin", Time)),
+        AgregarColumna("eventos", Column("hora_cumpleanos", Time)),
+        ProcesarEnLotes(
+            "horas_evento",
+            "eventos",
+            _calcular_horas,
+            necesario=_horas_sin_calcular,
+            requiere={"eventos": ("horario_colorin", "horario_cumpleanos", "hora_colorin", "hora_cumpleanos")},
+            descripcion="interpretar horarios de texto como time",
+        ),
+        CrearIndice("ix_eventos_fecha_hora_colorin", "eventos", ["fecha", "hora_colorin"]),
+        CrearIndice("ix_eventos_fecha_hora_cumpleanos", "eventos", ["fecha", "hora_cumpleanos"]),
+    ]),
+    Migracion(9, "carga_profesores", [
+        CrearTablas(_carga, ["carga_profesores"]),
+        EjecutarFuncion(
+            "calcular carga_profesores desde las asignaciones",
+            _reconstruir_carga,
+            necesario=_carga_vacia,
+            estimar=_estimar_carga,
+            requiere={"carga_profesores": (), "asignaciones": (), "eventos": ("fecha",)},
+        ),
+    ]),
+    Migracion(10, "resumen_asignaciones", [
+        CrearTablas(_resumen, ["resumen_asignaciones"]),
+        EjecutarFuncion(
+            "calcular resumen_asignaciones por semana y mes",
+            _reconstruir_resumen,
+            necesario=_resumen_vacio,
+            estimar=_estimar_resumen,
+            requiere={"resumen_asignaciones": (), "asignaciones": (), "eventos": ("fecha", "tipo")},
+        ),
+    ]),
+    Migracion(11, "versiones_tablas", [
+        CrearTablas(_versiones),
+    ]),
+    Migracion(12, "hora_orden_evento", [
+        AgregarColumna("eventos", Column("hora_orden", Time, server_default=_HORA_SIN_HORARIO, nullable=False)),
+        ProcesarEnLotes(
+            "hora_orden_evento",
+            "eventos",
+            _calcular_hora_orden,
+            necesario=_hora_orden_sin_calcular,
+            requiere={"eventos": ("hora_colorin", "hora_cumpleanos", "hora_orden")},
+            descripcion="copiar el primer horario conocido a hora_orden",
+        ),
+        CrearIndice("ix_eventos_fecha_hora_orden", "eventos", ["fecha", "hora_orden", "id"]),
+    ]),
+    Migracion(13, "eventos_por_fecha", [
+        CrearTablas(_conteo_eventos),
+        EjecutarFuncion(
+            "contar eventos por fecha",
+            _reconstruir_eventos_por_fecha,
+            necesario=_eventos_por_fecha_vacio,
+            estimar=_estimar_eventos_por_fecha,
+            requiere={"eventos_por_fecha": (), "eventos": ("fecha",)},
+        ),
+    ]),
+]
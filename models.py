@@ -1,7 +1,45 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, Boolean, DateTime, Index, Time, text
+from sqlalchemy.orm import relationship, validates
+from datetime import datetime, time
+from typing import Optional
 from database import Base
+import re
+
+
+_HORA = re.compile(
+    r"^\s*(\d{1,2})(?:\s*[:.h]\s*(\d{2}))?\s*(?:hs?|hrs?)?\.?\s*(?:([ap])\.?\s*m?\.?)?\s*$",
+    re.IGNORECASE
+)
+
+
+def parsear_hora(texto: Optional[str]) -> Optional[time]:
+    """Interpretar un horario libre ("10:00", "2:00 PM", "14.30", "10hs") como time"""
+    if not texto:
+        return None
+    coincidencia = _HORA.match(texto)
+    if not coincidencia:
+        return None
+    horas, minutos, meridiano = coincidencia.groups()
+    horas, minutos = int(horas), int(minutos or 0)
+    if meridiano:
+        if not 1 <= horas <= 12:
+            return None
+        horas = horas % 12 + (12 if meridiano.lower() == "p" else 0)
+    if horas > 23 or minutos > 59:
+        return None
+    return time(horas, minutos)
+
+
+# Los eventos sin ningún horario reconocible se ordenan al final del día
+HORA_SIN_HORARIO = time.max
+
+
+def hora_de_orden(hora_colorin: Optional[time], hora_cumpleanos: Optional[time]) -> time:
+    """Primer horario conocido del evento (el de Colorín, si no el del cumpleaños)"""
+    for hora in (hora_colorin, hora_cumpleanos):
+        if hora is not None:
+            return hora
+    return HORA_SIN_HORARIO
 
 
 class Profesor(Base):
@@ -25,11 +63,62 @@ class Evento(Base):
     ubicacion = Column(String(200))
     horario_colorin = Column(String(20))  # Horario de Colorín (ej: "10:00", "10:00 AM")
     horario_cumpleanos = Column(String(20))  # Horario de Cumpleaños (ej: "14:00", "2:00 PM")
-    actividad = Column(Text)  # Actividades del evento como JSON array (ej: ["Slime", "Mini cheffs"])
+    # Los mismos horarios como time, para filtrar y ordenar en SQL (se calculan al asignar el texto)
+    hora_colorin = Column(Time)
+    hora_cumpleanos = Column(Time)
+    # Clave de orden de /eventos/ (ver hora_de_orden); guardada para que el índice
+    # (fecha, hora_orden, id) sirva al ORDER BY y a los cursores sin calcular nada
+    hora_orden = Column(Time, nullable=False, default=HORA_SIN_HORARIO, server_default=text("'23:59:59.999999'"))
     notas = Column(Text)
     
     # Relación con asignaciones
     asignaciones = relationship("Asignacion", back_populates="evento", cascade="all, delete-orphan")
+    # Actividades en orden. No se cargan solas: quien las lee pide selectinload
+    # (ver consultas.opciones_include_eventos) y los listados usan cargar_eventos
+    actividades = relationship(
+        "EventoActividad",
+        order_by="EventoActividad.posicion",
+        cascade="all, delete-orphan"
+    )
+    
+    __table_args__ = (
+        Index("ix_eventos_fecha_hora_colorin", "fecha", "hora_colorin"),
+        Index("ix_eventos_fecha_hora_cumpleanos", "fecha", "hora_cumpleanos"),
+        Index("ix_eventos_fecha_hora_orden", "fecha", "hora_orden", "id"),
+    )
+    
+    @validates("horario_colorin", "horario_cumpleanos")
+    def _validar_horario(self, clave, valor):
+        setattr(self, clave.replace("horario_", "hora_"), parsear_hora(valor))
+        self.hora_orden = hora_de_orden(self.hora_colorin, self.hora_cumpleanos)
+        return valor
+    
+    @property
+    def actividad(self):
+        """Nombres de las actividades del evento (ej: ["Slime", "Mini cheffs"])"""
+        return [a.nombre for a in self.actividades]
+    
+    @actividad.setter
+    def actividad(self, nombres):
+        self.actividades = [
+            EventoActividad(nombre=nombre, posicion=posicion)
+            for posicion, nombre in enumerate(nombres or [])
+        ]
+
+
+class EventoActividad(Base):
+    __tablename__ = "evento_actividades"
+    
+    id = Column(Integer, primary_key=True)
+    evento_id = Column(Integer, ForeignKey("eventos.id"), nullable=False)
+    nombre = Column(String(200), nullable=False)
+    posicion = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Carga de las actividades de cada evento y filtro/reporte por nombre
+        Index("ix_evento_actividades_evento", "evento_id", "posicion"),
+        Index("ix_evento_actividades_nombre", "nombre", "evento_id"),
+    )
 
 
 class Asignacion(Base):
@@ -44,12 +133,56 @@ class Asignacion(Base):
     profesor = relationship("Profesor", back_populates="asignaciones")
     evento = relationship("Evento", back_populates="asignaciones")
     
-    # Asegurar que no haya asignaciones duplicadas
+    # Asegurar que no haya asignaciones duplicadas. El índice único cubre además
+    # las búsquedas por profesor; el de (evento_id, profesor_id) las de cada evento
     __table_args__ = (
+        Index("uq_asignaciones_profesor_evento", "profesor_id", "evento_id", unique=True),
+        Index("ix_asignaciones_evento_profesor", "evento_id", "profesor_id"),
         {'sqlite_autoincrement': True},
     )
 
 
+class CargaProfesor(Base):
+    """Cantidad de asignaciones de cada profesor por fecha de evento (la mantiene carga.py)"""
+    __tablename__ = "carga_profesores"
+    
+    profesor_id = Column(Integer, ForeignKey("profesores.id"), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Carga futura de todos los profesores: rango sobre fecha sin tocar el historial
+        Index("ix_carga_profesores_fecha", "fecha", "profesor_id", "total"),
+    )
+
+
+class ResumenAsignaciones(Base):
+    """Asignaciones por profesor, período (semana o mes) y tipo de evento (la mantiene carga.py)"""
+    __tablename__ = "resumen_asignaciones"
+    
+    periodo = Column(String(10), primary_key=True)  # "semana" o "mes"
+    inicio = Column(Date, primary_key=True)  # Lunes de la semana o día 1 del mes
+    profesor_id = Column(Integer, ForeignKey("profesores.id"), primary_key=True)
+    tipo = Column(String(50), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class EventosPorFecha(Base):
+    """Cantidad de eventos de cada fecha, para los totales del dashboard (la mantiene carga.py)"""
+    __tablename__ = "eventos_por_fecha"
+    
+    fecha = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class VersionTabla(Base):
+    """Versión de cambio de cada tabla, para ETags y cachés (la mantiene cambios.py)"""
+    __tablename__ = "versiones_tablas"
+    
+    tabla = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
 class Usuario(Base):
     __tablename__ = "usuarios"
     
@@ -59,6 +192,7 @@ class Usuario(Base):
     hashed_password = Column(String(255), nullable=False)
     activo = Column(Boolean, default=True, nullable=False)
     es_admin = Column(Boolean, default=True, nullable=False)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Se incrementa para revocar tokens
     creado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
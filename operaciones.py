@@ -0,0 +1,650 @@
+"""
+Operaciones de escritura de la API.
+
+Cada función recibe la sesión donde debe ejecutarse, aplica la mutación y hace
+`flush` si necesita ids generados, pero nunca confirma la transacción: de eso se
+encarga `escritura.ejecutar`, que decide si corre en la sesión del request o en
+el escritor único con group commit.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+import heapq
+import carga
+import consultas
+import database
+import models
+import schemas
+
+
+# ========== USUARIOS ==========
+
+def crear_usuario(db: Session, usuario: schemas.UsuarioCreate, hashed_password: str) -> models.Usuario:
+    # Verificar si ya existe un usuario
+    existing_user = db.query(models.Usuario).first()
+    if existing_user:
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe un usuario. Usa el endpoint /login para acceder."
+        )
+
+    # Verificar si el username ya existe
+    db_user = db.query(models.Usuario).filter(models.Usuario.username == usuario.username).first()
+    if db_user:
+        raise HTTPException(status_code=400, detail="El usuario ya existe")
+
+    # Verificar si el email ya existe
+    db_email = db.query(models.Usuario).filter(models.Usuario.email == usuario.email).first()
+    if db_email:
+        raise HTTPException(status_code=400, detail="El email ya está registrado")
+
+    db_user = models.Usuario(
+        username=usuario.username,
+        email=usuario.email,
+        hashed_password=hashed_password,
+        activo=True,
+        es_admin=True
+    )
+    db.add(db_user)
+    db.flush()
+    return db_user
+
+
+def cambiar_password(db: Session, usuario_id: int, hashed_password: str) -> models.Usuario:
+    db_user = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    db_user.hashed_password = hashed_password
+    db.flush()
+    return db_user
+
+
+# ========== PROFESORES ==========
+
+def crear_profesor(db: Session, profesor: schemas.ProfesorCreate) -> models.Profesor:
+    db_profesor = models.Profesor(nombre=profesor.nombre, activo=profesor.activo)
+    db.add(db_profesor)
+    db.flush()
+    return db_profesor
+
+
+def actualizar_profesor(db: Session, profesor_id: int, profesor: schemas.ProfesorUpdate) -> models.Profesor:
+    db_profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
+    if not db_profesor:
+        raise HTTPException(status_code=404, detail="Profesor no encontrado")
+
+    if profesor.nombre is not None:
+        db_profesor.nombre = profesor.nombre
+    if profesor.activo is not None:
+        db_profesor.activo = profesor.activo
+    db.flush()
+    return db_profesor
+
+
+def eliminar_profesor(db: Session, profesor_id: int) -> dict:
+    db_profesor = db.query(models.Profesor).filter(models.Profesor.id == profesor_id).first()
+    if not db_profesor:
+        raise HTTPException(status_code=404, detail="Profesor no encontrado")
+
+    # Verificar si tiene eventos asignados
+    asignaciones = db.query(models.Asignacion).filter(models.Asignacion.profesor_id == profesor_id).count()
+    if asignaciones > 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No se puede eliminar el profesor. Tiene {asignaciones} eventos asignados."
+        )
+
+    db.delete(db_profesor)
+    return {"message": "Profesor eliminado correctamente"}
+
+
+# ========== EVENTOS ==========
+
+def crear_evento(db: Session, evento: schemas.EventoCreate) -> models.Evento:
+    db_evento = models.Evento(
+        nombre=evento.nombre,
+        fecha=evento.fecha,
+        tipo=evento.tipo,
+        ubicacion=evento.ubicacion,
+        horario_colorin=evento.horario_colorin,
+        horario_cumpleanos=evento.horario_cumpleanos,
+        actividad=evento.actividad,
+        notas=evento.notas
+    )
+    db.add(db_evento)
+    carga.contar_eventos(db, [(evento.fecha, 1)])
+    db.flush()
+    return db_evento
+
+
+def importar_eventos(db: Session, eventos: List[schemas.EventoCreate]) -> List[int]:
+    """Insertar eventos (ya validados) en bloque y devolver sus ids en el mismo orden.
+
+    Un INSERT ... RETURNING por lote en lugar de un objeto por evento; por eso las
+    horas se interpretan acá (no pasan por los @validates del modelo).
+    """
+    if not eventos:
+        return []
+    filas = []
+    for evento in eventos:
+        hora_colorin = models.parsear_hora(evento.horario_colorin)
+        hora_cumpleanos = models.parsear_hora(evento.horario_cumpleanos)
+        filas.append({
+            "nombre": evento.nombre,
+            "fecha": evento.fecha,
+            "tipo": evento.tipo,
+            "ubicacion": evento.ubicacion,
+            "horario_colorin": evento.horario_colorin,
+            "horario_cumpleanos": evento.horario_cumpleanos,
+            "hora_colorin": hora_colorin,
+            "hora_cumpleanos": hora_cumpleanos,
+            "hora_orden": models.hora_de_orden(hora_colorin, hora_cumpleanos),
+            "notas": evento.notas,
+        })
+    ids = db.scalars(
+        insert(models.Evento).returning(models.Evento.id, sort_by_parameter_order=True), filas
+    ).all()
+
+    actividades = [
+        {"evento_id": evento_id, "nombre": nombre, "posicion": posicion}
+        for evento_id, evento in zip(ids, eventos)
+        for posicion, nombre in enumerate(evento.actividad or [])
+    ]
+    if actividades:
+        db.execute(insert(models.EventoActividad), actividades)
+    carga.contar_eventos(db, [(evento.fecha, 1) for evento in eventos])
+    return list(ids)
+
+
+def actualizar_evento(db: Session, evento_id: int, evento: schemas.EventoUpdate) -> models.Evento:
+    # La respuesta incluye las actividades: cargarlas ahora, el evento se lee ya desconectado
+    db_evento = db.query(models.Evento).options(
+        selectinload(models.Evento.actividades)
+    ).filter(models.Evento.id == evento_id).first()
+    if not db_evento:
+        raise HTTPException(status_code=404, detail="Evento no encontrado")
+
+    # La carga de los profesores asignados sigue a la fecha y al tipo del evento
+    carga.mover_evento(
+        db, evento_id, db_evento.fecha, db_evento.tipo,
+        evento.fecha if evento.fecha is not None else db_evento.fecha,
+        evento.tipo if evento.tipo is not None else db_evento.tipo
+    )
+
+    if evento.nombre is not None:
+        db_evento.nombre = evento.nombre
+    if evento.fecha is not None:
+        db_evento.fecha = evento.fecha
+    if evento.tipo is not None:
+        db_evento.tipo = evento.tipo
+    if evento.ubicacion is not None:
+        db_evento.ubicacion = evento.ubicacion
+    if evento.horario_colorin is not None:
+        db_evento.horario_colorin = evento.horario_colorin
+    if evento.horario_cumpleanos is not None:
+        db_evento.horario_cumpleanos = evento.horario_cumpleanos
+    if evento.actividad is not None:
+        db_evento.actividad = evento.actividad
+    if evento.notas is not None:
+        db_evento.notas = evento.notas
+    db.flush()
+    return db_evento
+
+
+def eliminar_evento(db: Session, evento_id: int) -> dict:
+    db_evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
+    if not db_evento:
+        raise HTTPException(status_code=404, detail="Evento no encontrado")
+
+    # Eliminar asignaciones asociadas (y descontarlas de la carga de cada profesor)
+    carga.quitar_evento(db, evento_id, db_evento.fecha, db_evento.tipo)
+    db.query(models.Asignacion).filter(models.Asignacion.evento_id == evento_id).delete()
+
+    db.delete(db_evento)
+    return {"message": "Evento eliminado correctamente"}
+
+
+# ========== ASIGNACIONES ==========
+
+def insertar_asignaciones(db: Session, filas: List[dict]) -> List[models.Asignacion]:
+    """Insertar asignaciones ignorando los pares (profesor, evento) que ya existen.
+
+    Usa INSERT ... ON CONFLICT DO NOTHING sobre el índice único, así que dos
+    requests concurrentes no pueden duplicar una asignación. Devuelve solo las
+    asignaciones que se insertaron.
+    """
+    if not filas:
+        return []
+    stmt = database.insert_con_conflictos(db, models.Asignacion)
+    if stmt is None:
+        # Otros motores: insertar de a una y descartar las que violan el índice único
+        insertadas = []
+        for fila in filas:
+            try:
+                with db.begin_nested():
+                    insertadas.append(db.scalars(insert(models.Asignacion).returning(models.Asignacion), [fila]).one())
+            except IntegrityError:
+                continue
+    else:
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[models.Asignacion.profesor_id, models.Asignacion.evento_id]
+        ).returning(models.Asignacion)
+        insertadas = db.scalars(stmt, filas).all()
+
+    carga.sumar_asignaciones(db, insertadas)
+    return insertadas
+
+
+def crear_asignacion(db: Session, asignacion: schemas.AsignacionCreate) -> models.Asignacion:
+    # Verificar que el profesor existe
+    profesor = db.query(models.Profesor).filter(models.Profesor.id == asignacion.profesor_id).first()
+    if not profesor:
+        raise HTTPException(status_code=404, detail="Profesor no encontrado")
+
+    # Verificar que el evento existe
+    evento = db.query(models.Evento).filter(models.Evento.id == asignacion.evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento no encontrado")
+
+    # Si ya estaba asignado el índice único descarta la fila
+    insertadas = insertar_asignaciones(db, [{
+        "profesor_id": asignacion.profesor_id,
+        "evento_id": asignacion.evento_id,
+        "rol": asignacion.rol
+    }])
+    if not insertadas:
+        raise HTTPException(status_code=400, detail="El profesor ya está asignado a este evento")
+    return insertadas[0]
+
+
+def eliminar_asignacion(db: Session, asignacion_id: int) -> dict:
+    db_asignacion = db.query(models.Asignacion).filter(models.Asignacion.id == asignacion_id).first()
+    if not db_asignacion:
+        raise HTTPException(status_code=404, detail="Asignación no encontrada")
+
+    carga.sumar_asignaciones(db, [db_asignacion], delta=-1)
+    db.delete(db_asignacion)
+    return {"message": "Asignación eliminada correctamente"}
+
+
+def crear_asignaciones_multiples(db: Session, asignaciones: List[schemas.AsignacionCreate],
+                                 atomico: bool = False) -> dict:
+    """Crear varias asignaciones validándolas en conjunto.
+
+    Una consulta (por lote de ids) para profesores, otra para eventos y otra
+    para los pares ya asignados, y un solo INSERT con las asignaciones válidas.
+    `resultados` trae el estado de cada item en el orden recibido. Con `atomico`
+    cualquier error cancela todo el lote (400 con los resultados).
+    """
+    profesor_ids = sorted({a.profesor_id for a in asignaciones})
+    evento_ids = sorted({a.evento_id for a in asignaciones})
+
+    profesores = {}
+    for lote in consultas.lotes(profesor_ids):
+        profesores.update(db.execute(
+            select(models.Profesor.id, models.Profesor.nombre).where(models.Profesor.id.in_(lote))
+        ).all())
+    eventos = set()
+    existentes = set()
+    for lote in consultas.lotes(evento_ids):
+        eventos.update(db.scalars(select(models.Evento.id).where(models.Evento.id.in_(lote))))
+        existentes.update(db.execute(
+            select(models.Asignacion.profesor_id, models.Asignacion.evento_id)
+            .where(models.Asignacion.evento_id.in_(lote))
+        ).tuples())
+
+    resultados = []
+    filas = {}  # (profesor_id, evento_id) -> índice del item que la inserta
+    for indice, asignacion_data in enumerate(asignaciones):
+        par = (asignacion_data.profesor_id, asignacion_data.evento_id)
+        resultado = {"indice": indice, "profesor_id": par[0], "evento_id": par[1], "estado": "error"}
+        if par[0] not in profesores:
+            resultado["error"] = f"Profesor {par[0]} no encontrado"
+        elif par[1] not in eventos:
+            resultado["error"] = f"Evento {par[1]} no encontrado"
+        elif par in existentes:
+            resultado["error"] = f"El profesor {profesores[par[0]]} ya está asignado a este evento"
+        elif par in filas:
+            resultado["error"] = f"El profesor {profesores[par[0]]} está repetido para este evento en la solicitud"
+        else:
+            filas[par] = indice
+            resultado["estado"] = "valida"
+        resultados.append(resultado)
+
+    if atomico and len(filas) < len(asignaciones):
+        for indice in filas.values():
+            resultados[indice]["estado"] = "cancelada"
+        raise HTTPException(status_code=400, detail={
+            "mensaje": "Hay asignaciones inválidas, no se creó ninguna", "resultados": resultados
+        })
+
+    # Si otro request asignó el mismo par entretanto, el índice único descarta la fila
+    insertadas = insertar_asignaciones(db, [
+        {"profesor_id": par[0], "evento_id": par[1], "rol": asignaciones[indice].rol}
+        for par, indice in filas.items()
+    ])
+    for asignacion in insertadas:
+        resultado = resultados[filas.pop((asignacion.profesor_id, asignacion.evento_id))]
+        resultado.update(estado="creada", asignacion_id=asignacion.id)
+    for par, indice in filas.items():
+        resultados[indice].update(
+            estado="error", error=f"El profesor {profesores[par[0]]} ya está asignado a este evento"
+        )
+
+    if atomico and filas:
+        for resultado in resultados:
+            if resultado["estado"] == "creada":
+                resultado["estado"] = "cancelada"
+                del resultado["asignacion_id"]
+        raise HTTPException(status_code=409, detail={
+            "mensaje": "Otra operación asignó alguno de los pares, no se creó ninguna", "resultados": resultados
+        })
+
+    asignaciones_creadas = [
+        {"profesor_id": r["profesor_id"], "profesor_nombre": profesores[r["profesor_id"]], "evento_id": r["evento_id"]}
+        for r in resultados if r["estado"] == "creada"
+    ]
+    errores = [r["error"] for r in resultados if r["estado"] == "error"]
+    return {
+        "asignaciones_creadas": asignaciones_creadas,
+        "total_creadas": len(asignaciones_creadas),
+        "errores": errores if errores else None,
+        "resultados": resultados
+    }
+
+
+def asignar_automatico(db: Session, evento_id: int, cantidad_profes: int) -> dict:
+    # Verificar que el evento existe
+    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento no encontrado")
+
+    # Obtener profesores activos
+    profesores_activos = db.query(models.Profesor).filter(models.Profesor.activo == True).all()
+    if not profesores_activos:
+        raise HTTPException(status_code=400, detail="No hay profesores activos")
+
+    if cantidad_profes > len(profesores_activos):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Solo hay {len(profesores_activos)} profesores activos, pero se solicitan {cantidad_profes}"
+        )
+
+    # Obtener conteo de eventos futuros por profesor (tabla de carga)
+    conteos_dict = dict(db.execute(consultas.carga_futura_stmt()).all())
+
+    # Asegurar que todos los profesores activos tengan conteo (aunque sea 0)
+    for prof in profesores_activos:
+        if prof.id not in conteos_dict:
+            conteos_dict[prof.id] = 0
+
+    # Ordenar profesores por cantidad de eventos (menos eventos primero)
+    profesores_ordenados = sorted(
+        profesores_activos,
+        key=lambda p: (conteos_dict.get(p.id, 0), p.id)
+    )
+
+    # Seleccionar los primeros N profesores
+    profesores_seleccionados = profesores_ordenados[:cantidad_profes]
+
+    # Crear asignaciones en un solo INSERT (los ya asignados se ignoran)
+    insertadas = insertar_asignaciones(db, [
+        {"profesor_id": profesor.id, "evento_id": evento_id, "rol": "Profesor"}
+        for profesor in profesores_seleccionados
+    ])
+    nuevos = {asignacion.profesor_id for asignacion in insertadas}
+    asignaciones_creadas = [
+        {"profesor_id": profesor.id, "profesor_nombre": profesor.nombre}
+        for profesor in profesores_seleccionados
+        if profesor.id in nuevos
+    ]
+
+    return {
+        "message": f"Se asignaron {len(asignaciones_creadas)} profesores al evento",
+        "asignaciones": asignaciones_creadas
+    }
+
+
+def planificar_asignaciones(db: Session, fecha_desde: date, fecha_hasta: date, cantidad_profes: int,
+                            tipo: Optional[str] = None, simular: bool = False) -> dict:
+    """Completar hasta `cantidad_profes` profesores en cada evento del rango, repartiendo la carga.
+
+    Lee una sola vez los eventos, sus asignaciones y la carga futura, y reparte
+    con un heap de (carga, profesor): cada evento toma a los menos cargados que
+    no estén ya en él, y su carga sube para los eventos siguientes. Sin
+    `simular` el plan se inserta en un solo INSERT (y transacción).
+    """
+    if fecha_desde > fecha_hasta:
+        raise HTTPException(status_code=400, detail="fecha_desde debe ser anterior a fecha_hasta")
+
+    profesores = dict(db.execute(
+        select(models.Profesor.id, models.Profesor.nombre).where(models.Profesor.activo == True)
+    ).all())
+    if not profesores:
+        raise HTTPException(status_code=400, detail="No hay profesores activos")
+    if cantidad_profes > len(profesores):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Solo hay {len(profesores)} profesores activos, pero se solicitan {cantidad_profes}"
+        )
+
+    eventos = db.execute(consultas.eventos_a_planificar_stmt(fecha_desde, fecha_hasta, tipo)).all()
+    asignados = {evento.id: set() for evento in eventos}
+    for lote in consultas.lotes(list(asignados)):
+        for evento_id, profesor_id in db.execute(
+            select(models.Asignacion.evento_id, models.Asignacion.profesor_id)
+            .where(models.Asignacion.evento_id.in_(lote))
+        ):
+            asignados[evento_id].add(profesor_id)
+
+    # Como en la asignación automática, la carga son los eventos desde hoy (o desde el
+    # inicio del rango si empieza antes, para que todos los eventos del plan cuenten)
+    carga_actual = dict(db.execute(consultas.carga_futura_stmt(min(fecha_desde, date.today()))).all())
+    antes = {profesor_id: carga_actual.get(profesor_id, 0) for profesor_id in profesores}
+    despues = dict(antes)
+    heap = [(total, profesor_id) for profesor_id, total in antes.items()]
+    heapq.heapify(heap)
+
+    plan = []
+    for evento in eventos:
+        faltan = cantidad_profes - len(asignados[evento.id])
+        if faltan <= 0:
+            continue
+        elegidos, salteados = [], []
+        while heap and len(elegidos) < faltan:
+            total, profesor_id = heapq.heappop(heap)
+            (salteados if profesor_id in asignados[evento.id] else elegidos).append((total, profesor_id))
+        for total, profesor_id in elegidos:
+            despues[profesor_id] += 1
+            heapq.heappush(heap, (total + 1, profesor_id))
+        for entrada in salteados:
+            heapq.heappush(heap, entrada)
+        plan.append({
+            "evento_id": evento.id,
+            "nombre": evento.nombre,
+            "fecha": evento.fecha,
+            "ya_asignados": len(asignados[evento.id]),
+            "profesores": [
+                {"profesor_id": profesor_id, "profesor_nombre": profesores[profesor_id]}
+                for _, profesor_id in elegidos
+            ]
+        })
+
+    filas = [
+        {"profesor_id": profesor["profesor_id"], "evento_id": item["evento_id"], "rol": "Profesor"}
+        for item in plan for profesor in item["profesores"]
+    ]
+    omitidas = []
+    if not simular:
+        # Un INSERT para todo el plan; si otro request asignó el mismo par entretanto, se omite
+        insertadas = {(a.profesor_id, a.evento_id) for a in insertar_asignaciones(db, filas)}
+        omitidas = [
+            {"profesor_id": fila["profesor_id"], "evento_id": fila["evento_id"]}
+            for fila in filas if (fila["profesor_id"], fila["evento_id"]) not in insertadas
+        ]
+
+    return {
+        "simulacion": simular,
+        "total_eventos": len(eventos),
+        "eventos_planificados": len(plan),
+        "total_asignaciones": len(filas) - len(omitidas),
+        "plan": plan,
+        "omitidas": omitidas,
+        "carga": sorted(
+            (
+                {"profesor_id": profesor_id, "nombre": nombre, "antes": antes[profesor_id], "despues": despues[profesor_id]}
+                for profesor_id, nombre in profesores.items()
+            ),
+            key=lambda c: (c["despues"], c["profesor_id"])
+        ),
+        "equidad": {
+            "antes": consultas.analizar_equidad(list(antes.values())),
+            "despues": consultas.analizar_equidad(list(despues.values()))
+        }
+    }
+
+
+# ========== TAREAS ==========
+
+def _tarea_del_usuario(db: Session, tarea_id: int, usuario_id: int) -> models.Tarea:
+    db_tarea = db.query(models.Tarea).filter(
+        models.Tarea.id == tarea_id,
+        models.Tarea.usuario_id == usuario_id
+    ).first()
+    if not db_tarea:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    return db_tarea
+
+
+def crear_tarea(db: Session, tarea: schemas.TareaCreate, usuario_id: int) -> models.Tarea:
+    db_tarea = models.Tarea(
+        usuario_id=usuario_id,
+        titulo=tarea.titulo,
+        descripcion=tarea.descripcion,
+        fecha_vencimiento=tarea.fecha_vencimiento,
+        prioridad=tarea.prioridad,
+        completada=False
+    )
+    db.add(db_tarea)
+    db.flush()
+    return db_tarea
+
+
+def actualizar_tarea(db: Session, tarea_id: int, tarea: schemas.TareaUpdate, usuario_id: int) -> models.Tarea:
+    db_tarea = _tarea_del_usuario(db, tarea_id, usuario_id)
+
+    # Actualizar solo los campos proporcionados
+    update_data = tarea.model_dump(exclude_unset=True)
+    if "completada" in update_data:
+        if update_data["completada"] and not db_tarea.completada:
+            # Si se marca como completada, guardar la fecha
+            db_tarea.completada_en = datetime.utcnow()
+        elif not update_data["completada"]:
+            # Si se desmarca, limpiar la fecha
+            db_tarea.completada_en = None
+
+    for field, value in update_data.items():
+        if field != "completada":  # Ya lo manejamos arriba
+            setattr(db_tarea, field, value)
+    db.flush()
+    return db_tarea
+
+
+def eliminar_tarea(db: Session, tarea_id: int, usuario_id: int) -> dict:
+    db_tarea = _tarea_del_usuario(db, tarea_id, usuario_id)
+    db.delete(db_tarea)
+    return {"message": "Tarea eliminada correctamente"}
+
+
+def toggle_tarea(db: Session, tarea_id: int, usuario_id: int) -> models.Tarea:
+    db_tarea = _tarea_del_usuario(db, tarea_id, usuario_id)
+
+    db_tarea.completada = not db_tarea.completada
+    if db_tarea.completada:
+        db_tarea.completada_en = datetime.utcnow()
+    else:
+        db_tarea.completada_en = None
+    db.flush()
+    return db_tarea
+
+
+# ========== TAREAS DE EVENTO ==========
+
+def _verificar_evento(db: Session, evento_id: int):
+    evento = db.query(models.Evento).filter(models.Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento no encontrado")
+    return evento
+
+
+def _tarea_del_evento(db: Session, evento_id: int, tarea_id: int) -> models.TareaEvento:
+    # Verificar que el evento existe
+    _verificar_evento(db, evento_id)
+
+    db_tarea = db.query(models.TareaEvento).filter(
+        models.TareaEvento.id == tarea_id,
+        models.TareaEvento.evento_id == evento_id
+    ).first()
+    if not db_tarea:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    return db_tarea
+
+
+def crear_tarea_evento(db: Session, evento_id: int, tarea: schemas.TareaEventoBase) -> models.TareaEvento:
+    # Verificar que el evento existe
+    _verificar_evento(db, evento_id)
+
+    db_tarea = models.TareaEvento(
+        evento_id=evento_id,
+        descripcion=tarea.descripcion,
+        completada=False
+    )
+    db.add(db_tarea)
+    db.flush()
+    return db_tarea
+
+
+def actualizar_tarea_evento(
+    db: Session,
+    evento_id: int,
+    tarea_id: int,
+    tarea: schemas.TareaEventoUpdate
+) -> models.TareaEvento:
+    db_tarea = _tarea_del_evento(db, evento_id, tarea_id)
+
+    # Actualizar solo los campos proporcionados
+    update_data = tarea.model_dump(exclude_unset=True)
+    if "completada" in update_data:
+        if update_data["completada"] and not db_tarea.completada:
+            # Si se marca como completada, guardar la fecha
+            db_tarea.completada_en = datetime.utcnow()
+        elif not update_data["completada"]:
+            # Si se desmarca, limpiar la fecha
+            db_tarea.completada_en = None
+
+    for field, value in update_data.items():
+        if field != "completada":  # Ya lo manejamos arriba
+            setattr(db_tarea, field, value)
+    db.flush()
+    return db_tarea
+
+
+def eliminar_tarea_evento(db: Session, evento_id: int, tarea_id: int) -> dict:
+    db_tarea = _tarea_del_evento(db, evento_id, tarea_id)
+    db.delete(db_tarea)
+    return {"message": "Tarea eliminada correctamente"}
+
+
+def toggle_tarea_evento(db: Session, evento_id: int, tarea_id: int) -> models.TareaEvento:
+    db_tarea = _tarea_del_evento(db, evento_id, tarea_id)
+
+    db_tarea.completada = not db_tarea.completada
+    if db_tarea.completada:
+        db_tarea.completada_en = datetime.utcnow()
+    else:
+        db_tarea.completada_en = None
+    db.flush()
+    return db_tarea
@@ -0,0 +1,204 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+En lugar de OFFSET, cada página pide las filas que siguen a la última fila vista
+según las columnas de orden (`Clave`), así que el costo de una página no depende
+de cuántas filas hay antes. El cursor es opaco para el cliente: codifica los
+valores de orden de la fila límite y la dirección.
+
+Sin `limite` ni `cursor` los endpoints devuelven la lista completa como antes.
+Con paginación la respuesta sigue siendo la misma lista, y los cursores viajan en
+los headers `X-Next-Cursor` / `X-Prev-Cursor` (y `X-Total-Count` con `total=true`).
+"""
+from datetime import date, datetime, time
+from typing import Any, List, Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+import base64
+import json
+import os
+
+PAGINACION_LIMITE_DEFECTO = int(os.getenv("PAGINACION_LIMITE_DEFECTO", "50"))
+PAGINACION_LIMITE_MAXIMO = int(os.getenv("PAGINACION_LIMITE_MAXIMO", "500"))
+
+HEADERS = ["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count"]
+
+
+class Clave:
+    """Columna (o expresión sin NULLs) por la que se ordena y se corta la página"""
+
+    def __init__(self, expresion, descendente: bool = False):
+        self.expresion = expresion
+        self.descendente = descendente
+
+
+class Paginacion:
+    def __init__(self, cursor: Optional[str], limite: Optional[int], total: bool):
+        self.cursor = cursor
+        self.limite = limite
+        self.total = total
+
+    @property
+    def activa(self) -> bool:
+        return self.cursor is not None or self.limite is not None
+
+
+def parametros(
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor o X-Prev-Cursor"),
+    limite: Optional[int] = Query(None, ge=1, description="Tamaño de página; sin limite ni cursor se devuelve todo"),
+    total: bool = Query(False, description="Incluir X-Total-Count (cuenta todas las filas del filtro)")
+) -> Paginacion:
+    """Dependencia con los parámetros de paginación"""
+    if limite is not None:
+        limite = min(limite, PAGINACION_LIMITE_MAXIMO)
+    return Paginacion(cursor, limite, total)
+
+
+# ========== CURSORES ==========
+
+def _codificar_valor(valor: Any):
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, time):
+        return {"t": valor.isoformat()}
+    return valor
+
+
+def _decodificar_valor(valor: Any):
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "t" in valor:
+            return time.fromisoformat(valor["t"])
+    return valor
+
+
+def codificar_cursor(valores: list, hacia_atras: bool) -> str:
+    datos = {"a": hacia_atras, "v": [_codificar_valor(v) for v in valores]}
+    crudo = json.dumps(datos, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, claves: List[Clave]):
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        datos = json.loads(crudo)
+        valores = [_decodificar_valor(v) for v in datos["v"]]
+        hacia_atras = bool(datos["a"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if len(valores) != len(claves) or not all(map(_valor_valido, claves, valores)):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return valores, hacia_atras
+
+
+def _valor_valido(clave: Clave, valor: Any) -> bool:
+    """El valor tiene el tipo de la clave (un cursor alterado no llega a la consulta)"""
+    try:
+        tipo = clave.expresion.type.python_type
+    except NotImplementedError:
+        return valor is not None
+    # Exacto: datetime es subclase de date y bool de int
+    return type(valor) is tipo
+
+
+# ========== CONSULTAS ==========
+
+def _despues_de(claves: List[Clave], valores: list, hacia_atras: bool):
+    """Filas posteriores a `valores` en el orden de las claves (anteriores si hacia_atras)"""
+    ascendentes = [clave.descendente == hacia_atras for clave in claves]
+    if all(ascendentes) or not any(ascendentes):
+        # Mismo sentido en todas las claves: comparación de tuplas, usa el índice directamente
+        fila = tuple_(*[clave.expresion for clave in claves])
+        return fila > tuple_(*valores) if ascendentes[0] else fila < tuple_(*valores)
+
+    condiciones = []
+    for i, clave in enumerate(claves):
+        iguales = [claves[j].expresion == valores[j] for j in range(i)]
+        siguiente = clave.expresion > valores[i] if ascendentes[i] else clave.expresion < valores[i]
+        condiciones.append(and_(*iguales, siguiente))
+    # Cota sobre la primera clave para que el motor pueda recorrer el índice por rango
+    primera = claves[0].expresion >= valores[0] if ascendentes[0] else claves[0].expresion <= valores[0]
+    return and_(primera, or_(*condiciones))
+
+
+def ordenar(stmt, claves: List[Clave], hacia_atras: bool = False):
+    """Reemplazar el ORDER BY de `stmt` por el de las claves"""
+    orden = []
+    for clave in claves:
+        descendente = clave.descendente != hacia_atras
+        orden.append(clave.expresion.desc() if descendente else clave.expresion.asc())
+    return stmt.order_by(None).order_by(*orden)
+
+
+def preparar(stmt, claves: List[Clave], pagina: Paginacion):
+    """Agregar a `stmt` el corte del cursor, el orden y el LIMIT (una fila extra)"""
+    limite = pagina.limite or PAGINACION_LIMITE_DEFECTO
+    hacia_atras = False
+    if pagina.cursor:
+        valores, hacia_atras = decodificar_cursor(pagina.cursor, claves)
+        stmt = stmt.where(_despues_de(claves, valores, hacia_atras))
+    stmt = ordenar(stmt, claves, hacia_atras)
+    # Las claves se seleccionan al final de cada fila para armar los cursores
+    stmt = stmt.add_columns(*[clave.expresion.label(f"_clave_{i}") for i, clave in enumerate(claves)])
+    return stmt.limit(limite + 1), hacia_atras
+
+
+def total_stmt(stmt):
+    """Cantidad total de filas del filtro (sin cursor ni límite)"""
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def armar(filas: list, claves: List[Clave], pagina: Paginacion, hacia_atras: bool, response: Response,
+          total: Optional[int] = None, mapeos: bool = False) -> list:
+    """Separar los objetos de las claves, poner los headers y devolver los objetos en orden.
+
+    Con `mapeos` cada fila se devuelve como dict columna -> valor (sin las claves).
+    """
+    limite = pagina.limite or PAGINACION_LIMITE_DEFECTO
+    hay_mas = len(filas) > limite
+    filas = list(filas[:limite])
+    if hacia_atras:
+        filas.reverse()
+
+    n = len(claves)
+    if filas:
+        primera, ultima = list(filas[0][-n:]), list(filas[-1][-n:])
+        # Yendo hacia adelante hay página previa si se llegó con un cursor; hacia atrás, siempre hay siguiente
+        hay_siguiente = True if hacia_atras else hay_mas
+        hay_anterior = hay_mas if hacia_atras else pagina.cursor is not None
+        if hay_siguiente:
+            response.headers["X-Next-Cursor"] = codificar_cursor(ultima, False)
+        if hay_anterior:
+            response.headers["X-Prev-Cursor"] = codificar_cursor(primera, True)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+    ancho = len(filas[0]) - n if filas else 1
+    if mapeos:
+        return [dict(zip(fila._fields[:ancho], fila[:ancho])) for fila in filas]
+    if ancho == 1:
+        return [fila[0] for fila in filas]
+    return [tuple(fila[:ancho]) for fila in filas]
+
+
+def paginar(db: Session, stmt, claves: List[Clave], pagina: Paginacion, response: Response,
+            mapeos: bool = False) -> list:
+    """Ejecutar `stmt` paginado, o completo si no se pidió paginación.
+
+    Devuelve los objetos de la primera columna, o dicts por fila con `mapeos`.
+    """
+    if not pagina.activa:
+        if pagina.total:
+            response.headers["X-Total-Count"] = str(db.scalar(total_stmt(stmt)))
+        if mapeos:
+            return [dict(fila) for fila in db.execute(stmt).mappings()]
+        return db.scalars(stmt).all()
+    total = db.scalar(total_stmt(stmt)) if pagina.total else None
+    consulta, hacia_atras = preparar(stmt, claves, pagina)
+    return armar(db.execute(consulta).all(), claves, pagina, hacia_atras, response, total, mapeos)
@@ -0,0 +1,54 @@
+"""
+Caché de los reportes de /reportes/* (y de su versión en /async).
+
+Los reportes son iguales para todos los usuarios, así que el resultado se guarda
+una vez por reporte y parámetros (rango de fechas, profesor...) junto con las
+versiones de cambio de las tablas que lee (`cambios.versiones`). Un cambio
+confirmado en cualquiera de esas tablas cambia la clave y la próxima lectura
+vuelve a calcular; las claves viejas se van por LRU o por TTL.
+
+Cada proceso guarda sus propios resultados, pero las versiones salen de la
+base: un cambio hecho desde otro proceso también invalida el resultado guardado
+(cuando vence la copia de versiones, ver `CAMBIOS_VERSIONES_TTL_SECONDS`).
+"""
+from typing import Awaitable, Callable
+import os
+from cache import TTLCache
+import cambios
+
+REPORTES_CACHE_TTL_SECONDS = float(os.getenv("REPORTES_CACHE_TTL_SECONDS", "300"))
+REPORTES_CACHE_MAX = int(os.getenv("REPORTES_CACHE_MAX", "256"))
+
+_cache = TTLCache(REPORTES_CACHE_MAX, REPORTES_CACHE_TTL_SECONDS)  # (reporte, parámetros, versiones) -> resultado
+
+TABLAS_PROFESORES = ("profesores", "asignaciones", "eventos")
+TABLAS_DISTRIBUCION = ("profesores", "carga_profesores", "resumen_asignaciones")
+TABLAS_ACTIVIDADES = ("evento_actividades", "eventos")
+TABLAS_SERIES = ("profesores", "resumen_asignaciones")
+
+
+def _clave(nombre: str, tablas: tuple, parametros: tuple) -> tuple:
+    # Las versiones se leen antes de calcular: el resultado es al menos tan nuevo como la clave
+    return (nombre, parametros, cambios.versiones(tablas))
+
+
+def cacheado(nombre: str, tablas: tuple, parametros: tuple, calcular: Callable[[], dict]) -> dict:
+    """Resultado guardado del reporte, o `calcular()` si no hay uno vigente"""
+    clave = _clave(nombre, tablas, parametros)
+    resultado = _cache.obtener(clave)
+    if resultado is None:
+        resultado = calcular()
+        _cache.guardar(clave, resultado)
+    return resultado
+
+
+async def cacheado_async(nombre: str, tablas: tuple, parametros: tuple,
+                         calcular: Callable[[], Awaitable[dict]]) -> dict:
+    """Como `cacheado`, con un cálculo asíncrono (y las versiones leídas con el engine async)"""
+    clave = (nombre, parametros, await cambios.versiones_async(tablas))
+    resultado = _cache.obtener(clave)
+    if resultado is None:
+        resultado = await calcular()
+        _cache.guardar(clave, resultado)
+    return resultado
+
@@ -0,0 +1,43 @@
+"""
+Serialización de respuestas JSON.
+
+Con `orjson` instalado es la clase de respuesta por defecto de la API (codifica
+fechas y horas en C, sin pasar por `jsonable_encoder`). Sin `orjson` se usa el
+`JSONResponse` de siempre.
+
+`json_directo` es el camino rápido de los listados: los endpoints arman dicts a
+partir de filas de la base (no objetos ORM) con exactamente los campos del
+schema, y se codifican sin la validación de `response_model`, que para datos
+recién leídos de la base no agrega nada. El `response_model` del endpoint queda
+para la documentación.
+"""
+from typing import Any, List, Type
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Table
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as RespuestaJSON
+except ImportError:  # orjson es opcional
+    orjson = None
+    RespuestaJSON = JSONResponse
+
+
+def columnas(tabla: Table, schema: Type[BaseModel]) -> List:
+    """Columnas de `tabla` que corresponden a los campos de `schema`"""
+    return [tabla.c[campo] for campo in schema.model_fields if campo in tabla.c]
+
+
+def json_directo(datos: Any, response: Response) -> Response:
+    """Codificar datos ya confiables sin validarlos, conservando los headers puestos en `response`"""
+    if orjson is None:
+        datos = jsonable_encoder(datos)
+    respuesta = RespuestaJSON(datos)
+    # ETag, cursores de paginación, Cache-Control...
+    respuesta.raw_headers.extend(
+        (clave, valor) for clave, valor in response.raw_headers if clave != b"content-length"
+    )
+    return respuesta
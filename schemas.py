@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import date, datetime
+from typing import Any, Literal, Optional, List
+from datetime import date, datetime, time
 import json
 
 
@@ -27,6 +27,21 @@ class Profesor(ProfesorBase):
         from_attributes = True
 
 
+class EventoAsignado(BaseModel):
+    id: int
+    nombre: str
+    fecha: date
+    tipo: str
+    ubicacion: Optional[str] = None
+    asignacion_id: int
+    rol: Optional[str] = None
+
+
+class ProfesorDetalle(Profesor):
+    eventos: Optional[List[EventoAsignado]] = None  # Solo con include=eventos
+    total_eventos: Optional[int] = None  # Eventos en el rango pedido, aunque `eventos` esté cortado
+
+
 # ========== SCHEMAS DE EVENTO ==========
 
 class EventoBase(BaseModel):
@@ -57,6 +72,8 @@ class EventoUpdate(BaseModel):
 
 class Evento(EventoBase):
     id: int
+    hora_colorin: Optional[time] = None  # Horarios interpretados (None si el texto no es una hora)
+    hora_cumpleanos: Optional[time] = None
     
     class Config:
         from_attributes = True
@@ -81,6 +98,14 @@ class Asignacion(AsignacionBase):
         from_attributes = True
 
 
+class AsignacionDetalle(Asignacion):
+    profesor: Optional[Profesor] = None  # Solo con include=profesores
+
+
+class EventoDetalle(Evento):
+    asignaciones: Optional[List[AsignacionDetalle]] = None  # Solo con include=asignaciones
+
+
 # ========== SCHEMAS DE USUARIO ==========
 
 class UsuarioBase(BaseModel):
@@ -177,3 +202,15 @@ class TareaEvento(TareaEventoBase):
     class Config:
         from_attributes = True
 
+
+# ========== SCHEMAS DE BATCH ==========
+
+class OperacionBatch(BaseModel):
+    metodo: Literal["POST", "PUT", "PATCH", "DELETE"]
+    ruta: str  # ej: "/asignaciones/12" o "/eventos/3/tareas/7/toggle"
+    cuerpo: Optional[Any] = None  # El mismo cuerpo que recibe el endpoint
+
+
+class Batch(BaseModel):
+    operaciones: List[OperacionBatch]
+    atomico: bool = False  # Si una operación falla, no se aplica ninguna
@@ -0,0 +1,130 @@
+"""Alta de asignaciones: sin pares (profesor, evento) repetidos aunque haya requests concurrentes"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql
+import threading
+import pytest
+import carga
+import database
+import models
+import operaciones
+
+
+def _datos(db, profesores=3, eventos=2, tipo="prueba"):
+    nuevos_profesores = [models.Profesor(nombre=f"Profe {tipo} {n}", activo=True) for n in range(profesores)]
+    nuevos_eventos = [
+        models.Evento(nombre=f"Evento {tipo} {n}", fecha=date(2031, 5, n + 1), tipo=tipo) for n in range(eventos)
+    ]
+    db.add_all(nuevos_profesores + nuevos_eventos)
+    carga.contar_eventos(db, [(e.fecha, 1) for e in nuevos_eventos])
+    db.commit()
+    return [p.id for p in nuevos_profesores], [e.id for e in nuevos_eventos]
+
+
+def _repetidas(db):
+    return db.execute(
+        select(models.Asignacion.profesor_id, models.Asignacion.evento_id)
+        .group_by(models.Asignacion.profesor_id, models.Asignacion.evento_id)
+        .having(func.count() > 1)
+    ).all()
+
+
+def test_insertar_devuelve_solo_las_nuevas(db):
+    profesores, (evento, _) = _datos(db, tipo="duplicadas")
+    primera = operaciones.insertar_asignaciones(db, [{"profesor_id": profesores[0], "evento_id": evento}])
+    db.commit()
+    assert len(primera) == 1
+
+    filas = [{"profesor_id": p, "evento_id": evento} for p in profesores]
+    # El par ya guardado y uno repetido dentro del mismo pedido se descartan
+    insertadas = operaciones.insertar_asignaciones(db, filas + filas[1:2])
+    db.commit()
+    assert sorted(a.profesor_id for a in insertadas) == profesores[1:]
+    assert _repetidas(db) == []
+    assert carga.verificar(db)["consistente"]
+
+
+def test_insertar_concurrente_sin_duplicados(db):
+    profesores, eventos = _datos(db, profesores=4, eventos=3, tipo="concurrentes")
+    filas = [{"profesor_id": p, "evento_id": e} for p in profesores for e in eventos]
+    barrera = threading.Barrier(6)
+
+    def insertar(_):
+        sesion = database.SessionLocal()
+        try:
+            barrera.wait(5)
+            insertadas = [(a.profesor_id, a.evento_id) for a in operaciones.insertar_asignaciones(sesion, filas)]
+            sesion.commit()
+            return insertadas
+        finally:
+            sesion.close()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        resultados = list(pool.map(insertar, range(6)))
+
+    # Cada par lo devuelve exactamente una de las transacciones
+    devueltas = [par for resultado in resultados for par in resultado]
+    assert sorted(devueltas) == sorted((f["profesor_id"], f["evento_id"]) for f in filas)
+    assert _repetidas(db) == []
+    assert carga.verificar(db)["consistente"]
+
+
+@pytest.mark.postgresql
+def test_insertar_con_on_conflict_de_postgresql(db):
+    assert isinstance(database.insert_con_conflictos(db, models.Asignacion), postgresql.Insert)
+    profesores, (evento, _) = _datos(db, tipo="postgresql")
+    filas = [{"profesor_id": p, "evento_id": evento} for p in profesores]
+    sentencias = []
+
+    def registrar(conn, cursor, sql, parametros, contexto, muchos):
+        if "INSERT INTO asignaciones" in sql:
+            sentencias.append(sql)
+
+    event.listen(database.engine, "before_cursor_execute", registrar)
+    try:
+        assert len(operaciones.insertar_asignaciones(db, filas)) == len(filas)
+        assert operaciones.insertar_asignaciones(db, filas) == []
+        db.commit()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", registrar)
+    assert sentencias and all("ON CONFLICT" in sql and "RETURNING" in sql for sql in sentencias)
+    assert _repetidas(db) == []
+
+
+def test_multiples_atomico(cliente, db):
+    profesores, (evento, _) = _datos(db, tipo="atomico")
+    pedido = [{"profesor_id": p, "evento_id": evento} for p in profesores]
+
+    respuesta = cliente.post("/asignaciones/multiples?atomico=true", json=pedido + [{"profesor_id": 0, "evento_id": evento}])
+    assert respuesta.status_code == 400
+    estados = [r["estado"] for r in respuesta.json()["detail"]["resultados"]]
+    assert estados == ["cancelada"] * len(profesores) + ["error"]
+    assert db.scalar(select(func.count()).where(models.Asignacion.evento_id == evento)) == 0
+
+    respuesta = cliente.post("/asignaciones/multiples?atomico=true", json=pedido)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["total_creadas"] == len(profesores)
+    # Sin atomico los ya asignados se informan como error y no frenan al resto
+    respuesta = cliente.post("/asignaciones/multiples", json=pedido)
+    assert respuesta.json()["total_creadas"] == 0
+    assert len(respuesta.json()["errores"]) == len(profesores)
+    assert _repetidas(db) == []
+    assert carga.verificar(db)["consistente"]
+
+
+def test_planificar_simulado_no_guarda(cliente, db):
+    _, eventos = _datos(db, profesores=2, eventos=3, tipo="planificado")
+    parametros = {"fecha_desde": "2031-05-01", "fecha_hasta": "2031-05-31", "cantidad_profes": 2, "tipo": "planificado"}
+
+    simulado = cliente.post("/eventos/planificar", params={**parametros, "simular": True}).json()
+    assert simulado["simulacion"] is True
+    assert simulado["total_asignaciones"] == 2 * len(eventos)
+    assert db.scalar(select(func.count()).where(models.Asignacion.evento_id.in_(eventos))) == 0
+
+    real = cliente.post("/eventos/planificar", params=parametros).json()
+    assert real["simulacion"] is False
+    assert real["plan"] == simulado["plan"]
+    assert db.scalar(select(func.count()).where(models.Asignacion.evento_id.in_(eventos))) == 2 * len(eventos)
+    assert _repetidas(db) == []
+    assert carga.verificar(db)["consistente"]
@@ -0,0 +1,47 @@
+"""Las rutas de /async responden lo mismo que sus equivalentes síncronas"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def datos(cliente):
+    profesor = cliente.post("/profesores/", json={"nombre": "Profe async"}).json()
+    for fecha, tipo in (("2033-03-02", "cumpleaños"), ("2033-03-20", "taller"), ("2033-05-11", "cumpleaños")):
+        evento = cliente.post("/eventos/", json={
+            "nombre": f"Evento async {fecha}", "fecha": fecha, "tipo": tipo, "actividad": ["Slime"],
+            "horario_colorin": "14:00 a 16:00",
+        }).json()
+        cliente.post("/asignaciones/", json={"profesor_id": profesor["id"], "evento_id": evento["id"]})
+    return profesor
+
+
+def _rutas(profesor_id):
+    rango = {"fecha_desde": "2033-03-01", "fecha_hasta": "2033-05-31"}
+    return [
+        ("/eventos/", {**rango, "include": "asignaciones,profesores"}),
+        ("/eventos/", {**rango, "limite": 2, "total": True}),
+        ("/reportes/estadisticas-profesores", rango),
+        (f"/reportes/eventos-por-profe/{profesor_id}", rango),
+        ("/reportes/distribucion-equitativa", {}),
+        ("/reportes/actividades", rango),
+        ("/reportes/series", {**rango, "periodo": "semana"}),
+        ("/reportes/series", {**rango, "profesor_id": profesor_id, "tipo": "cumpleaños"}),
+    ]
+
+
+@pytest.mark.parametrize("indice", range(len(_rutas(0))))
+def test_async_igual_que_sync(cliente, datos, indice):
+    ruta, parametros = _rutas(datos["id"])[indice]
+    sincrona = cliente.get(ruta, params=parametros)
+    asincrona = cliente.get("/async" + ruta, params=parametros)
+    assert sincrona.status_code == asincrona.status_code == 200, asincrona.text
+    assert asincrona.json() == sincrona.json()
+    for cabecera in ("X-Next-Cursor", "X-Total-Count"):
+        assert asincrona.headers.get(cabecera) == sincrona.headers.get(cabecera)
+
+    repetida = cliente.get("/async" + ruta, params=parametros, headers={"If-None-Match": asincrona.headers["ETag"]})
+    assert repetida.status_code == 304
+
+
+def test_series_async_de_profesor_inexistente(cliente):
+    respuesta = cliente.get("/async/reportes/series", params={"profesor_id": 999999})
+    assert respuesta.status_code == 404
@@ -0,0 +1,155 @@
+"""Tokens y usuarios en caché, y revocación de tokens (con y sin estado)"""
+from datetime import timedelta
+from fastapi import HTTPException
+from sqlalchemy import update
+import itertools
+import time
+import pytest
+import auth
+import database
+import models
+
+_numeros = itertools.count()
+
+
+@pytest.fixture
+def usuario(app, db):
+    """Admin propio de cada test: se le puede cambiar la contraseña sin afectar a los demás"""
+    nombre = f"admin{next(_numeros)}"
+    db.add(models.Usuario(
+        username=nombre, email=f"{nombre}@colorin.com", hashed_password=auth.get_password_hash("clave"),
+        activo=True, es_admin=True,
+    ))
+    db.commit()
+    return nombre
+
+
+def _token(app, username, password="clave"):
+    respuesta = app.post("/login", data={"username": username, "password": password})
+    assert respuesta.status_code == 200, respuesta.text
+    return {"Authorization": "Bearer " + respuesta.json()["access_token"]}
+
+
+def _modificar(db, username, **valores):
+    db.rollback()
+    usuario = db.query(models.Usuario).filter(models.Usuario.username == username).one()
+    for columna, valor in valores.items():
+        setattr(usuario, columna, valor)
+    db.commit()
+
+
+@pytest.fixture(params=[False, True], ids=["con_estado", "sin_estado"])
+def modo(request, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_STATELESS", request.param)
+    return request.param
+
+
+def test_cambiar_password_revoca_el_token(app, usuario, modo):
+    anterior = _token(app, usuario)
+    assert app.get("/usuarios/me", headers=anterior).status_code == 200
+
+    respuesta = app.put("/usuarios/me/cambiar-password", headers=anterior,
+                        json={"password_actual": "clave", "password_nueva": "nueva"})
+    assert respuesta.status_code == 200, respuesta.text
+    nuevo = {"Authorization": "Bearer " + respuesta.json()["access_token"]}
+
+    assert app.get("/usuarios/me", headers=anterior).status_code == 401
+    assert app.get("/async/eventos/", headers=anterior).status_code == 401
+    assert app.get("/usuarios/me", headers=nuevo).status_code == 200
+    assert app.get("/usuarios/me", headers=_token(app, usuario, "nueva")).status_code == 200
+
+
+@pytest.mark.parametrize("valores", [{"activo": False}, {"es_admin": False}], ids=["activo", "es_admin"])
+def test_cambio_de_estado_o_rol_revoca_el_token(app, db, usuario, modo, valores):
+    cabeceras = _token(app, usuario)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 200
+
+    _modificar(db, usuario, **valores)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 401
+    assert app.get("/async/eventos/", headers=cabeceras).status_code == 401
+
+    # Volver al valor anterior no revive el token: la versión solo sube
+    _modificar(db, usuario, activo=True, es_admin=True)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 401
+
+
+def test_cambio_de_email_no_revoca_el_token(app, db, usuario, modo):
+    cabeceras = _token(app, usuario)
+    _modificar(db, usuario, email=f"{usuario}@otro.com")
+    assert app.get("/eventos/", headers=cabeceras).status_code == 200
+
+
+def test_token_y_usuario_en_cache_hasta_confirmar(app, db, usuario, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_STATELESS", False)
+    cabeceras = _token(app, usuario)
+    token = cabeceras["Authorization"].split()[1]
+    app.get("/usuarios/me", headers=cabeceras)
+    assert auth._tokens_cache.obtener(token) == (usuario, 0)
+    assert auth._usuarios_cache.obtener(usuario).email == f"{usuario}@colorin.com"
+
+    # Un cambio deshecho no invalida
+    db.query(models.Usuario).filter(models.Usuario.username == usuario).one().email = "descartado@colorin.com"
+    db.flush()
+    db.rollback()
+    assert auth._usuarios_cache.obtener(usuario) is not None
+
+    # Al confirmar se descartan el usuario y sus tokens
+    _modificar(db, usuario, email=f"{usuario}@nuevo.com")
+    assert auth._usuarios_cache.obtener(usuario) is None
+    assert auth._tokens_cache.obtener(token) is None
+    assert app.get("/usuarios/me", headers=cabeceras).json()["email"] == f"{usuario}@nuevo.com"
+
+
+def test_update_masivo_vacia_las_caches(app, db, usuario, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_STATELESS", False)
+    cabeceras = _token(app, usuario)
+    app.get("/usuarios/me", headers=cabeceras)
+    assert auth._usuarios_cache.obtener(usuario) is not None
+
+    db.execute(update(models.Usuario).where(models.Usuario.username == usuario).values(email=f"{usuario}@masivo.com"))
+    assert auth._usuarios_cache.obtener(usuario) is not None
+    db.commit()
+    assert len(auth._usuarios_cache) == len(auth._tokens_cache) == 0
+    assert app.get("/usuarios/me", headers=cabeceras).json()["email"] == f"{usuario}@masivo.com"
+
+
+def test_lectura_anterior_a_la_invalidacion_no_se_guarda(app, db, usuario):
+    fila = db.query(models.Usuario).filter(models.Usuario.username == usuario).one()
+    generacion = auth._generacion
+    viejo = auth._snapshot_usuario(fila)
+
+    # Otro request confirma un cambio mientras este todavía no guardó lo que leyó
+    auth.invalidar_usuario(usuario)
+    auth._guardar_usuario(usuario, viejo, generacion)
+    assert auth._usuarios_cache.obtener(usuario) is None
+
+    auth._guardar_usuario(usuario, viejo, auth._generacion)
+    assert auth._usuarios_cache.obtener(usuario) == viejo
+
+
+def test_token_en_cache_no_dura_mas_que_su_expiracion(usuario):
+    token = auth.create_access_token({"sub": usuario}, expires_delta=timedelta(seconds=2))
+    auth._datos_token(token)
+    expira, _ = auth._tokens_cache._datos[token]
+    assert expira - time.monotonic() <= 2 < auth.AUTH_CACHE_TTL_SECONDS
+
+    vencido = auth.create_access_token({"sub": usuario}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        auth._datos_token(vencido)
+    assert auth._tokens_cache.obtener(vencido) is None
+
+
+def test_sin_estado_ve_cambios_de_otro_proceso_al_recargar(app, usuario, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+    cabeceras = _token(app, usuario)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 200
+
+    # SQL directo, sin Session: ningún evento de este proceso se entera del cambio
+    with database.engine.begin() as conn:
+        conn.execute(update(models.Usuario).where(models.Usuario.username == usuario)
+                     .values(token_version=models.Usuario.token_version + 1))
+    monkeypatch.setattr(auth, "AUTH_TOKEN_VERSION_REFRESH_SECONDS", 3600)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 200
+
+    monkeypatch.setattr(auth, "AUTH_TOKEN_VERSION_REFRESH_SECONDS", 0)
+    assert app.get("/eventos/", headers=cabeceras).status_code == 401
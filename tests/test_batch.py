@@ -0,0 +1,98 @@
+"""POST /batch: resolución de rutas, errores por operación, lote atómico y límite de operaciones"""
+from fastapi import HTTPException
+from sqlalchemy import func, select
+import pytest
+import batch
+import models
+
+
+@pytest.mark.parametrize("metodo, ruta, plantilla, ids", [
+    ("POST", "/profesores/", "/profesores/", {}),
+    ("POST", "/profesores", "/profesores/", {}),
+    ("PUT", "/eventos/12", "/eventos/{evento_id}", {"evento_id": 12}),
+    ("DELETE", "/eventos/12/", "/eventos/{evento_id}", {"evento_id": 12}),
+    ("PATCH", "/eventos/3/tareas/7/toggle", "/eventos/{evento_id}/tareas/{tarea_id}/toggle", {"evento_id": 3, "tarea_id": 7}),
+])
+def test_resolver(metodo, ruta, plantilla, ids):
+    encontrada, encontrados = batch.resolver(metodo, ruta)
+    assert (encontrada.metodo, encontrada.plantilla, encontrados) == (metodo, plantilla, ids)
+
+
+@pytest.mark.parametrize("metodo, ruta", [
+    ("POST", "/usuarios/"),
+    ("DELETE", "/eventos/abc"),
+    ("DELETE", "/eventos/12/asignaciones"),
+    ("POST", "/batch"),
+])
+def test_resolver_ruta_inexistente(metodo, ruta):
+    with pytest.raises(HTTPException) as error:
+        batch.resolver(metodo, ruta)
+    assert error.value.status_code == 404
+
+
+@pytest.mark.parametrize("metodo, ruta", [
+    ("PATCH", "/eventos/3"),
+    ("DELETE", "/profesores/"),
+    ("PUT", "/asignaciones/5"),
+    ("POST", "/tareas/3/toggle"),
+    ("PUT", "/eventos/3/tareas"),
+])
+def test_resolver_metodo_no_permitido(metodo, ruta):
+    with pytest.raises(HTTPException) as error:
+        batch.resolver(metodo, ruta)
+    assert error.value.status_code == 405
+
+
+def _profesores(db, prefijo):
+    total = db.scalar(select(func.count()).select_from(models.Profesor).where(models.Profesor.nombre.startswith(prefijo)))
+    db.rollback()
+    return total
+
+
+def test_errores_por_operacion(cliente, db):
+    respuesta = cliente.post("/batch", json={"operaciones": [
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": "Profe batch 1"}},
+        {"metodo": "POST", "ruta": "/usuarios/", "cuerpo": {}},
+        {"metodo": "PATCH", "ruta": "/profesores/1", "cuerpo": {}},
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"activo": True}},
+        {"metodo": "DELETE", "ruta": "/eventos/999999"},
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": "Profe batch 2"}},
+    ]})
+    assert respuesta.status_code == 200, respuesta.text
+    resultado = respuesta.json()
+    assert [r["status"] for r in resultado["resultados"]] == [200, 404, 405, 422, 404, 200]
+    assert [r["indice"] for r in resultado["resultados"]] == list(range(6))
+    assert (resultado["total"], resultado["exitosas"], resultado["fallidas"]) == (6, 2, 4)
+    assert resultado["resultados"][0]["respuesta"]["nombre"] == "Profe batch 1"
+    assert _profesores(db, "Profe batch ") == 2
+
+
+def test_atomico_no_aplica_nada_si_una_falla(cliente, db):
+    respuesta = cliente.post("/batch", json={"atomico": True, "operaciones": [
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": "Profe atómico 1"}},
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": "Profe atómico 2"}},
+        {"metodo": "PUT", "ruta": "/profesores/999999", "cuerpo": {"nombre": "No existe"}},
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": "Profe atómico 3"}},
+    ]})
+    assert respuesta.status_code == 404
+    resultados = respuesta.json()["detail"]["resultados"]
+    assert [r["status"] for r in resultados] == [424, 424, 404]
+    assert all("respuesta" not in r for r in resultados)
+    assert _profesores(db, "Profe atómico") == 0
+
+
+def test_limite_de_operaciones(cliente, db):
+    assert batch.BATCH_MAX_OPERACIONES == 200
+    operaciones = [
+        {"metodo": "POST", "ruta": "/profesores/", "cuerpo": {"nombre": f"Profe límite {n}"}}
+        for n in range(batch.BATCH_MAX_OPERACIONES + 1)
+    ]
+    respuesta = cliente.post("/batch", json={"operaciones": operaciones})
+    assert respuesta.status_code == 400
+    assert "200" in respuesta.json()["detail"]
+    assert _profesores(db, "Profe límite") == 0
+
+    respuesta = cliente.post("/batch", json={"operaciones": operaciones[:-1]})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["exitosas"] == batch.BATCH_MAX_OPERACIONES
+    assert _profesores(db, "Profe límite") == batch.BATCH_MAX_OPERACIONES
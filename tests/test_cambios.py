@@ -0,0 +1,169 @@
+"""Versiones de cambio guardadas en la base: las ven todos los procesos"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+import threading
+import pytest
+import cambios
+import database
+import models
+
+
+def test_cambio_de_otro_proceso_invalida_el_etag(cliente):
+    etag = cliente.get("/profesores/").headers["ETag"]
+    assert cliente.get("/profesores/", headers={"If-None-Match": etag}).status_code == 304
+
+    # Otro proceso: su propio engine sobre la misma base, sin compartir memoria con la API
+    otro = create_engine(database.engine.url)
+    with Session(otro) as sesion:
+        sesion.add(models.Profesor(nombre="Profe de otro proceso", activo=True))
+        sesion.commit()
+    otro.dispose()
+
+    respuesta = cliente.get("/profesores/", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["ETag"] != etag
+
+
+def test_cambio_de_otro_proceso_invalida_los_reportes(cliente):
+    nombres = lambda ruta: {p["nombre"] for p in cliente.get(ruta).json()["distribucion"]}
+    rutas = ["/reportes/distribucion-equitativa", "/async/reportes/distribucion-equitativa"]
+    for ruta in rutas:
+        assert "Profe para los reportes" not in nombres(ruta)
+
+    otro = create_engine(database.engine.url)
+    with Session(otro) as sesion:
+        sesion.add(models.Profesor(nombre="Profe para los reportes", activo=True))
+        sesion.commit()
+    otro.dispose()
+
+    for ruta in rutas:
+        assert "Profe para los reportes" in nombres(ruta)
+
+
+def test_versiones_al_confirmar(db):
+    (antes,) = cambios.versiones(["profesores"])
+
+    db.add(models.Profesor(nombre="Profe descartado", activo=True))
+    db.flush()
+    db.rollback()
+    assert cambios.versiones(["profesores"]) == (antes,)
+
+    # Varios SAVEPOINTs dentro de una transacción suman una sola versión al confirmar
+    database.iniciar_transaccion(db)
+    for numero in range(3):
+        with db.begin_nested():
+            db.add(models.Profesor(nombre=f"Profe en savepoint {numero}", activo=True))
+    assert cambios.versiones(["profesores"]) == (antes,)
+    db.commit()
+    assert cambios.versiones(["profesores"]) == (antes + 1,)
+
+
+@contextmanager
+def _lecturas_de_versiones(motor):
+    sentencias = []
+
+    def registrar(conn, cursor, sql, parametros, contexto, muchos):
+        if "versiones_tablas" in sql:
+            sentencias.append(sql)
+
+    event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(motor, "before_cursor_execute", registrar)
+
+
+def test_etag_desde_la_copia_en_memoria(cliente, monkeypatch):
+    monkeypatch.setattr(cambios, "CAMBIOS_VERSIONES_TTL_SECONDS", 60)
+    cambios.descartar_copia()
+    with _lecturas_de_versiones(database.engine) as sentencias:
+        etag = cliente.get("/profesores/").headers["ETag"]
+        for _ in range(3):
+            assert cliente.get("/profesores/", headers={"If-None-Match": etag}).status_code == 304
+    assert len(sentencias) == 1
+
+    # Un commit de este proceso descarta la copia en el acto
+    cliente.post("/profesores/", json={"nombre": "Profe con la copia vigente"})
+    assert cliente.get("/profesores/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_cambio_de_otro_proceso_se_ve_al_vencer_la_copia(cliente, monkeypatch):
+    monkeypatch.setattr(cambios, "CAMBIOS_VERSIONES_TTL_SECONDS", 60)
+    etag = cliente.get("/profesores/").headers["ETag"]
+
+    # Otro proceso: incrementa la versión sin pasar por las sesiones de este
+    with database.engine.begin() as conn:
+        conn.execute(text("UPDATE versiones_tablas SET version = version + 1 WHERE tabla = 'profesores'"))
+    assert cliente.get("/profesores/", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(cambios, "CAMBIOS_VERSIONES_TTL_SECONDS", 0)
+    assert cliente.get("/profesores/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_condicional_async_lee_con_el_motor_async(cliente, monkeypatch):
+    if database.async_engine is None:
+        pytest.skip("necesita el motor async (aiosqlite o asyncpg)")
+
+    def sin_motor_sincrono(tablas):
+        raise AssertionError("/async no debería leer las versiones en el threadpool")
+
+    monkeypatch.setattr(cambios, "versiones", sin_motor_sincrono)
+    cambios.descartar_copia()
+    with _lecturas_de_versiones(database.async_engine.sync_engine) as sentencias:
+        respuesta = cliente.get("/async/eventos/")
+        assert respuesta.status_code == 200
+        assert cliente.get("/async/eventos/", headers={"If-None-Match": respuesta.headers["ETag"]}).status_code == 304
+    assert len(sentencias) == 1
+    monkeypatch.undo()
+    assert cliente.get("/eventos/").headers["ETag"] == respuesta.headers["ETag"]
+
+
+
+def test_reportes_async_leen_versiones_con_el_motor_async(cliente, monkeypatch):
+    if database.async_engine is None:
+        pytest.skip("necesita el motor async (aiosqlite o asyncpg)")
+
+    def sin_motor_sincrono(tablas):
+        raise AssertionError("/async no debería leer las versiones en el threadpool")
+
+    ruta = "/async/reportes/distribucion-equitativa"
+    antes = cliente.get(ruta).json()
+    monkeypatch.setattr(cambios, "versiones", sin_motor_sincrono)
+    monkeypatch.setattr(cambios, "CAMBIOS_VERSIONES_TTL_SECONDS", 0)
+    with _lecturas_de_versiones(database.async_engine.sync_engine) as sentencias:
+        assert cliente.get(ruta, headers={"If-None-Match": "otro"}).json() == antes
+    # Una lectura para el ETag y otra para la clave del caché del reporte
+    assert len(sentencias) == 2
+
+@pytest.mark.postgresql
+def test_escritores_no_bloquean_la_fila_de_version(app):
+    with _lecturas_de_versiones(database.engine) as sentencias, Session(database.engine) as sesion:
+        (antes,) = cambios.versiones(["profesores"])
+        sesion.add(models.Profesor(nombre="Profe sin lock de version", activo=True))
+        sesion.commit()
+        # La transacción del escritor no tocó versiones_tablas; el incremento ya está hecho
+        assert not [sql for sql in sentencias if "INSERT" in sql or "UPDATE" in sql]
+        assert cambios.versiones(["profesores"]) == (antes + 1,)
+
+
+@pytest.mark.postgresql
+def test_commits_concurrentes_publican_sus_versiones(app):
+    (antes,) = cambios.versiones(["profesores"])
+    barrera = threading.Barrier(8)
+
+    def escribir(numero):
+        with Session(database.engine) as sesion:
+            sesion.add(models.Profesor(nombre=f"Profe concurrente {numero}", activo=True))
+            barrera.wait(5)
+            sesion.commit()
+        # Al volver del commit la versión ya cambió, aunque la haya publicado otro hilo
+        with database.engine.connect() as conn:
+            return conn.scalar(text("SELECT version FROM versiones_tablas WHERE tabla = 'profesores'"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        vistas = list(pool.map(escribir, range(8)))
+    assert all(version > antes for version in vistas)
+    (despues,) = cambios.versiones(["profesores"])
+    assert antes < despues <= antes + 8
@@ -0,0 +1,122 @@
+"""carga_profesores y resumen_asignaciones siguen a las asignaciones en cada escritura"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy import event, func, select
+import threading
+import carga
+import consultas
+import database
+import models
+
+DESDE = date(2031, 6, 20)
+
+
+def _comprobar(db):
+    db.rollback()  # leer lo último que confirmaron los requests
+    resultado = carga.verificar(db)
+    assert resultado["consistente"], resultado["diferencias"]
+    # La carga futura (días del mes más meses del resumen) coincide con contar las asignaciones
+    real = dict(db.execute(
+        select(models.Asignacion.profesor_id, func.count())
+        .join(models.Evento, models.Asignacion.evento_id == models.Evento.id)
+        .where(models.Evento.fecha >= DESDE)
+        .group_by(models.Asignacion.profesor_id)
+    ).all())
+    assert dict(db.execute(consultas.carga_futura_stmt(DESDE)).all()) == real
+
+
+def _evento(cliente, fecha, tipo="cumpleaños"):
+    respuesta = cliente.post("/eventos/", json={"nombre": f"Evento {fecha}", "fecha": fecha, "tipo": tipo})
+    return respuesta.json()["id"]
+
+
+def _profesores(cliente, cantidad):
+    return [cliente.post("/profesores/", json={"nombre": f"Profe carga {n}"}).json()["id"] for n in range(cantidad)]
+
+
+def test_carga_en_cada_escritura(cliente, db):
+    profesores = _profesores(cliente, 3)
+    junio, julio, agosto = _evento(cliente, "2031-06-25"), _evento(cliente, "2031-07-10"), _evento(cliente, "2031-08-05")
+
+    # Alta de una asignación
+    asignacion = cliente.post("/asignaciones/", json={"profesor_id": profesores[0], "evento_id": junio}).json()
+    cliente.post("/asignaciones/", json={"profesor_id": profesores[1], "evento_id": julio})
+    _comprobar(db)
+
+    # Varias a la vez
+    respuesta = cliente.post("/asignaciones/multiples", json=[
+        {"profesor_id": profesores[0], "evento_id": agosto},
+        {"profesor_id": profesores[2], "evento_id": agosto},
+        {"profesor_id": profesores[2], "evento_id": julio},
+    ])
+    assert respuesta.json()["total_creadas"] == 3
+    _comprobar(db)
+
+    # Mover un evento de mes (y de tipo), y a una fecha anterior al rango
+    cliente.put(f"/eventos/{julio}", json={"fecha": "2031-06-28", "tipo": "evento_especial"})
+    _comprobar(db)
+    cliente.put(f"/eventos/{agosto}", json={"fecha": "2031-06-01"})
+    _comprobar(db)
+
+    # Baja de una asignación y de un evento con asignaciones
+    cliente.delete(f"/asignaciones/{asignacion['id']}")
+    _comprobar(db)
+    cliente.delete(f"/eventos/{julio}")
+    _comprobar(db)
+
+
+def test_carga_en_batch_y_planificador(cliente, db):
+    profesores = _profesores(cliente, 2)
+    eventos = [_evento(cliente, fecha, "taller") for fecha in ("2031-06-30", "2031-07-01", "2031-09-15")]
+
+    respuesta = cliente.post("/batch", json={"operaciones": [
+        {"metodo": "POST", "ruta": "/asignaciones/", "cuerpo": {"profesor_id": profesores[0], "evento_id": eventos[0]}},
+        {"metodo": "PUT", "ruta": f"/eventos/{eventos[0]}", "cuerpo": {"fecha": "2031-08-01"}},
+        {"metodo": "DELETE", "ruta": f"/eventos/{eventos[1]}"},
+    ]})
+    assert respuesta.json()["exitosas"] == 3, respuesta.text
+    _comprobar(db)
+
+    respuesta = cliente.post("/eventos/planificar", params={
+        "fecha_desde": "2031-06-01", "fecha_hasta": "2031-09-30", "cantidad_profes": 1, "tipo": "taller",
+    })
+    assert respuesta.json()["total_asignaciones"] == 1
+    _comprobar(db)
+
+
+def test_sumas_concurrentes_sobre_la_misma_fila(db):
+    profesor = models.Profesor(nombre="Profe de las sumas", activo=True)
+    db.add(profesor)
+    db.commit()
+    profesor_id, fecha = profesor.id, date(2031, 11, 3)
+    sentencias = []
+    barrera = threading.Barrier(8)
+
+    def sumar(delta):
+        sesion = database.SessionLocal()
+        try:
+            barrera.wait(5)
+            carga.ajustar(sesion, [(profesor_id, fecha, delta)])
+            sesion.commit()
+        finally:
+            sesion.close()
+
+    def registrar(conn, cursor, sql, parametros, contexto, muchos):
+        if "INSERT INTO carga_profesores" in sql:
+            sentencias.append(sql)
+
+    event.listen(database.engine, "before_cursor_execute", registrar)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(sumar, [1] * 8))
+    finally:
+        event.remove(database.engine, "before_cursor_execute", registrar)
+    # Upsert atómico (ON CONFLICT DO UPDATE): ninguna suma se pierde
+    assert sentencias and all("ON CONFLICT" in sql for sql in sentencias)
+    total = select(models.CargaProfesor.total).where(models.CargaProfesor.profesor_id == profesor_id)
+    assert db.scalar(total) == 8
+
+    # Restar hasta cero borra la fila
+    carga.ajustar(db, [(profesor_id, fecha, -8)])
+    db.commit()
+    assert db.scalar(total) is None
@@ -0,0 +1,59 @@
+"""Resumen del dashboard: revalidación por ETag, distribución completa y totales materializados"""
+from datetime import date, timedelta
+from sqlalchemy import select
+import carga
+import consultas
+import models
+
+
+def test_resumen_revalida_con_etag(cliente):
+    respuesta = cliente.get("/dashboard/resumen")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["Cache-Control"] == "private, no-cache"
+
+    repetida = cliente.get("/dashboard/resumen", headers={"If-None-Match": respuesta.headers["ETag"]})
+    assert repetida.status_code == 304
+
+
+def test_resumen_con_todos_los_profesores(cliente, db):
+    for numero in range(7):
+        cliente.post("/profesores/", json={"nombre": f"Profe dashboard {numero}"})
+    activos = db.query(models.Profesor).filter(models.Profesor.activo == True).count()
+
+    equidad = cliente.get("/dashboard/resumen").json()["equidad"]
+    assert len(equidad["distribucion"]) == activos > 5
+
+
+def test_totales_de_eventos_desde_eventos_por_fecha(cliente, db):
+    def totales():
+        return cliente.get("/dashboard/resumen").json()["eventos"]
+
+    def reales():
+        hoy = date.today()
+        lunes = hoy - timedelta(days=hoy.weekday())
+        fechas = db.scalars(select(models.Evento.fecha)).all()
+        db.rollback()
+        return {
+            "total": len(fechas),
+            "proximos": sum(fecha >= hoy for fecha in fechas),
+            "esta_semana": sum(lunes <= fecha < lunes + timedelta(days=7) for fecha in fechas),
+        }
+
+    hoy = date.today()
+    nuevos = [
+        cliente.post("/eventos/", json={"nombre": f"Evento dashboard {n}", "fecha": str(hoy + timedelta(days=n)), "tipo": "dashboard"}).json()
+        for n in (-10, 0, 0, 3)
+    ]
+    cliente.post("/eventos/importar", json=[{"nombre": "Importado dashboard", "fecha": str(hoy), "tipo": "dashboard"}])
+    assert totales() == reales()
+
+    cliente.put(f"/eventos/{nuevos[0]['id']}", json={"fecha": str(hoy + timedelta(days=1))})
+    cliente.delete(f"/eventos/{nuevos[1]['id']}")
+    assert totales() == reales()
+    assert carga.verificar(db)["consistente"]
+
+
+def test_resumen_no_recorre_los_eventos():
+    sql = str(consultas.resumen_dashboard_stmt(date.today()).compile())
+    assert "eventos_por_fecha" in sql
+    assert "FROM eventos " not in sql and "FROM eventos\n" not in sql
@@ -0,0 +1,26 @@
+"""Ajustes de SQLITE_PRAGMAS: solo PRAGMAs conocidos con valores enteros o palabras válidas"""
+import pytest
+import database
+
+
+def test_ajustes_validos(monkeypatch):
+    monkeypatch.setenv("SQLITE_PRAGMAS", "mmap_size=0, cache_size=-4000,Synchronous=full,journal_mode=wal")
+    pragmas = database._pragmas_configurados()
+    assert pragmas["mmap_size"] == 0
+    assert pragmas["cache_size"] == -4000
+    assert pragmas["synchronous"] == "FULL"
+    assert pragmas["journal_mode"] == "WAL"
+
+
+@pytest.mark.parametrize("ajuste", [
+    "key='x'",
+    "mmap_size=0; DROP TABLE eventos",
+    "synchronous=NORMAL--",
+    "journal_mode=wal2",
+    "busy_timeout=5s",
+    "cache_size=",
+])
+def test_ajustes_rechazados(monkeypatch, ajuste):
+    monkeypatch.setenv("SQLITE_PRAGMAS", ajuste)
+    with pytest.raises(ValueError, match="SQLITE_PRAGMAS"):
+        database._pragmas_configurados()
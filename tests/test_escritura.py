@@ -0,0 +1,95 @@
+"""Group commit del escritor único: un COMMIT por lote, no uno por operación"""
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event
+import sqlite3
+import threading
+import time
+
+import escritura
+import models
+
+
+def _escritor(tmp_path):
+    archivo = tmp_path / "escritor.db"
+    escritor = escritura.EscritorUnico(f"sqlite:///{archivo}", max_lote=64)
+    models.Base.metadata.create_all(escritor.engine)
+    sentencias = []
+    event.listen(escritor.engine, "connect", lambda conexion, _: conexion.set_trace_callback(sentencias.append))
+    escritor.engine.dispose()
+    return escritor, archivo, sentencias
+
+
+def _esperar_cola(escritor, cantidad):
+    limite = time.monotonic() + 5
+    while escritor._cola.qsize() < cantidad:
+        assert time.monotonic() < limite, "las operaciones no llegaron a la cola"
+        time.sleep(0.01)
+
+
+def test_un_commit_por_lote(tmp_path):
+    escritor, archivo, sentencias = _escritor(tmp_path)
+    observador = sqlite3.connect(archivo, check_same_thread=False)
+    liberar = threading.Event()
+    visibles = []
+
+    def bloquear(sesion):
+        # Retiene al escritor para que las demás operaciones se junten en un solo lote
+        liberar.wait(5)
+        sesion.add(models.Profesor(nombre="primero"))
+
+    def insertar(numero):
+        def operacion(sesion):
+            # Lo que otra conexión ve son solo filas confirmadas
+            visibles.append(observador.execute("SELECT count(*) FROM profesores").fetchone()[0])
+            sesion.add(models.Profesor(nombre=f"profe {numero}"))
+        return operacion
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        primero = pool.submit(escritor.enviar, bloquear)
+        _esperar_cola(escritor, 0)
+        time.sleep(0.05)
+        futuros = [pool.submit(escritor.enviar, insertar(n)) for n in range(19)]
+        _esperar_cola(escritor, 19)
+        liberar.set()
+        primero.result()
+        for futuro in futuros:
+            futuro.result()
+
+    commits = [s for s in sentencias if s.strip().upper() == "COMMIT"]
+    assert len(commits) == 2, sentencias
+    # Dentro del segundo lote ninguna operación vio filas de las anteriores del mismo lote
+    assert visibles == [1] * 19
+    assert observador.execute("SELECT count(*) FROM profesores").fetchone()[0] == 20
+    observador.close()
+
+
+def test_error_solo_deshace_su_operacion(tmp_path):
+    escritor, archivo, sentencias = _escritor(tmp_path)
+    liberar = threading.Event()
+
+    def bloquear(sesion):
+        liberar.wait(5)
+
+    def fallar(sesion):
+        sesion.add(models.Profesor(nombre="descartado"))
+        sesion.flush()
+        raise ValueError("falla")
+
+    def insertar(sesion):
+        sesion.add(models.Profesor(nombre="confirmado"))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        primero = pool.submit(escritor.enviar, bloquear)
+        time.sleep(0.05)
+        fallida = pool.submit(escritor.enviar, fallar)
+        _esperar_cola(escritor, 1)
+        exitosa = pool.submit(escritor.enviar, insertar)
+        _esperar_cola(escritor, 2)
+        liberar.set()
+        primero.result()
+        exitosa.result()
+        assert isinstance(fallida.exception(), ValueError)
+
+    nombres = [fila[0] for fila in sqlite3.connect(archivo).execute("SELECT nombre FROM profesores")]
+    assert nombres == ["confirmado"]
+    assert len([s for s in sentencias if s.strip().upper() == "COMMIT"]) == 2
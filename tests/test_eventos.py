@@ -0,0 +1,58 @@
+"""Actividades de los eventos: se cargan solo donde se leen, con una consulta IN"""
+from contextlib import contextmanager
+from sqlalchemy import event, select
+import database
+import models
+
+
+@contextmanager
+def _consultas_de_actividades():
+    sentencias = []
+
+    def registrar(conn, cursor, sql, parametros, contexto, muchos):
+        if "FROM evento_actividades" in sql:
+            sentencias.append(sql)
+
+    event.listen(database.engine, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(database.engine, "before_cursor_execute", registrar)
+
+
+def test_actividades_en_alta_modificacion_y_lectura(cliente):
+    evento = cliente.post("/eventos/", json={
+        "nombre": "Cumple con actividades", "fecha": "2031-07-01", "tipo": "cumpleaños",
+        "actividad": ["Slime", "Mini cheffs"],
+    }).json()
+    assert evento["actividad"] == ["Slime", "Mini cheffs"]
+
+    # Modificar otro campo devuelve las actividades aunque el evento se lea fuera de la sesión
+    respuesta = cliente.put(f"/eventos/{evento['id']}", json={"nombre": "Cumple renombrado"})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["actividad"] == ["Slime", "Mini cheffs"]
+
+    with _consultas_de_actividades() as sentencias:
+        respuesta = cliente.get(f"/eventos/{evento['id']}", params={"include": "asignaciones"})
+    assert respuesta.json()["actividad"] == ["Slime", "Mini cheffs"]
+    assert len(sentencias) == 1
+
+
+def test_consultar_eventos_no_carga_actividades(cliente, db):
+    cliente.post("/eventos/", json={"nombre": "Evento suelto", "fecha": "2031-07-03", "tipo": "cumpleaños", "actividad": ["Slime"]})
+    with _consultas_de_actividades() as sentencias:
+        assert db.scalars(select(models.Evento)).all()
+    assert sentencias == []
+
+
+def test_reporte_por_profesor_no_carga_actividades(cliente):
+    profesor = cliente.post("/profesores/", json={"nombre": "Profe sin actividades"}).json()
+    evento = cliente.post("/eventos/", json={
+        "nombre": "Evento del reporte", "fecha": "2031-07-02", "tipo": "cumpleaños", "actividad": ["Slime"],
+    }).json()
+    cliente.post("/asignaciones/", json={"profesor_id": profesor["id"], "evento_id": evento["id"]})
+
+    with _consultas_de_actividades() as sentencias:
+        respuesta = cliente.get(f"/reportes/eventos-por-profe/{profesor['id']}")
+    assert respuesta.status_code == 200, respuesta.text
+    assert sentencias == []
@@ -0,0 +1,68 @@
+"""Horarios libres de los eventos: se guardan como time y se filtran por franja en SQL"""
+from datetime import time
+import pytest
+import models
+
+
+@pytest.mark.parametrize("texto, hora", [
+    ("10:00", time(10)),
+    ("2:00 PM", time(14)),
+    ("7:30PM", time(19, 30)),
+    ("2 pm", time(14)),
+    (" 8:05 a.m. ", time(8, 5)),
+    ("12:00 AM", time(0)),
+    ("12 pm", time(12)),
+    ("14.30", time(14, 30)),
+    ("9h30", time(9, 30)),
+    ("10hs", time(10)),
+    ("10 hrs.", time(10)),
+])
+def test_parsear_hora(texto, hora):
+    assert models.parsear_hora(texto) == hora
+
+
+@pytest.mark.parametrize("texto", [
+    None, "", "mediodía", "25:00", "10:75", "10:0", "13 PM", "0 AM", "de 10 a 12", "10:00-12:00",
+])
+def test_parsear_hora_invalida_queda_en_null(texto):
+    assert models.parsear_hora(texto) is None
+
+
+def test_asignar_horario_actualiza_la_hora():
+    evento = models.Evento(nombre="Evento", horario_colorin="2:00 PM")
+    assert evento.hora_colorin == time(14)
+    evento.horario_colorin = "a confirmar"
+    assert evento.hora_colorin is None
+    assert evento.horario_colorin == "a confirmar"
+
+
+def test_filtrar_por_franja_horaria(cliente):
+    rango = {"fecha_desde": "2034-01-10", "fecha_hasta": "2034-01-12"}
+    horarios = {
+        "temprano": {"horario_colorin": "9:00"},
+        "siesta": {"horario_colorin": "2:00 PM"},
+        "solo cumpleaños": {"horario_cumpleanos": "15.30"},
+        "tarde": {"horario_colorin": "18hs", "horario_cumpleanos": "7 pm"},
+        "sin hora": {"horario_colorin": "a confirmar"},
+    }
+    for dia, (nombre, horario) in enumerate(horarios.items()):
+        respuesta = cliente.post("/eventos/", json={
+            "nombre": nombre, "fecha": f"2034-01-1{dia % 3}", "tipo": "cumpleaños", **horario,
+        })
+        assert respuesta.status_code == 200, respuesta.text
+
+    def nombres(**franja):
+        respuesta = cliente.get("/eventos/", params={**rango, **franja})
+        assert respuesta.status_code == 200, respuesta.text
+        return {evento["nombre"] for evento in respuesta.json()}
+
+    assert nombres() == set(horarios)
+    assert nombres(hora_desde="14:00", hora_hasta="16:00") == {"siesta", "solo cumpleaños"}
+    assert nombres(hora_desde="17:00") == {"tarde"}
+    assert nombres(hora_hasta="10:00") == {"temprano"}
+
+    # Cambiar el texto del horario mueve el evento de franja
+    (tarde,) = cliente.get("/eventos/", params={**rango, "hora_desde": "17:00"}).json()
+    cliente.put(f"/eventos/{tarde['id']}", json={"horario_colorin": "8:30", "horario_cumpleanos": "a confirmar"})
+    assert nombres(hora_desde="17:00") == set()
+    assert nombres(hora_hasta="10:00") == {"temprano", "tarde"}
@@ -0,0 +1,141 @@
+"""Importación masiva: errores por fila, lotes que fallan, CSV con BOM y el CSV de /exportar/eventos"""
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+import pytest
+import carga
+import importar
+import models
+import operaciones
+
+ACTIVIDADES = ["Slime; con brillos", "Pintura, témpera", 'Juego "del" globo', "Mini cheffs"]
+
+
+def test_csv_exportado_se_reimporta_igual(cliente):
+    cliente.post("/eventos/", json={
+        "nombre": "Evento para exportar", "fecha": "2032-02-03", "tipo": "csv", "actividad": ACTIVIDADES,
+    })
+    exportado = cliente.get("/exportar/eventos", params={"formato": "csv", "tipo": "csv"}).content
+
+    respuesta = cliente.post("/eventos/importar/csv", files={"archivo": ("eventos.csv", exportado, "text/csv")})
+    assert respuesta.status_code == 200, respuesta.text
+    (nuevo,) = respuesta.json()["ids"]
+    assert cliente.get(f"/eventos/{nuevo}").json()["actividad"] == ACTIVIDADES
+
+
+def test_csv_a_mano_separado_por_punto_y_coma():
+    contenido = "nombre,fecha,tipo,actividad\nA mano,2032-02-04,csv,Slime; Mini cheffs\n".encode()
+    assert importar.leer_csv(contenido)[0]["actividad"] == ["Slime", "Mini cheffs"]
+
+
+def _nombres_importados(db, tipo):
+    nombres = db.scalars(select(models.Evento.nombre).where(models.Evento.tipo == tipo).order_by(models.Evento.id)).all()
+    db.rollback()
+    return nombres
+
+
+def test_filas_invalidas_no_importan_nada(cliente, db):
+    filas = [
+        {"nombre": "Válido 1", "fecha": "2032-03-01", "tipo": "invalidas"},
+        {"nombre": "Sin fecha", "tipo": "invalidas"},
+        {"nombre": "Válido 2", "fecha": "2032-03-02", "tipo": "invalidas", "actividad": "Slime"},
+        {"nombre": "x" * 300, "fecha": "2032-03-03", "tipo": "invalidas"},
+    ]
+    respuesta = cliente.post("/eventos/importar", json=filas)
+    assert respuesta.status_code == 422
+    errores = respuesta.json()["detail"]["errores"]
+    assert [error["fila"] for error in errores] == [2, 3, 4]
+    assert any(mensaje.startswith("fecha:") for mensaje in errores[0]["errores"])
+    assert "nombre: más de" in errores[2]["errores"][0]
+    assert _nombres_importados(db, "invalidas") == []
+
+    respuesta = cliente.post("/eventos/importar", params={"omitir_invalidas": True}, json=filas)
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["importadas"] == 1
+    assert [error["fila"] for error in respuesta.json()["errores"]] == [2, 3, 4]
+    assert _nombres_importados(db, "invalidas") == ["Válido 1"]
+
+
+def test_lote_que_falla_se_informa_por_fila(cliente, db, monkeypatch):
+    original = operaciones.importar_eventos
+
+    def importar_eventos(sesion, eventos):
+        ids = original(sesion, eventos)
+        if any(evento.nombre == "Rompe el lote" for evento in eventos):
+            # Después de insertar: el lote entero tiene que deshacerse
+            raise OperationalError("INSERT INTO eventos", {}, Exception("disco lleno"))
+        return ids
+
+    monkeypatch.setattr(operaciones, "importar_eventos", importar_eventos)
+    filas = [{"nombre": nombre, "fecha": "2032-03-10", "tipo": "lote roto"}
+             for nombre in ("Primero", "Segundo", "Rompe el lote", "Cuarto", "Quinto")]
+    respuesta = cliente.post("/eventos/importar", params={"lote": 2}, json=filas)
+    assert respuesta.status_code == 200, respuesta.text
+    resultado = respuesta.json()
+
+    assert resultado["total_filas"] == 5 and resultado["importadas"] == 3 and len(resultado["ids"]) == 3
+    assert [error["fila"] for error in resultado["errores"]] == [3, 4]
+    assert all(error["errores"] == ["no se pudo insertar: disco lleno"] for error in resultado["errores"])
+    assert _nombres_importados(db, "lote roto") == ["Primero", "Segundo", "Quinto"]
+    assert carga.verificar(db)["consistente"]
+
+
+def test_csv_con_bom(cliente, db):
+    contenido = "\ufeffnombre,fecha,tipo,horario_colorin\nCon BOM,2032-03-20,bom,2:00 PM\n".encode("utf-8")
+    assert list(importar.leer_csv(contenido)[0]) == ["nombre", "fecha", "tipo", "horario_colorin"]
+    respuesta = cliente.post("/eventos/importar/csv", files={"archivo": ("bom.csv", contenido, "text/csv")})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["importadas"] == 1
+    assert _nombres_importados(db, "bom") == ["Con BOM"]
+
+
+def test_csv_que_no_es_utf8(cliente):
+    contenido = "nombre,fecha,tipo\nCumpleaños,2032-03-21,latin1\n".encode("latin-1")
+    respuesta = cliente.post("/eventos/importar/csv", files={"archivo": ("latin1.csv", contenido, "text/csv")})
+    assert respuesta.status_code == 400
+
+
+@pytest.mark.parametrize("valor, actividades", [
+    ('["Slime; con brillos", "Pintura, témpera"]', ["Slime; con brillos", "Pintura, témpera"]),
+    ("[]", []),
+    ("Slime;Mini cheffs; ", ["Slime", "Mini cheffs"]),
+    ("Slime", ["Slime"]),
+    # Parece JSON pero no lo es: se separa por ";" como cualquier texto
+    ("[Slime; Pintura", ["[Slime", "Pintura"]),
+])
+def test_actividad_json_o_separada_por_punto_y_coma(valor, actividades):
+    contenido = f'nombre,fecha,tipo,actividad\nEvento,2032-03-22,csv,"{valor.replace(chr(34), chr(34) * 2)}"\n'.encode()
+    assert importar.leer_csv(contenido)[0]["actividad"] == actividades
+
+
+def test_actividad_json_con_elementos_que_no_son_texto(cliente):
+    contenido = 'nombre,fecha,tipo,actividad\nEvento,2032-03-23,csv,"[1, {""a"": 2}]"\n'.encode()
+    respuesta = cliente.post("/eventos/importar/csv", files={"archivo": ("malo.csv", contenido, "text/csv")})
+    assert respuesta.status_code == 422
+    assert respuesta.json()["detail"]["errores"][0]["fila"] == 1
+
+
+def test_exportar_e_importar_conserva_los_eventos(cliente):
+    originales = [
+        {"nombre": "Ida y vuelta completo", "fecha": "2032-04-01", "tipo": "ida y vuelta", "ubicacion": "Salón, planta alta",
+         "horario_colorin": "2:00 PM", "horario_cumpleanos": "15.30", "actividad": ["Slime", "Juego \"del\" globo"],
+         "notas": "Primera línea\nsegunda línea, con coma"},
+        {"nombre": "Ida y vuelta vacío", "fecha": "2032-04-02", "tipo": "ida y vuelta"},
+        {"nombre": "Ida y vuelta a confirmar", "fecha": "2032-04-02", "tipo": "ida y vuelta",
+         "horario_colorin": "a confirmar", "actividad": []},
+    ]
+    for evento in originales:
+        assert cliente.post("/eventos/", json=evento).status_code == 200
+
+    def listar():
+        eventos = cliente.get("/eventos/", params={"tipo": "ida y vuelta"}).json()
+        return [{campo: valor for campo, valor in evento.items() if campo != "id"} for evento in eventos]
+
+    antes = listar()
+    exportado = cliente.get("/exportar/eventos", params={"formato": "csv", "tipo": "ida y vuelta"}).content
+    respuesta = cliente.post("/eventos/importar/csv", files={"archivo": ("eventos.csv", exportado, "text/csv")})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["importadas"] == len(originales) and respuesta.json()["errores"] == []
+
+    # Cada evento queda dos veces, con los mismos datos
+    despues = listar()
+    assert sorted(despues, key=repr) == sorted(antes * 2, key=repr)
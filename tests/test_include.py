@@ -0,0 +1,117 @@
+"""`?include=` en eventos y profesores: relaciones anidadas en una respuesta y ETags según lo incluido"""
+import pytest
+
+RANGO = {"fecha_desde": "2036-01-01", "fecha_hasta": "2036-01-31"}
+
+
+@pytest.fixture(scope="module")
+def datos(cliente):
+    """Dos profes y tres eventos: el primero con los dos, el segundo con uno y el tercero sin asignar"""
+    profesores = [cliente.post("/profesores/", json={"nombre": f"Profe include {n}"}).json() for n in range(2)]
+    eventos = [
+        cliente.post("/eventos/", json={"nombre": f"Evento include {n}", "fecha": f"2036-01-0{n + 1}", "tipo": "include"}).json()
+        for n in range(3)
+    ]
+    for profesor, evento in [(0, 0), (1, 0), (0, 1)]:
+        respuesta = cliente.post("/asignaciones/", json={"profesor_id": profesores[profesor]["id"], "evento_id": eventos[evento]["id"]})
+        assert respuesta.status_code == 200, respuesta.text
+    return profesores, eventos
+
+
+def _asignados(evento) -> list:
+    return [asignacion["profesor_id"] for asignacion in evento["asignaciones"]]
+
+
+@pytest.mark.parametrize("ruta", ["/eventos/", "/async/eventos/"])
+def test_eventos_con_asignaciones(cliente, datos, ruta):
+    profesores, _ = datos
+    sin_include = cliente.get(ruta, params=RANGO).json()
+    assert all("asignaciones" not in evento for evento in sin_include)
+
+    eventos = cliente.get(ruta, params={**RANGO, "include": "asignaciones"}).json()
+    assert [_asignados(evento) for evento in eventos] == [
+        [profesores[0]["id"], profesores[1]["id"]], [profesores[0]["id"]], []
+    ]
+    assert all("profesor" not in asignacion for evento in eventos for asignacion in evento["asignaciones"])
+
+    # profesores implica asignaciones y agrega el profesor de cada una
+    eventos = cliente.get(ruta, params={**RANGO, "include": "profesores"}).json()
+    assert [[a["profesor"]["nombre"] for a in evento["asignaciones"]] for evento in eventos] == [
+        ["Profe include 0", "Profe include 1"], ["Profe include 0"], []
+    ]
+
+
+def test_evento_por_id_con_profesores(cliente, datos):
+    profesores, eventos = datos
+    evento = cliente.get(f"/eventos/{eventos[0]['id']}", params={"include": "asignaciones,profesores"}).json()
+    assert [a["profesor"] for a in evento["asignaciones"]] == profesores
+    assert "asignaciones" not in cliente.get(f"/eventos/{eventos[0]['id']}").json()
+
+
+def test_profesores_con_eventos(cliente, datos):
+    profesores, eventos = datos
+    por_id = {p["id"]: p for p in cliente.get("/profesores/", params={**RANGO, "include": "eventos"}).json()}
+    assert [e["id"] for e in por_id[profesores[0]["id"]]["eventos"]] == [eventos[0]["id"], eventos[1]["id"]]
+    assert [e["id"] for e in por_id[profesores[1]["id"]]["eventos"]] == [eventos[0]["id"]]
+    assert por_id[profesores[0]["id"]]["eventos"][0]["asignacion_id"]
+
+    # eventos_limite corta la lista pero total_eventos cuenta todo el rango
+    por_id = {p["id"]: p for p in cliente.get("/profesores/", params={**RANGO, "include": "eventos", "eventos_limite": 1}).json()}
+    assert len(por_id[profesores[0]["id"]]["eventos"]) == 1
+    assert por_id[profesores[0]["id"]]["total_eventos"] == 2
+    assert all("eventos" not in p for p in cliente.get("/profesores/").json())
+
+
+@pytest.mark.parametrize("ruta, include", [
+    ("/eventos/", "profesor"),
+    ("/eventos/", "asignaciones,tareas"),
+    ("/async/eventos/", "eventos"),
+    ("/profesores/", "asignaciones"),
+])
+def test_include_desconocido(cliente, datos, ruta, include):
+    respuesta = cliente.get(ruta, params={"include": include})
+    assert respuesta.status_code == 400
+    assert "include inválido" in respuesta.json()["detail"]
+
+
+def test_include_desconocido_en_evento_por_id(cliente, datos):
+    _, eventos = datos
+    assert cliente.get(f"/eventos/{eventos[0]['id']}", params={"include": "tareas"}).status_code == 400
+
+
+def test_etag_segun_include(cliente, datos):
+    profesores, eventos = datos
+
+    def etags():
+        return {
+            include: cliente.get("/eventos/", params={**RANGO, **({"include": include} if include else {})}).headers["ETag"]
+            for include in (None, "asignaciones", "profesores")
+        }
+
+    def vigente(etag, include=None):
+        params = {**RANGO, **({"include": include} if include else {})}
+        return cliente.get("/eventos/", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    antes = etags()
+    assert len(set(antes.values())) == 3
+
+    # Una asignación nueva cambia las respuestas con include, no la lista sola
+    cliente.post("/asignaciones/", json={"profesor_id": profesores[1]["id"], "evento_id": eventos[2]["id"]})
+    assert vigente(antes[None])
+    assert not vigente(antes["asignaciones"], "asignaciones")
+    assert not vigente(antes["profesores"], "profesores")
+
+    # Renombrar un profesor solo cambia la que los incluye
+    antes = etags()
+    cliente.put(f"/profesores/{profesores[1]['id']}", json={"nombre": "Profe include renombrado"})
+    assert vigente(antes[None])
+    assert vigente(antes["asignaciones"], "asignaciones")
+    assert not vigente(antes["profesores"], "profesores")
+
+    # Lo mismo en /profesores/ con include=eventos
+    plano = cliente.get("/profesores/").headers["ETag"]
+    con_eventos = cliente.get("/profesores/", params={"include": "eventos"}).headers["ETag"]
+    assert plano != con_eventos
+    cliente.put(f"/eventos/{eventos[2]['id']}", json={"nombre": "Evento include renombrado"})
+    assert cliente.get("/profesores/", headers={"If-None-Match": plano}).status_code == 304
+    assert cliente.get("/profesores/", params={"include": "eventos"}, headers={"If-None-Match": con_eventos}).status_code == 200
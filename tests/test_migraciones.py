@@ -0,0 +1,133 @@
+"""Migraciones: el dry-run no escribe y una base nueva termina con el esquema de los modelos"""
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import MetaData, create_engine, event, func, inspect, select, text
+from sqlalchemy.orm import Session
+import threading
+import pytest
+import carga
+import database
+import models
+from migraciones import MIGRACIONES, aplicar, planificar
+from migraciones.nucleo import _CLAVE_LOCK_PG, schema_version
+from migraciones.versiones import _inicial
+
+
+@pytest.fixture(params=["sqlite", pytest.param("postgresql", marks=pytest.mark.postgresql)])
+def motor(request, tmp_path):
+    """Base vacía: un archivo SQLite o una base nueva en el servidor PostgreSQL"""
+    if request.param == "postgresql":
+        return request.getfixturevalue("base_postgresql")
+    motor = create_engine(f"sqlite:///{tmp_path / 'colorin.db'}")
+    event.listen(motor, "connect", lambda conexion, _: conexion.execute("PRAGMA foreign_keys = ON"))
+    return motor
+
+
+def _volcado(motor):
+    metadata = MetaData()
+    metadata.reflect(motor)
+    with motor.connect() as conn:
+        return {
+            tabla.name: sorted(map(tuple, conn.execute(select(tabla)).all()), key=repr)
+            for tabla in metadata.sorted_tables
+        }
+
+
+def _base_anterior(motor):
+    """Una base con el esquema original y datos en el formato viejo"""
+    _inicial.create_all(motor)
+    with motor.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO usuarios (username, email, hashed_password, activo, es_admin, creado_en) "
+            "VALUES ('admin', 'admin@colorin.com', 'x', :si, :si, '2025-01-01 00:00:00')"
+        ), {"si": True})
+        conn.execute(text("INSERT INTO profesores (nombre, activo) VALUES ('Ana', :si), ('Beto', :si)"), {"si": True})
+        for numero in range(1, 21):
+            conn.execute(text(
+                "INSERT INTO eventos (nombre, fecha, tipo, horario_colorin, actividad) "
+                "VALUES (:nombre, :fecha, 'cumpleaños', '2:00 PM', '[\"Slime\", \"Mini cheffs\"]')"
+            ), {"nombre": f"evento {numero}", "fecha": f"2025-03-{numero:02d}"})
+            conn.execute(text(
+                "INSERT INTO asignaciones (profesor_id, evento_id, rol) VALUES (:profesor, :evento, 'Profesor')"
+            ), {"profesor": numero % 2 + 1, "evento": numero})
+        # Una asignación repetida que la migración 6 tiene que borrar
+        conn.execute(text("INSERT INTO asignaciones (profesor_id, evento_id, rol) VALUES (2, 1, 'Profesor')"))
+
+
+def test_dry_run_en_base_nueva_no_escribe(motor):
+    plan = planificar(motor)
+    assert [m["version"] for m in plan] == list(range(1, len(plan) + 1))
+    assert all(paso["necesario"] for paso in plan[0]["pasos"])
+    assert inspect(motor).get_table_names() == []
+
+
+def test_dry_run_en_base_anterior_no_escribe(motor):
+    _base_anterior(motor)
+    antes = _volcado(motor)
+    plan = {m["nombre"]: m for m in planificar(motor)}
+    assert _volcado(motor) == antes
+
+    duplicadas = plan["asignaciones_unicas"]["pasos"][0]
+    assert duplicadas["necesario"] and duplicadas["filas"] == 1
+    copia = plan["actividades_normalizadas"]["pasos"][1]
+    assert copia["necesario"] and copia["filas"] == 20
+    assert plan["carga_profesores"]["pasos"][1].get("depende_de_pasos_anteriores")
+
+
+def test_base_nueva_queda_como_los_modelos(motor):
+    aplicar(motor)
+    inspector = inspect(motor)
+    for tabla in models.Base.metadata.sorted_tables:
+        columnas = {c["name"] for c in inspector.get_columns(tabla.name)}
+        assert columnas == {c.name for c in tabla.columns}, tabla.name
+        indices = {i["name"] for i in inspector.get_indexes(tabla.name)}
+        assert {i.name for i in tabla.indexes} <= indices, tabla.name
+    assert planificar(motor) == []
+    assert aplicar(motor) == []
+
+
+def test_base_anterior_migra_los_datos(motor):
+    _base_anterior(motor)
+    aplicar(motor)
+    with Session(motor) as db:
+        assert db.query(models.Asignacion).count() == 20
+        evento = db.get(models.Evento, 1)
+        assert evento.actividad == ["Slime", "Mini cheffs"]
+        assert evento.hora_colorin.hour == 14
+        assert evento.hora_orden == evento.hora_colorin
+        assert carga.verificar(db)["consistente"]
+    if motor.dialect.name == "sqlite":
+        with motor.connect() as conn:
+            assert database.revisar_claves_foraneas(conn)["total_violaciones"] == 0
+
+
+@pytest.mark.postgresql
+def test_migracion_espera_el_advisory_lock(base_postgresql):
+    terminada = threading.Event()
+    with base_postgresql.connect() as otra_replica:
+        otra_replica.execute(text("SELECT pg_advisory_lock(:clave)"), {"clave": _CLAVE_LOCK_PG})
+        hilo = threading.Thread(target=lambda: (aplicar(base_postgresql), terminada.set()))
+        hilo.start()
+        # Mientras la otra réplica tiene el lock no se crea ninguna tabla
+        assert not terminada.wait(1)
+        assert inspect(base_postgresql).get_table_names() == []
+        otra_replica.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": _CLAVE_LOCK_PG})
+    hilo.join(60)
+    assert terminada.is_set()
+    assert planificar(base_postgresql) == []
+
+
+@pytest.mark.postgresql
+def test_replicas_migrando_a_la_vez(base_postgresql):
+    barrera = threading.Barrier(3)
+
+    def migrar(_):
+        barrera.wait(5)
+        return [m.version for m in aplicar(base_postgresql)]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        resultados = list(pool.map(migrar, range(3)))
+
+    # Una réplica aplica todo; las demás encuentran las versiones ya registradas
+    assert sorted(v for resultado in resultados for v in resultado) == [m.version for m in MIGRACIONES]
+    with base_postgresql.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(schema_version)) == len(MIGRACIONES)
@@ -0,0 +1,143 @@
+"""Paginación por cursor: se recorre igual que la lista completa en los dos sentidos"""
+from datetime import date, time
+import base64
+import json
+import pytest
+import consultas
+import database
+import paginacion
+
+RANGO = {"fecha_desde": "2035-02-01", "fecha_hasta": "2035-02-03"}
+
+
+@pytest.fixture(scope="module")
+def eventos(cliente):
+    """Eventos en tres días con horas repetidas y sin horario (van al final del día)"""
+    horarios = [
+        ("2035-02-01", {"horario_colorin": "18hs"}),
+        ("2035-02-01", {"horario_cumpleanos": "9:00"}),
+        ("2035-02-01", {"horario_colorin": "a confirmar"}),
+        ("2035-02-01", {"horario_colorin": "9:00"}),
+        ("2035-02-02", {}),
+        ("2035-02-02", {"horario_colorin": "10:00", "horario_cumpleanos": "8:00"}),
+        ("2035-02-02", {}),
+        ("2035-02-03", {"horario_cumpleanos": "3:00 PM"}),
+        ("2035-02-03", {"horario_colorin": "2:00 PM"}),
+    ]
+    for numero, (fecha, horario) in enumerate(horarios):
+        respuesta = cliente.post("/eventos/", json={"nombre": f"paginado {numero}", "fecha": fecha, "tipo": "paginado", **horario})
+        assert respuesta.status_code == 200, respuesta.text
+    return cliente.get("/eventos/", params=RANGO).json()
+
+
+def _recorrer(cliente, ruta, params, limite):
+    """Todas las páginas hacia adelante y después hacia atrás desde la última"""
+    paginas, cursor = [], None
+    while True:
+        respuesta = cliente.get(ruta, params={**params, "limite": limite, **({"cursor": cursor} if cursor else {})})
+        assert respuesta.status_code == 200, respuesta.text
+        paginas.append(respuesta)
+        cursor = respuesta.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    adelante = [fila["id"] for respuesta in paginas for fila in respuesta.json()]
+
+    atras, cursor = [], paginas[-1].headers.get("X-Prev-Cursor")
+    while cursor:
+        respuesta = cliente.get(ruta, params={**params, "limite": limite, "cursor": cursor})
+        assert respuesta.status_code == 200, respuesta.text
+        atras = [fila["id"] for fila in respuesta.json()] + atras
+        cursor = respuesta.headers.get("X-Prev-Cursor")
+    atras += [fila["id"] for fila in paginas[-1].json()]
+    return adelante, atras, paginas
+
+
+def test_eventos_ordenados_por_fecha_y_hora(eventos):
+    nombres = [evento["nombre"] for evento in eventos]
+    assert nombres == [
+        "paginado 1", "paginado 3", "paginado 0", "paginado 2",
+        "paginado 5", "paginado 4", "paginado 6",
+        "paginado 8", "paginado 7",
+    ]
+    assert all("hora_orden" not in evento for evento in eventos)
+
+
+@pytest.mark.parametrize("limite", [1, 2, 4, 9])
+def test_eventos_por_paginas(cliente, eventos, limite):
+    adelante, atras, paginas = _recorrer(cliente, "/eventos/", RANGO, limite)
+    ids = [evento["id"] for evento in eventos]
+    assert adelante == ids
+    assert atras == ids
+    assert "X-Prev-Cursor" not in paginas[0].headers
+    assert all(len(respuesta.json()) == limite for respuesta in paginas[:-1])
+
+
+def test_total_y_cursor_en_los_headers(cliente, eventos):
+    respuesta = cliente.get("/eventos/", params={**RANGO, "limite": 4, "total": True})
+    assert respuesta.headers["X-Total-Count"] == str(len(eventos))
+    assert "X-Next-Cursor" in respuesta.headers
+    # Sin paginación total=true también informa el total
+    respuesta = cliente.get("/eventos/", params={**RANGO, "total": True})
+    assert respuesta.headers["X-Total-Count"] == str(len(eventos))
+    assert "X-Next-Cursor" not in respuesta.headers
+    # La última página completa no tiene siguiente
+    respuesta = cliente.get("/eventos/", params={**RANGO, "limite": len(eventos)})
+    assert "X-Next-Cursor" not in respuesta.headers
+
+
+def test_tareas_con_ordenes_mezclados(cliente):
+    for numero, (vencimiento, prioridad) in enumerate([
+        ("2035-03-01", "alta"), ("2035-03-01", "baja"), (None, "media"), ("2035-03-01", "alta"),
+        ("2035-02-20", "media"), (None, "alta"), ("2035-03-02", "baja"),
+    ]):
+        respuesta = cliente.post("/tareas/", json={"titulo": f"paginada {numero}", "fecha_vencimiento": vencimiento, "prioridad": prioridad})
+        assert respuesta.status_code == 200, respuesta.text
+
+    ids = [tarea["id"] for tarea in cliente.get("/tareas/").json()]
+    for limite in (1, 3):
+        adelante, atras, _ = _recorrer(cliente, "/tareas/", {}, limite)
+        assert adelante == ids
+        assert atras == ids
+
+
+def _cursor(datos) -> str:
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-un-cursor",
+    _cursor([1, 2, 3]),
+    _cursor({"a": False}),
+    _cursor({"a": False, "v": [{"d": "2035-02-01"}, {"t": "09:00:00"}]}),
+    _cursor({"a": False, "v": [{"d": "2035-02-31"}, {"t": "09:00:00"}, 1]}),
+    _cursor({"a": False, "v": ["2035-02-01", {"t": "09:00:00"}, 1]}),
+    _cursor({"a": False, "v": [{"d": "2035-02-01"}, {"t": "09:00:00"}, "1"]}),
+    _cursor({"a": False, "v": [{"dt": "2035-02-01T00:00:00"}, {"t": "09:00:00"}, 1]}),
+    _cursor({"a": False, "v": [{"d": "2035-02-01"}, None, 1]}),
+])
+def test_cursor_alterado(cliente, eventos, cursor):
+    respuesta = cliente.get("/eventos/", params={**RANGO, "cursor": cursor})
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "Cursor inválido"
+
+
+def test_cursor_armado_a_mano(cliente, eventos):
+    # Después de "paginado 3" (1/2 a las 9:00): siguen el de las 18 y el sin horario
+    cursor = paginacion.codificar_cursor([date(2035, 2, 1), time(9), eventos[1]["id"]], False)
+    respuesta = cliente.get("/eventos/", params={**RANGO, "cursor": cursor, "limite": 2})
+    assert respuesta.json() == eventos[2:4]
+
+
+def test_pagina_de_eventos_usa_el_indice(eventos):
+    if database.engine.dialect.name != "sqlite":
+        pytest.skip("el plan se revisa con EXPLAIN QUERY PLAN de SQLite")
+    pagina = paginacion.Paginacion(paginacion.codificar_cursor([date(2035, 2, 1), time(9), eventos[1]["id"]], False), 3, False)
+    stmt, _ = paginacion.preparar(
+        consultas.eventos_filas_stmt(date(2035, 2, 1), date(2035, 2, 3)), consultas.eventos_claves(), pagina
+    )
+    sql = stmt.compile(database.engine, compile_kwargs={"literal_binds": True})
+    with database.engine.connect() as conn:
+        plan = " ".join(fila[-1] for fila in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    # El ORDER BY y el corte del cursor salen del índice, sin ordenar en memoria
+    assert "ix_eventos_fecha_hora_orden" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,125 @@
+"""Planificador de asignaciones: el heap reparte a los menos cargados, simular no escribe y la equidad mejora.
+
+Cada test arma su escenario en la sesión sin confirmarlo (con los demás profesores
+desactivados) y el fixture `db` lo descarta al cerrar: el planificador ve solo estos datos.
+"""
+from datetime import date
+from sqlalchemy import event, func, select, update
+import pytest
+import consultas
+import database
+import models
+import operaciones
+import schemas
+
+DESDE, HASTA = date(2039, 2, 1), date(2039, 2, 28)
+
+
+def _escenario(db, cargas, eventos):
+    """Profesores con `cargas` eventos ya asignados en enero y `eventos` sin asignar en febrero"""
+    db.execute(update(models.Profesor).where(models.Profesor.activo == True).values(activo=False))
+    profesores = [
+        operaciones.crear_profesor(db, schemas.ProfesorCreate(nombre=f"Profe equidad {n}")).id
+        for n in range(len(cargas))
+    ]
+    for profesor_id, carga in zip(profesores, cargas):
+        for dia in range(carga):
+            previo = operaciones.crear_evento(db, schemas.EventoCreate(
+                nombre=f"Evento previo {profesor_id}-{dia}", fecha=date(2039, 1, dia + 1), tipo="previo"
+            ))
+            operaciones.crear_asignacion(db, schemas.AsignacionCreate(profesor_id=profesor_id, evento_id=previo.id))
+    nuevos = [
+        operaciones.crear_evento(db, schemas.EventoCreate(nombre=f"Evento equidad {n}", fecha=date(2039, 2, n + 1), tipo="equidad")).id
+        for n in range(eventos)
+    ]
+    return profesores, nuevos
+
+
+def _planificar(db, cantidad_profes=1):
+    return operaciones.planificar_asignaciones(db, DESDE, HASTA, cantidad_profes, "equidad", simular=True)
+
+
+def _elegidos(plan):
+    return [[p["profesor_id"] for p in item["profesores"]] for item in plan["plan"]]
+
+
+def test_el_heap_elige_al_menos_cargado(db):
+    (a, b, c), _ = _escenario(db, cargas=[2, 0, 1], eventos=4)
+    plan = _planificar(db)
+    # b (0) sube a 1 y empata con c: gana el de menor id; después c, y con todos en 2, a
+    assert _elegidos(plan) == [[b], [b], [c], [a]]
+
+    # Cada elegido era, en ese momento, uno de los de menor carga
+    cargas = {item["profesor_id"]: item["antes"] for item in plan["carga"]}
+    for (elegido,) in _elegidos(plan):
+        assert cargas[elegido] == min(cargas.values())
+        cargas[elegido] += 1
+    assert cargas == {item["profesor_id"]: item["despues"] for item in plan["carga"]}
+
+
+def test_saltea_a_los_ya_asignados(db):
+    (a, b, c), (evento, _) = _escenario(db, cargas=[2, 0, 1], eventos=2)
+    operaciones.crear_asignacion(db, schemas.AsignacionCreate(profesor_id=b, evento_id=evento))
+    plan = _planificar(db, cantidad_profes=2)
+    # b (el menos cargado) ya está en el primero: se completa con c, que sube a 2;
+    # en el segundo van b y, con a y c empatados en 2, el de menor id
+    assert [item["ya_asignados"] for item in plan["plan"]] == [1, 0]
+    assert _elegidos(plan) == [[c], [b, a]]
+    assert plan["total_asignaciones"] == 3
+
+
+def test_simular_no_escribe(db):
+    profesores, eventos = _escenario(db, cargas=[3, 1, 0], eventos=5)
+    db.flush()
+    asignaciones = db.scalar(select(func.count()).select_from(models.Asignacion))
+    sentencias = []
+
+    def registrar(conn, cursor, sql, parametros, contexto, muchos):
+        sentencias.append(sql.lstrip().split(None, 1)[0].upper())
+
+    event.listen(database.engine, "before_cursor_execute", registrar)
+    try:
+        plan = _planificar(db, cantidad_profes=2)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", registrar)
+
+    assert plan["simulacion"] is True and plan["total_asignaciones"] == 10
+    assert sentencias and set(sentencias) <= {"SELECT", "WITH"}
+    assert not db.new and not db.dirty
+    assert db.scalar(select(func.count()).select_from(models.Asignacion)) == asignaciones
+
+
+def test_la_equidad_mejora(db):
+    _escenario(db, cargas=[4, 0, 0, 1], eventos=8)
+    plan = _planificar(db)
+    antes, despues = plan["equidad"]["antes"], plan["equidad"]["despues"]
+    assert (antes["diferencia"], antes["es_equitativo"]) == (4, False)
+    assert (despues["diferencia"], despues["es_equitativo"]) == (1, True)
+    assert despues["desviacion_estandar"] < antes["desviacion_estandar"]
+    assert despues["promedio_eventos"] == antes["promedio_eventos"] + 2
+    assert sorted(item["despues"] for item in plan["carga"]) == [3, 3, 3, 4]
+    assert despues == consultas.analizar_equidad([item["despues"] for item in plan["carga"]])
+
+
+def test_varios_por_evento_quedan_parejos(db):
+    _escenario(db, cargas=[0] * 5, eventos=7)
+    plan = _planificar(db, cantidad_profes=3)
+    assert all(len(set(elegidos)) == 3 for elegidos in _elegidos(plan))
+    assert plan["equidad"]["despues"]["diferencia"] <= 1
+    assert sum(item["despues"] for item in plan["carga"]) == 21
+
+
+@pytest.mark.parametrize("totales, esperado", [
+    ([3, 3, 3], {"minimo_eventos": 3, "maximo_eventos": 3, "promedio_eventos": 3, "desviacion_estandar": 0,
+                 "diferencia": 0, "es_equitativo": True}),
+    ([0, 4], {"minimo_eventos": 0, "maximo_eventos": 4, "promedio_eventos": 2, "desviacion_estandar": 2,
+              "diferencia": 4, "es_equitativo": False}),
+    ([1, 2, 2], {"minimo_eventos": 1, "maximo_eventos": 2, "promedio_eventos": 1.67, "desviacion_estandar": 0.47,
+                 "diferencia": 1, "es_equitativo": True}),
+])
+def test_analizar_equidad(totales, esperado):
+    assert consultas.analizar_equidad(totales) == esperado
+
+
+def test_analizar_equidad_sin_profesores():
+    assert consultas.analizar_equidad([]) == {"mensaje": "No hay profesores activos"}
@@ -0,0 +1,68 @@
+"""`json_directo` responde lo mismo que validar y serializar con el response_model de cada listado"""
+import pytest
+import respuestas
+
+RANGO = {"fecha_desde": "2037-04-01", "fecha_hasta": "2037-04-30"}
+
+
+@pytest.fixture(scope="module")
+def datos(cliente):
+    """Eventos con horas, actividades y campos vacíos, asignados, y tareas con y sin vencimiento"""
+    profesores = [cliente.post("/profesores/", json={"nombre": f"Profe respuestas {n}", "activo": n != 2}).json() for n in range(3)]
+    eventos = [
+        cliente.post("/eventos/", json={
+            "nombre": "Cumple con todo", "fecha": "2037-04-03", "tipo": "cumpleaños", "ubicacion": "Salón",
+            "horario_colorin": "2:30 PM", "horario_cumpleanos": "15.45", "actividad": ["Slime", "Mini cheffs"],
+            "notas": "Ñandú y acentos: áéíóú",
+        }).json(),
+        cliente.post("/eventos/", json={"nombre": "Evento sin horario", "fecha": "2037-04-05", "tipo": "colonia"}).json(),
+        cliente.post("/eventos/", json={
+            "nombre": "Evento a confirmar", "fecha": "2037-04-05", "tipo": "cumpleaños", "horario_colorin": "a confirmar",
+            "actividad": [],
+        }).json(),
+    ]
+    for profesor, evento in [(0, 0), (1, 0), (2, 1)]:
+        cliente.post("/asignaciones/", json={"profesor_id": profesores[profesor]["id"], "evento_id": eventos[evento]["id"], "rol": "Profesor"})
+    cliente.post("/tareas/", json={"titulo": "Tarea respuestas con fecha", "fecha_vencimiento": "2037-04-02", "prioridad": "alta"})
+    cliente.post("/tareas/", json={"titulo": "Tarea respuestas sin fecha", "descripcion": None})
+    return profesores, eventos
+
+
+RUTAS = [
+    ("/eventos/", RANGO),
+    ("/eventos/", {**RANGO, "include": "asignaciones"}),
+    ("/eventos/", {**RANGO, "include": "profesores"}),
+    ("/eventos/", {**RANGO, "limite": 2}),
+    ("/async/eventos/", {**RANGO, "include": "profesores"}),
+    ("/profesores/", {}),
+    ("/profesores/", {**RANGO, "include": "eventos"}),
+    ("/profesores/", {"activo": False, "limite": 1}),
+    ("/asignaciones/", {}),
+    ("/tareas/", {}),
+]
+
+
+@pytest.mark.parametrize("ruta, params", RUTAS)
+def test_json_directo_igual_al_response_model(cliente, datos, monkeypatch, ruta, params):
+    directa = cliente.get(ruta, params=params)
+    assert directa.status_code == 200, directa.text
+    assert directa.json(), "el listado tiene que tener filas para comparar"
+
+    # Sin el camino rápido FastAPI valida los mismos dicts con el response_model y los codifica
+    monkeypatch.setattr(respuestas, "json_directo", lambda datos, response: datos)
+    validada = cliente.get(ruta, params=params)
+    assert validada.status_code == 200, validada.text
+    assert directa.json() == validada.json()
+    for header in ("X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "ETag"):
+        assert directa.headers.get(header) == validada.headers.get(header)
+
+
+def test_formato_de_fechas_y_horas(cliente, datos):
+    _, eventos = datos
+    (evento, *_), tareas = cliente.get("/eventos/", params=RANGO).json(), cliente.get("/tareas/").json()
+    assert evento["id"] == eventos[0]["id"]
+    assert (evento["fecha"], evento["hora_colorin"], evento["hora_cumpleanos"]) == ("2037-04-03", "14:30:00", "15:45:00")
+    assert evento["actividad"] == ["Slime", "Mini cheffs"]
+    tarea = next(t for t in tareas if t["titulo"] == "Tarea respuestas con fecha")
+    assert tarea["fecha_vencimiento"] == "2037-04-02"
+    assert "T" in tarea["creada_en"]
@@ -0,0 +1,124 @@
+"""/reportes/series: períodos en 0, bordes de semana y de mes y el tope de períodos"""
+from datetime import date, timedelta
+from fastapi import HTTPException
+import pytest
+import consultas
+
+MESES = {"periodo": "mes", "fecha_desde": "2037-12-01", "fecha_hasta": "2038-04-30"}
+SEMANAS = {"periodo": "semana", "fecha_desde": "2037-12-30", "fecha_hasta": "2038-02-08"}
+
+
+@pytest.fixture(scope="module")
+def profesores(cliente):
+    """Eventos a los dos lados de un cambio de año, de mes (domingo 31/1 y lunes 1/2) y un mes vacío en el medio"""
+    uno, otro = [cliente.post("/profesores/", json={"nombre": f"Profe series {n}"}).json() for n in range(2)]
+    for profesor, fecha, tipo in [
+        (uno, "2037-12-31", "cumpleaños"), (uno, "2038-01-01", "taller"), (uno, "2038-01-31", "cumpleaños"),
+        (uno, "2038-02-01", "cumpleaños"), (uno, "2038-04-10", "taller"), (otro, "2038-02-01", "taller"),
+    ]:
+        evento = cliente.post("/eventos/", json={"nombre": f"Evento series {fecha}", "fecha": fecha, "tipo": tipo}).json()
+        respuesta = cliente.post("/asignaciones/", json={"profesor_id": profesor["id"], "evento_id": evento["id"]})
+        assert respuesta.status_code == 200, respuesta.text
+    return uno, otro
+
+
+def _series(cliente, params):
+    respuesta = cliente.get("/reportes/series", params=params)
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()
+
+
+def _serie(resultado, profesor):
+    return next(p["serie"] for p in resultado["profesores"] if p["profesor_id"] == profesor["id"])
+
+
+def test_por_mes_con_meses_en_cero(cliente, profesores):
+    uno, otro = profesores
+    resultado = _series(cliente, MESES)
+    assert resultado["periodos"] == ["2037-12-01", "2038-01-01", "2038-02-01", "2038-03-01", "2038-04-01"]
+    assert _serie(resultado, uno) == [1, 2, 1, 0, 1]
+    assert _serie(resultado, otro) == [0, 0, 1, 0, 0]
+    assert resultado["totales"] == [1, 2, 2, 0, 1] and resultado["total"] == 6
+    assert [(t["tipo"], t["serie"]) for t in resultado["tipos"]] == [
+        ("cumpleaños", [1, 1, 1, 0, 0]), ("taller", [0, 1, 1, 0, 1])
+    ]
+    # Los profesores sin asignaciones en el rango también aparecen, todo en 0
+    assert all(p["serie"] == [0] * 5 for p in resultado["profesores"] if p["profesor_id"] not in (uno["id"], otro["id"]))
+
+
+def test_por_semana_de_lunes_a_domingo(cliente, profesores):
+    uno, otro = profesores
+    resultado = _series(cliente, SEMANAS)
+    # La primera semana empieza el lunes anterior a fecha_desde y la última es la del lunes fecha_hasta
+    assert resultado["periodos"] == [
+        "2037-12-28", "2038-01-04", "2038-01-11", "2038-01-18", "2038-01-25", "2038-02-01", "2038-02-08"
+    ]
+    # 31/12 y 1/1 caen en la misma semana; el domingo 31/1 y el lunes 1/2, en semanas distintas
+    assert _serie(resultado, uno) == [2, 0, 0, 0, 1, 1, 0]
+    assert _serie(resultado, otro) == [0, 0, 0, 0, 0, 1, 0]
+
+
+def test_por_profesor_y_tipo(cliente, profesores):
+    uno, _ = profesores
+    resultado = _series(cliente, {**MESES, "profesor_id": uno["id"], "tipo": "cumpleaños"})
+    assert [p["profesor_id"] for p in resultado["profesores"]] == [uno["id"]]
+    assert resultado["profesores"][0]["serie"] == [1, 1, 1, 0, 0]
+    assert resultado["profesores"][0]["por_tipo"] == {"cumpleaños": [1, 1, 1, 0, 0]}
+
+    # Un tipo sin eventos se informa igual, en 0
+    resultado = _series(cliente, {**MESES, "tipo": "sin eventos"})
+    assert resultado["tipos"] == [{"tipo": "sin eventos", "total": 0, "serie": [0] * 5}]
+    assert resultado["total"] == 0
+
+
+def test_mover_y_desasignar_cambian_la_serie(cliente):
+    profesor = cliente.post("/profesores/", json={"nombre": "Profe series movido"}).json()
+    evento = cliente.post("/eventos/", json={"nombre": "Evento series movido", "fecha": "2038-01-31", "tipo": "taller"}).json()
+    asignacion = cliente.post("/asignaciones/", json={"profesor_id": profesor["id"], "evento_id": evento["id"]}).json()
+    params = {**MESES, "profesor_id": profesor["id"]}
+    assert _series(cliente, params)["profesores"][0]["serie"] == [0, 1, 0, 0, 0]
+
+    cliente.put(f"/eventos/{evento['id']}", json={"fecha": "2038-03-01"})
+    assert _series(cliente, params)["profesores"][0]["serie"] == [0, 0, 0, 1, 0]
+
+    cliente.delete(f"/asignaciones/{asignacion['id']}")
+    assert _series(cliente, params)["profesores"][0]["serie"] == [0] * 5
+
+
+@pytest.mark.parametrize("periodo, desde, hasta, esperados", [
+    ("mes", date(2037, 12, 15), date(2038, 1, 1), [date(2037, 12, 1), date(2038, 1, 1)]),
+    ("mes", date(2038, 1, 31), date(2038, 3, 1), [date(2038, 1, 1), date(2038, 2, 1), date(2038, 3, 1)]),
+    ("mes", date(2040, 2, 29), date(2040, 2, 29), [date(2040, 2, 1)]),
+    ("semana", date(2038, 1, 31), date(2038, 2, 1), [date(2038, 1, 25), date(2038, 2, 1)]),
+    ("semana", date(2038, 2, 1), date(2038, 2, 7), [date(2038, 2, 1)]),
+    ("semana", date(2037, 12, 31), date(2038, 1, 3), [date(2037, 12, 28)]),
+])
+def test_bordes_de_periodo(periodo, desde, hasta, esperados):
+    assert consultas.periodos_serie(periodo, desde, hasta) == esperados
+
+
+def test_tope_de_periodos():
+    lunes = date(2000, 1, 3)
+    ultima = lunes + timedelta(weeks=consultas.SERIES_MAX_PERIODOS - 1)
+    assert len(consultas.periodos_serie("semana", lunes, ultima + timedelta(days=6))) == consultas.SERIES_MAX_PERIODOS
+    with pytest.raises(HTTPException) as error:
+        consultas.periodos_serie("semana", lunes, ultima + timedelta(days=7))
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("ruta", ["/reportes/series", "/async/reportes/series"])
+def test_tope_de_periodos_en_la_ruta(cliente, ruta):
+    # De 2000-01 a 2033-04 son justo 400 meses
+    params = {"periodo": "mes", "fecha_desde": "2000-01-01", "fecha_hasta": "2033-04-30"}
+    respuesta = cliente.get(ruta, params=params)
+    assert respuesta.status_code == 200, respuesta.text
+    assert len(respuesta.json()["periodos"]) == 400
+
+    respuesta = cliente.get(ruta, params={**params, "fecha_hasta": "2033-05-01"})
+    assert respuesta.status_code == 400
+    assert "400 períodos" in respuesta.json()["detail"]
+
+
+def test_rango_invertido(cliente):
+    respuesta = cliente.get("/reportes/series", params={"fecha_desde": "2038-02-01", "fecha_hasta": "2038-01-01"})
+    assert respuesta.status_code == 400
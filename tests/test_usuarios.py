@@ -0,0 +1,11 @@
+"""Alta del primer usuario (POST /usuarios/ no requiere autenticación)"""
+import auth
+
+
+def test_segundo_usuario_rechazado_sin_hashear(app, monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(auth, "get_password_hash", lambda password: llamadas.append(password) or "x")
+    respuesta = app.post("/usuarios/", json={"username": "otro", "email": "otro@colorin.com", "password": "clave"})
+    assert respuesta.status_code == 400
+    assert "Ya existe un usuario" in respuesta.json()["detail"]
+    assert llamadas == []